@@ -0,0 +1,228 @@
+""" batch.py
+Author: Braden Carlson
+Date: October 2026
+
+Runs a Pipeline (see the pipeline module) over every file in a directory, such
+as one roster per school, writing the results to another directory. Run it
+with
+
+    python -m batch "strip chars='\\"' | capitalize | sort" rosters/ done/
+
+or call run_directory. The files are handed out to a ProcessPoolExecutor, so
+several are worked on at the same time.
+
+A manifest (MANIFEST, in the output directory) records, for each file, the
+SHA-256 hash of its contents, the pipeline it was run through, and the hashes
+of any other files the pipeline read (the file of a difference). When the
+directory is run again, a file is skipped if all of these are unchanged and
+its output is still there, so only the rosters which were edited (or all of
+them, if the pipeline or the master list changed) are done again. """
+
+import argparse
+import fnmatch
+import hashlib
+import json
+import os
+import sys
+import tempfile
+from errors import FopsError, MissingFileError
+from pipeline import Pipeline
+
+# Name of the manifest, in the output directory.
+MANIFEST = ".blue-manifest.json"
+
+# Bumped whenever the layout of the manifest changes, so old ones are ignored.
+MANIFEST_VERSION = 1
+
+def file_hash(filename):
+    """ Returns the SHA-256 hash of the contents of filename, as a hex string. """
+
+    with open(filename, "rb") as f_handle:
+        return hashlib.file_digest(f_handle, "sha256").hexdigest()
+
+def read_manifest(directory):
+    """ Returns the dictionary of entries in the manifest of directory, by the
+    name of the input file. An empty dictionary is returned if there is no
+    manifest, or it can't be read. """
+
+    try:
+        with open(os.path.join(directory, MANIFEST), "r", encoding="utf-8") as f_handle:
+            manifest = json.load(f_handle)
+    except (OSError, ValueError):
+        return {}
+    if not isinstance(manifest, dict) or manifest.get('version') != MANIFEST_VERSION:
+        return {}
+    return manifest.get('files', {})
+
+def write_manifest(directory, entries):
+    """ Writes the manifest of directory, holding entries (see
+    read_manifest). It is written to a temporary file first, so an
+    interrupted run never leaves half a manifest behind. """
+
+    with tempfile.NamedTemporaryFile("w", encoding="utf-8", dir=directory,
+                                     delete=False) as f_handle:
+        json.dump({'version': MANIFEST_VERSION, 'files': entries}, f_handle,
+                  indent=1, sort_keys=True)
+    os.replace(f_handle.name, os.path.join(directory, MANIFEST))
+
+def run_file(spec, source, target):
+    """ Run in a worker process by run_directory. Runs the pipeline given by
+    spec over the file source, and writes the result to target. The result is
+    written to a temporary file next to target first, so target is never left
+    half written. """
+
+    directory = os.path.dirname(os.path.abspath(target))
+    with tempfile.NamedTemporaryFile("w", encoding="utf-8", dir=directory,
+                                     delete=False) as f_handle:
+        try:
+            for line in Pipeline.parse(spec).run_file(source):
+                f_handle.write(line)
+                f_handle.write('\n')
+        except BaseException:
+            f_handle.close()
+            os.remove(f_handle.name)
+            raise
+    os.replace(f_handle.name, target)
+
+def run_directory(spec, source, output, **opts):
+    """ Runs the pipeline given by spec (see Pipeline.parse) over every file in
+    the directory source, and writes the result for each to the file of the
+    same name in the directory output, which is created if needed. The
+    accepted keywords are
+        pattern - only the files whose names match this glob pattern are run.
+                  Default is "*".
+        workers - number of worker processes. Default is os.cpu_count(). With
+                  1, everything is done in this process.
+        force - if True, every file is run, even if the manifest says it is
+                up to date. Default is False.
+
+    Returns a dictionary with the keys
+        done    - list of the names of the files which were run.
+        skipped - list of the names of the files which were up to date.
+        failed  - dictionary of the error message for each file which could
+                  not be run (such as a line with too few fields for a cut).
+    A file which fails is left out of the manifest, so it is tried again the
+    next time. Raises a ValueError if spec is not a valid pipeline or output
+    is the same directory as source, and a MissingFileError if source, or a
+    file read by the pipeline, does not exist. """
+
+    pattern = opts.get('pattern', "*")
+    force = opts.get('force', False)
+
+    if not os.path.isdir(source):
+        raise MissingFileError(f"{source} is not a directory.", [source])
+    if os.path.realpath(source) == os.path.realpath(output):
+        raise ValueError("The output directory must be different from the input directory.")
+    params = parameters(Pipeline.parse(spec))
+    os.makedirs(output, exist_ok=True)
+
+    manifest = read_manifest(output)
+    result = {'done': [], 'skipped': [], 'failed': {}}
+    todo = {}
+    for name in sorted(os.listdir(source)):
+        path = os.path.join(source, name)
+        if not os.path.isfile(path) or not fnmatch.fnmatch(name, pattern):
+            continue
+        entry = dict(params, hash=file_hash(path))
+        if (not force and manifest.get(name) == entry
+                and os.path.isfile(os.path.join(output, name))):
+            result['skipped'].append(name)
+            continue
+        # Forget the old entry until the file has been run again.
+        manifest.pop(name, None)
+        todo[name] = entry
+
+    for name, error in run_files(spec, source, output, list(todo),
+                                 opts.get('workers', os.cpu_count() or 1)):
+        if error is None:
+            manifest[name] = todo[name]
+            result['done'].append(name)
+        else:
+            result['failed'][name] = error
+
+    write_manifest(output, manifest)
+    return result
+
+def parameters(pipeline):
+    """ Returns the parameters of a run of pipeline, which are stored in the
+    manifest along with the hash of each file: the pipeline itself, and the
+    hash of every other file it reads. Raises a MissingFileError if one of
+    those files does not exist. """
+
+    params = {'pipeline': repr(pipeline), 'inputs': {}}
+    for filename in pipeline.inputs():
+        try:
+            params['inputs'][filename] = file_hash(filename)
+        except FileNotFoundError as e:
+            raise MissingFileError(f"{filename} does not exist.", [filename]) from e
+    return params
+
+def run_files(spec, source, output, names, workers):
+    """ Generator which runs the pipeline spec over each of names (files in
+    source), writing into output, and yields [name, error] as each one is
+    finished. error is None if the file was run, and otherwise the message
+    of the FopsError or OSError which stopped it. """
+
+    jobs = [[name, os.path.join(source, name), os.path.join(output, name)]
+            for name in names]
+
+    if workers <= 1 or len(jobs) <= 1:
+        for [name, path, target] in jobs:
+            try:
+                run_file(spec, path, target)
+            except (FopsError, OSError) as e:
+                yield [name, f"{e}"]
+            else:
+                yield [name, None]
+        return
+
+    # Only needed when there is more than one file to run at once.
+    from concurrent.futures import ProcessPoolExecutor # pylint: disable=C0415
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [[name, pool.submit(run_file, spec, path, target)]
+                   for [name, path, target] in jobs]
+        for [name, future] in futures:
+            try:
+                future.result()
+            except (FopsError, OSError) as e:
+                yield [name, f"{e}"]
+            else:
+                yield [name, None]
+
+def main(argv=None):
+    """ Runs the command line interface, and returns the exit status: 0 if
+    every file was run (or skipped), and 1 otherwise. """
+
+    parser = argparse.ArgumentParser(
+        prog="python -m batch",
+        description="Run a pipeline of operations over every file in a directory. "
+                    "Files which have not changed since the last run are skipped.")
+    parser.add_argument("spec", help="The operations to run, separated by |, i.e. "
+                                     "\"strip chars=. | capitalize | sort\".")
+    parser.add_argument("source", help="Directory holding the files to run.")
+    parser.add_argument("output", help="Directory the results are written to.")
+    parser.add_argument("-p", "--pattern", default="*",
+                        help="Only run the files whose names match this pattern, "
+                             "i.e. \"*.txt\".")
+    parser.add_argument("-w", "--workers", type=int, default=os.cpu_count() or 1,
+                        help="Number of files worked on at the same time.")
+    parser.add_argument("-f", "--force", action="store_true",
+                        help="Run every file, even the ones which are up to date.")
+    args = parser.parse_args(argv)
+
+    try:
+        result = run_directory(args.spec, args.source, args.output,
+                               pattern=args.pattern, workers=args.workers,
+                               force=args.force)
+    except (FopsError, ValueError) as e:
+        print(f"{e} Exiting.", file=sys.stderr)
+        return 1
+
+    for name, error in result['failed'].items():
+        print(f"{name}: {error}", file=sys.stderr)
+    print(f"{len(result['done'])} run, {len(result['skipped'])} up to date, "
+          f"{len(result['failed'])} failed.")
+    return 1 if result['failed'] else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,168 @@
+""" capitalize.py
+Author: Braden Carlson
+Date: October 2026
+
+Provides the NameCapitalizer class, which capitalizes the names in a roster.
+Simply capitalizing each word gets a lot of names wrong ("Mcdonald", "Deandre"),
+so each word goes through a few rules instead:
+  - A word in which every capital after the first letter sits between two
+    small letters, like "DeAndre" or "McDonald", was typed that way on
+    purpose. Only its first letter is changed. Any other word is lowercased
+    first, so that a word typed with caps lock on ("jOHN") comes out as
+    "John".
+  - The word is then looked up in a trie of exceptions. The trie holds
+    whole words which are spelled a particular way ("Macy", "Mack") and
+    prefixes after which the next letter is capitalized as well ("Mc", "Mac",
+    "O'"), so a single walk over the word finds the longest rule that applies.
+  - Anything else is capitalized normally. Hyphenated names like "Smith-Jones"
+    are two words, so each half is capitalized on its own.
+
+Rosters repeat the same names over and over, so the result for each token
+(anything between two spaces or newlines) is cached, and the text is handled
+in large batches: it is split into tokens with str.split, the tokens are looked
+up in the cache with map, and only the ones which have not been seen before
+are worked out with the rules above. """
+
+import re
+
+# A word is a run of letters, which may contain apostrophes (as in O'Brien).
+WORD = re.compile(r"([^\W\d_]+(?:['’][^\W\d_]+)*)")
+
+# Number of characters handled in a single batch by NameCapitalizer.capitalize.
+BATCH = 1024 * 1024
+
+# Largest number of tokens kept in the cache before it is emptied.
+CACHE_SIZE = 1000000
+
+# Prefixes after which the rest of the word is capitalized as well, along with
+# the least number of letters which must follow the prefix for it to count. A
+# minimum of None means words starting with that prefix are capitalized
+# normally, even though a shorter prefix matches ("Machado", "Mackey").
+PREFIXES = {"mc": 2, "mac": 3, "mach": None, "mack": None,
+            "o'": 1, "d'": 1, "o’": 1, "d’": 1}
+
+# Words which start with one of the PREFIXES, but are not spelled that way.
+WORDS = ["Mace", "Macey", "Macedo", "Maceo", "Macias", "Macon", "Macri", "Macy",
+         "Macario"]
+
+class NameCapitalizer:
+    """ Capitalizes names, following the rules described at the top of this
+    module. Results are cached per word, so one object should be reused for
+    as much text as possible. """
+
+    def __init__(self, prefixes=None, words=None):
+        """ prefixes is a dictionary like PREFIXES, and words a list like
+        WORDS. Both default to the ones defined in this module. """
+
+        if prefixes is None:
+            prefixes = PREFIXES
+        if words is None:
+            words = WORDS
+
+        # Each node of the trie is a dictionary from a letter to the next
+        # node. The rule for the letters leading to a node is stored in it
+        # under the key '', as ['word', spelling] or ['prefix', minimum].
+        self.trie = {}
+        for prefix, minimum in prefixes.items():
+            self.node(prefix)[''] = ['prefix', minimum]
+        # Matches anywhere one of the rules might apply, so that the tokens
+        # where none of them do can be capitalized with str.title.
+        self.special = re.compile('|'.join(map(re.escape, ["'", '’', *prefixes])))
+        for word in words:
+            self.node(word.lower())[''] = ['word', word]
+
+        self.cache = TokenCache(self.token)
+
+    def node(self, letters):
+        """ Returns the node of the trie reached by letters, adding nodes as
+        needed. """
+
+        node = self.trie
+        for letter in letters:
+            node = node.setdefault(letter, {})
+        return node
+
+    def word(self, word):
+        """ Returns the capitalized version of a single word. """
+
+        lower = word.lower()
+        if word not in (lower, word.upper()) and deliberate(word):
+            return word[0].upper() + word[1:]
+
+        # Walk the trie, remembering the longest prefix rule seen.
+        node = self.trie
+        rule = None
+        for length, letter in enumerate(lower, 1):
+            node = node.get(letter)
+            if node is None:
+                break
+            if '' in node and node[''][0] == 'prefix':
+                rule = None if node[''][1] is None else [length, node[''][1]]
+        else:
+            if '' in node and node[''][0] == 'word':
+                return node[''][1]
+
+        if rule is not None and len(lower) - rule[0] >= rule[1]:
+            length = rule[0]
+            return lower[:length].capitalize() + self.word(lower[length:])
+        return lower.capitalize()
+
+    def token(self, token):
+        """ Returns the capitalized version of a token, which is any run of
+        characters without spaces or newlines, such as "o'brien,10". """
+
+        lower = token.lower()
+        if token in (lower, token.upper()) and not self.special.search(lower):
+            # None of the rules can apply, so every word is simply capitalized.
+            return token.title()
+
+        parts = WORD.split(token)
+        parts[1::2] = map(self.word, parts[1::2])
+        return ''.join(parts)
+
+    def capitalize(self, text):
+        """ Returns text with every name capitalized. """
+
+        batches = []
+        start = 0
+        while start < len(text):
+            # Cut each batch at the end of a line, so no word is split.
+            end = text.find('\n', start + BATCH)
+            end = len(text) if end == -1 else end + 1
+            if len(self.cache) > CACHE_SIZE:
+                self.cache.clear()
+
+            # Surround each newline with spaces, so splitting on spaces alone
+            # gives the tokens and the newlines between them, all without
+            # leaving C. The extra spaces are taken back out at the end.
+            tokens = text[start:end].replace('\n', ' \n ').split(' ')
+            batches.append(' '.join(map(self.cache.__getitem__, tokens))
+                           .replace(' \n ', '\n'))
+            start = end
+
+        return ''.join(batches)
+
+def deliberate(word):
+    """ Returns True if the capitals of word, a word in mixed case, look like
+    they were typed on purpose: every capital after the first letter has a
+    small letter on either side of it, as in "McDonald" or "deAndre", but not
+    "jOHN" or "jOhn". """
+
+    rest = word[1:]
+    return all(0 < index < len(rest) - 1 and rest[index - 1].islower() and
+               rest[index + 1].islower()
+               for index, letter in enumerate(rest) if letter.isupper())
+
+class TokenCache(dict):
+    """ Dictionary of the capitalized version of each token. A token which is
+    not yet in it is worked out with the function given to the constructor the
+    first time it is looked up. """
+
+    def __init__(self, function):
+        super().__init__()
+        self.function = function
+
+    def __missing__(self, token):
+        value = self.function(token)
+        self[token] = value
+        return value
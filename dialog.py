@@ -5,12 +5,14 @@ Provides the dialogs NewTabDialog, CutDialog, and ErrorDialog. These are used to
 display and recieve data to and from the user when performing actions that need
 information.  """
 
-from tkinter import Frame, Entry
+from tkinter import Frame, Entry, IntVar
 from tkinter import ttk
 from tkinter import _get_temp_root
 from tkinter.simpledialog import Dialog, Toplevel, _place_window
+from functools import wraps
 import re as regex
 import sys
+from errors import FopsError
 
 class NewTabDialog(Dialog):
     """ A Dialog which prompts the user for details when adding a new tab to the
@@ -160,6 +162,8 @@ class CutDialog(Dialog):
         self.rng = None
         self.fs = None
         self.fs_entry = None
+        self.quoted = IntVar(master, 0)
+        self.csv = None
 
         ##################################################
         ### This was modified from the simpledialog.py, found at
@@ -240,6 +244,11 @@ if necessary, i.e. 1-4,7-10) indicating which columns of data to KEEP.",
         self.fs_entry = Entry(frm)
         self.fs_entry.pack()
 
+        quoted_check = ttk.Checkbutton(frm, variable=self.quoted,
+                                       text="Quoted CSV (columns may also be given \
+by the names in the first line, i.e. Last,First)")
+        quoted_check.pack(pady=5)
+
 
         # Do not pack this here, this will be packed by the validate() method if
         # the provided range does not match the regex ^[0-9,-]+$
@@ -266,23 +275,32 @@ if necessary, i.e. 1-4,7-10) indicating which columns of data to KEEP.",
 
     def validate(self):
         """ If the provided range matches the regex ^[0-9,-]+$, then continue,
-        otherwise show the error message. """
+        otherwise show the error message. For quoted CSV, column names are
+        allowed too, so the range only has to be non empty. """
 
         self.rng = self.rng_entry.get()
         self.fs = self.fs_entry.get()
+        self.csv = bool(self.quoted.get())
         if self.fs == "":
             self.fs = ","
 
+        if self.csv:
+            if self.rng.strip() == "" or len(self.fs) != 1:
+                self.err_msg.pack()
+                return 0
+            return 1
+
         if regex.match(r'^[0-9,-]+$', self.rng) is None:
             self.err_msg.pack()
             return 0
         return 1
 
 def ask_num_range(master):
-    """ Convenience method to create a CutDialog and get it's range. """
+    """ Convenience method to create a CutDialog and get it's range, field
+    separator, and whether the data is quoted CSV. """
 
     d = CutDialog(master)
-    return [d.rng, d.fs]
+    return [d.rng, d.fs, d.csv]
 
 
 class ErrorDialog(Dialog):
@@ -385,10 +403,26 @@ def error(master, msg):
 
     ErrorDialog(master, msg=msg)
 
+def shows_errors(method):
+    """ Decorator for the methods of a widget which call into the fops module.
+    fops never shows anything itself, it raises a FopsError instead, so any
+    FopsError raised by the method is shown here in an ErrorDialog (with the
+    widget as its master), and the method returns None. """
+
+    @wraps(method)
+    def wrapper(self, *args, **kwargs):
+        try:
+            return method(self, *args, **kwargs)
+        except FopsError as e:
+            error(self, f"{e}")
+            return None
+    return wrapper
+
 class StripDialog(Dialog):
-    """ Dialog to prompt the user for a character to remove from the file. There
+    """ Dialog to prompt the user for characters to remove from the file. There
     are certain circumstances where (for example) the \" character must be
-    removed from each line. """
+    removed from each line. Several characters may be given at once, and each
+    is taken literally. """
 
     def __init__(self, master, title=None):
         """ This method was mostly copied from the simpledialog.py module, see
@@ -459,8 +493,9 @@ class StripDialog(Dialog):
 
         frm = ttk.Frame(master)
 
-        inst = ttk.Label(frm, text="Please enter a character to remove from \
-the file. This will remove all instances of the character.",
+        inst = ttk.Label(frm, text="Please enter the characters to remove from \
+the file. This will remove all instances of each character, for example '.,\"' \
+removes every period, comma and quotation mark.",
                         width=50,
                         wrap=1,
                         wraplength=350)
@@ -504,8 +539,9 @@ the file. This will remove all instances of the character.",
         return 1
 
 def ask_char(master):
-    """ Conenience method to prompt the user for a character. The language used
-    in this prompt is that of the strip dialog. """
+    """ Conenience method to prompt the user for characters. The language used
+    in this prompt is that of the strip dialog. Returns None if the dialog was
+    cancelled. """
 
     d = StripDialog(master)
     return d.char
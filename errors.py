@@ -0,0 +1,42 @@
+""" errors.py
+Author: Braden Carlson
+Date: October 2026
+
+Defines the exceptions raised by the fops module and the modules it is built
+on (table, extsort, pipeline, parallel). None of these modules ever show
+anything to the user themselves, so they can be used without a display. It is
+up to the caller to report the error: the GUI shows it in an ErrorDialog (see
+dialog.shows_errors), and link_crew prints it.
+
+Every exception here is a FopsError, so a caller can catch all of them at once.
+They are also subclasses of the builtin exceptions they replace, so code which
+catches FileNotFoundError or ValueError keeps working. """
+
+class FopsError(Exception):
+    """ Base class of every error raised by the fops module. """
+
+class MissingFileError(FopsError, FileNotFoundError):
+    """ Raised when one of the files given to an operation does not exist.
+    filenames is the list of the files the operation was given. """
+
+    def __init__(self, msg, filenames=()):
+        super().__init__(msg)
+        self.filenames = list(filenames)
+
+    def __reduce__(self):
+        # Pickled along with filenames, to get back from a worker process.
+        return (type(self), (f"{self}", self.filenames))
+
+class DataError(FopsError, ValueError):
+    """ Raised when the contents of a file or string can't be used by an
+    operation, such as a line with too few fields for a cut. lineno is the
+    number of the offending line (counting from 1), or None if it is not
+    known. """
+
+    def __init__(self, msg, lineno=None):
+        super().__init__(msg)
+        self.lineno = lineno
+
+    def __reduce__(self):
+        # Pickled along with lineno, to get back from a worker process.
+        return (type(self), (f"{self}", self.lineno))
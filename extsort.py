@@ -0,0 +1,277 @@
+""" extsort.py
+Author: Braden Carlson
+Date: October 2026
+
+Provides an external merge sort, for sorting files which are too large to be
+held in memory all at once. The lines are read in batches which fit inside a
+memory budget, each batch is sorted and written to a temporary file (a "run"),
+then all of the runs are merged back together with heapq.merge, which only
+holds one line from each run in memory at a time.
+
+If all of the lines fit in a single batch, nothing is written to disk.
+
+For files, sort_file can also build the runs in parallel: the file is split
+into chunks on line boundaries, and each chunk is read, sorted and written out
+as runs by a separate worker process. Only the final merge is done in the
+calling process. """
+
+import heapq
+import os
+import sys
+from itertools import groupby
+import reader
+
+# Default memory budget for a single run, in bytes.
+DEFAULT_MEMORY = 64 * 1024 * 1024
+
+# Largest number of runs that are merged at once. If there are more runs than
+# this, they are merged in several passes so that we don't run out of file
+# handles.
+MAX_MERGE = 64
+
+def read_lines(filename, encoding=None):
+    """ Generator which yields the lines of filename, without line endings.
+    The encoding is detected and line endings are normalized unless encoding
+    is given, see reader.open_text. """
+
+    yield from reader.read_lines(filename, encoding)
+
+def chunk_offsets(filename, chunks, encoding="utf-8"):
+    """ Returns a list of [start, end] byte offsets which split filename into
+    at most chunks pieces. Each piece begins at the start of a line, so that no
+    line is split between two pieces. A file in an encoding whose lines can't
+    be found byte by byte (see reader.byte_lines) is left in one piece. """
+
+    size = os.path.getsize(filename)
+    if not reader.byte_lines(encoding):
+        return [[0, size]]
+    step = max(size // max(chunks, 1), 1)
+
+    starts = [0]
+    with open(filename, "rb") as f_handle:
+        position = step
+        while position < size:
+            f_handle.seek(position - 1)
+            f_handle.readline()
+            start = f_handle.tell()
+            if start >= size:
+                break
+            if start > starts[-1]:
+                starts.append(start)
+            position = max(start, position) + step
+
+    ends = starts[1:] + [size]
+    return [[start, end] for start, end in zip(starts, ends)]
+
+def read_span(filename, span, encoding="utf-8"):
+    """ Generator which yields the lines of filename (in encoding, see
+    reader.byte_lines) between the byte offsets span = [start, end], without
+    line endings. Lines are read one at a time, so the whole span is never
+    held in memory. """
+
+    [start, end] = span
+    with open(filename, "rb") as f_handle:
+        f_handle.seek(start)
+        while start < end:
+            raw = f_handle.readline()
+            if not raw:
+                break
+            start = start + len(raw)
+            yield from reader.decode_lines(raw, encoding)
+
+def sort_key(**opts):
+    """ Returns the function used to compare lines, built from the keywords
+    key (a function, as in the sorted builtin) and ignore_case. Returns None if
+    lines are compared as they are. """
+
+    key = opts.get('key')
+    if not opts.get('ignore_case', False):
+        return key
+    if key is None:
+        return str.casefold
+    return lambda line: key(line).casefold()
+
+def unique_lines(lines, key=None):
+    """ Generator which yields the first of each group of neighboring lines of
+    the iterable lines which have the same key. On sorted lines this is the
+    first of each set of equal lines, as in sort -u. """
+
+    for _, group in groupby(lines, key):
+        for line in group:
+            yield line
+            break
+
+def write_run(lines, tmpdir=None):
+    """ Writes the (already sorted) lines to a new temporary file and returns
+    its name. """
+
+    # Only imported once a run is written, like ProcessPoolExecutor in
+    # sort_file, since both take longer to import than the rest of fops.
+    import tempfile # pylint: disable=C0415
+    with tempfile.NamedTemporaryFile("w", encoding="utf-8", suffix=".run",
+                                     dir=tmpdir, delete=False) as run:
+        for line in lines:
+            run.write(line)
+            run.write('\n')
+        return run.name
+
+def batches(lines, memory):
+    """ Generator which splits the iterable lines into lists whose estimated
+    size in memory is at most memory bytes (but always at least one line). If
+    memory is None, all of the lines are put in a single list. """
+
+    if memory is None:
+        batch = list(lines)
+        if batch:
+            yield batch
+        return
+
+    batch = []
+    size = 0
+    for line in lines:
+        batch.append(line)
+        # The size of the string, plus the pointer to it in the list.
+        size = size + sys.getsizeof(line) + 8
+        if size >= memory:
+            yield batch
+            batch = []
+            size = 0
+    if batch:
+        yield batch
+
+def merge_runs(runs, key=None, tmpdir=None, reverse=False):
+    """ Repeatedly merges groups of MAX_MERGE neighboring runs into a single
+    new run until no more than MAX_MERGE remain. Each group is replaced by its
+    merged run, so lines which compare equal stay in the order they were read.
+    The list runs is modified in place, so the caller can remove whatever
+    files are left in it afterwards. """
+
+    while len(runs) > MAX_MERGE:
+        start = 0
+        while start < len(runs) - 1:
+            group = runs[start:start + MAX_MERGE]
+            merged = write_run(heapq.merge(*(read_lines(run, "utf-8") for run in group),
+                                           key=key, reverse=reverse), tmpdir)
+            runs[start:start + len(group)] = [merged]
+            for run in group:
+                os.remove(run)
+            start = start + 1
+
+def external_sort(lines, **opts):
+    """ Generator which yields the strings of the iterable lines in sorted
+    order. The lines must not contain newline characters. The accepted keywords
+    are
+        key - function used to compare lines, as in the sorted builtin.
+        ignore_case - if True, compare lines without regard to case.
+        reverse - if True, sort from largest to smallest.
+        unique - if True, only yield the first of each set of lines which
+                 compare equal.
+        memory - the memory budget for a single run, in bytes. Default is
+                 DEFAULT_MEMORY. None sorts everything in memory.
+        tmpdir - directory to write the runs to. Default is the system's
+                 temporary directory. """
+
+    try:
+        memory = opts['memory']
+    except KeyError:
+        memory = DEFAULT_MEMORY
+
+    try:
+        tmpdir = opts['tmpdir']
+    except KeyError:
+        tmpdir = None
+
+    key = sort_key(**opts)
+    reverse = opts.get('reverse', False)
+    unique = opts.get('unique', False)
+
+    runs = []
+    pending = None
+    try:
+        for batch in batches(lines, memory):
+            batch = sort_batch(batch, key, reverse, unique)
+            # Hold on to the latest batch, it only needs to be written out if
+            # another batch comes after it.
+            if pending is not None:
+                runs.append(write_run(pending, tmpdir))
+            pending = batch
+
+        if pending is None:
+            return
+        if not runs:
+            yield from pending
+            return
+
+        runs.append(write_run(pending, tmpdir))
+        pending = None
+        yield from merge_all(runs, key, reverse, unique, tmpdir)
+    finally:
+        for run in runs:
+            os.remove(run)
+
+def sort_batch(batch, key, reverse, unique):
+    """ Sorts the list batch in place, and returns it (or the list of its
+    unique lines, if unique is True). """
+
+    batch.sort(key=key, reverse=reverse)
+    if unique:
+        return list(unique_lines(batch, key))
+    return batch
+
+def merge_all(runs, key, reverse, unique, tmpdir):
+    """ Generator which merges the sorted runs, the names of the files in the
+    list runs, and yields the result. The caller removes the runs. """
+
+    merge_runs(runs, key, tmpdir, reverse)
+    merged = heapq.merge(*(read_lines(run, "utf-8") for run in runs), key=key,
+                         reverse=reverse)
+    if unique:
+        merged = unique_lines(merged, key)
+    yield from merged
+
+def sort_span(filename, span, opts):
+    """ Run in a worker process by sort_file. Sorts the lines of filename
+    between the byte offsets span = [start, end] into runs which fit in the
+    memory budget, and returns the list of their names. """
+
+    key = sort_key(**opts)
+    reverse = opts.get('reverse', False)
+    unique = opts.get('unique', False)
+    return [write_run(sort_batch(batch, key, reverse, unique), opts.get('tmpdir'))
+            for batch in batches(read_span(filename, span, opts['encoding']),
+                                 opts.get('memory', DEFAULT_MEMORY))]
+
+def sort_file(filename, **opts):
+    """ Generator which yields the lines of filename in sorted order. The
+    accepted keywords are those of external_sort (except key, since it has to
+    be sent to other processes), and
+        workers - number of worker processes used to build the runs. Default
+                  is 1, which sorts in this process with external_sort.
+    The encoding of filename is detected, see the reader module. A file which
+    can't be split into chunks (see reader.byte_lines) is always sorted in
+    this process. """
+
+    encoding = reader.file_encoding(filename)
+    workers = opts.get('workers', 1)
+    if workers <= 1 or not reader.byte_lines(encoding):
+        yield from external_sort(read_lines(filename, encoding), **opts)
+        return
+
+    from concurrent.futures import ProcessPoolExecutor # pylint: disable=C0415
+    run_opts = {name: opts[name] for name in ('ignore_case', 'reverse', 'unique',
+                                              'memory', 'tmpdir') if name in opts}
+    run_opts['encoding'] = encoding
+    runs = []
+    try:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            # Several chunks per worker, so that a slow chunk doesn't hold up
+            # the rest.
+            futures = [pool.submit(sort_span, filename, span, run_opts)
+                       for span in chunk_offsets(filename, workers * 4, encoding)]
+            for future in futures:
+                runs.extend(future.result())
+        yield from merge_all(runs, sort_key(**opts), opts.get('reverse', False),
+                             opts.get('unique', False), opts.get('tmpdir'))
+    finally:
+        for run in runs:
+            os.remove(run)
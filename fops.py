@@ -4,70 +4,457 @@ Date: June 2025
 
 This module provides the File OPerationS (fops) that the user 
 will need while useing this application. 
-"""
 
-import re
-from dialog import error
+Nothing here depends on tkinter: when something goes wrong, one of the
+exceptions from the errors module is raised (they are imported here as well,
+so fops.FopsError can be caught), and it is up to the caller to show it.
 
-def sort_lines(string):
-    """ sorts lines in a string. """
+Files are read through the reader module, so the encoding of each file is
+detected and DOS line endings are removed as it is read, without rewriting it.
+"""
 
+import re
+from itertools import chain
+from operator import itemgetter, methodcaller
+from matching import AhoCorasick, TrigramIndex
+import extsort
+from extsort import external_sort, read_lines, sort_key, unique_lines
+from table import Table, field_splitter
+from linetable import LineTable
+from capitalize import NameCapitalizer
+from reader import open_text
+from errors import FopsError, MissingFileError, DataError # pylint: disable=W0611
+
+def sort_lines(string, **opts):
+    """ sorts lines in a string. The accepted keywords are
+        ignore_case - if True, sort without regard to case.
+        reverse - if True, sort from largest to smallest.
+        unique - if True, only keep the first of each set of equal lines.
+    string may also be a Table, in which case a sorted Table is returned, or a
+    LineTable, in which case a sorted view of it is returned (see
+    LineTable.sort). """
+
+    if isinstance(string, (Table, LineTable)):
+        return string.sort(**opts)
+
+    key = sort_key(**opts)
     lines = list(string.splitlines() or [])
-    lines.sort()
+    lines.sort(key=key, reverse=opts.get('reverse', False))
+    if opts.get('unique', False):
+        lines = unique_lines(lines, key)
     new = '\n'.join(lines)
     return new
 
+def sort_file(filename, **opts):
+    """ Generator which yields the lines of filename in sorted order, for
+    files which are too large to sort in memory. The accepted keywords are
+    those of sort_lines, and
+        workers - number of processes used to sort pieces of the file at the
+                  same time. Default is 1.
+        memory, tmpdir - passed on to external_sort.
+    See extsort.sort_file for the details. Raises a MissingFileError if
+    filename does not exist. """
+
+    try:
+        yield from extsort.sort_file(filename, **opts)
+    except FileNotFoundError as e:
+        raise MissingFileError(f"{filename} does not exist.", [filename]) from e
+
+
+# Shared by every call to capitalize_words, so that its cache carries over.
+CAPITALIZER = NameCapitalizer()
 
 def capitalize_words(string):
     """ Capitalize each word (defined as any string of alphbetic chars) of the
-    parameter. """
+    parameter. Names such as McDonald, O'Brien and DeAndre are handled
+    properly, see NameCapitalizer. """
+
+    return CAPITALIZER.capitalize(string)
+
+# Separates the fields of a key made from several columns (see key_function).
+# This is the ASCII unit separator, which should never appear in a roster.
+KEY_SEPARATOR = "\x1f"
+
+def key_function(**opts):
+    """ Returns a function of a single line which computes the key used to
+    compare lines when taking an exact difference. Leading and trailing
+    whitespace (including any stray \\r left over from DOS line endings) is
+    always removed. The accepted keywords are
+        ignore_case - if True, compare lines without regard to case.
+        squeeze - if True, runs of whitespace inside the line are treated as a
+                  single space.
+        f - only compare the given columns (fields) of each line, in the same
+            range syntax as cut, i.e. "1-2,4". Each field is stripped on its
+            own, and a missing field is treated as empty.
+        fs - the field separator used with f. Default is ",".
+
+    Everything which only depends on opts (parsing the range, compiling the
+    separator) is done once here rather than once per line, so this should be
+    used whenever the keys of many lines are needed. """
+
+    squeeze = opts.get('squeeze', False)
+    ignore_case = opts.get('ignore_case', False)
+
+    if squeeze:
+        def clean(text):
+            return ' '.join(text.split())
+    else:
+        clean = str.strip
+
+    if 'f' in opts:
+        nums = parse_num_range(opts['f'])
+        split = field_splitter(opts.get('fs', ','))
+
+        def project(line):
+            fields = split(line)
+            return KEY_SEPARATOR.join([clean(fields[i - 1]) if i <= len(fields) else ''
+                                       for i in nums])
+    else:
+        project = clean
+
+    if ignore_case:
+        def key(line):
+            return project(line).casefold()
+        return key
+    return project
+
+# The whitespace removed by str.strip, for ASCII lines.
+WHITESPACE = b" \t\n\r\x0b\x0c\x1c\x1d\x1e\x1f"
 
-    string = re.sub(r"([a-zA-Z]+)",lambda m: m.group(0).capitalize(), string)
-    return string
+# str.split also splits on these, bytes.split does not.
+SQUEEZE = bytes.maketrans(b"\x1c\x1d\x1e\x1f", b"    ")
+
+def bytes_key_function(**opts):
+    """ Returns a function of a single line of bytes which computes the same
+    key as key_function (encoded as bytes), for lines which are ASCII only.
+    The same keywords are accepted. Used by LineTable.difference, so the
+    lines of a file need not be decoded. """
+
+    if opts.get('squeeze', False):
+        def clean(text):
+            return b' '.join(text.translate(SQUEEZE).split())
+    else:
+        clean = methodcaller('strip', WHITESPACE)
+
+    project = clean
+    if 'f' in opts:
+        nums = parse_num_range(opts['f'])
+        split = field_splitter(opts.get('fs', ','), "utf-8")
+        separator = KEY_SEPARATOR.encode("ascii")
+
+        def project_fields(line):
+            fields = split(line)
+            return separator.join([clean(fields[i - 1]) if i <= len(fields) else b''
+                                   for i in nums])
+        project = project_fields
+
+    if opts.get('ignore_case', False):
+        return lambda line: project(line).lower()
+    return project
+
+def normalize_line(line, **opts):
+    """ Returns the key of a single line, see key_function for the accepted
+    keywords. """
+
+    return key_function(**opts)(line)
 
 def difference(file1, file2, **opts):
     """ Find each line of file1 which does not appear in file2, regardless of
     the order of lines in each file.  This is different than diff, which
-    compares files line by line. """
+    compares files line by line.
+
+    The mode keyword controls how a line of file1 is matched against file2:
+        substring - (default) the line is searched for anywhere in file2, just
+                like grep -F. The line is taken literally, so characters such
+                as ( . or + have no special meaning. All lines of file1 are
+                loaded into an AhoCorasick automaton, and file2 is scanned once.
+        regex - the line is used as a regular expression and searched for
+                anywhere in file2, just like grep.
+        exact - the line must be equal to some line of file2, after both have
+                been passed through normalize_line. The lines of file2 are
+                read into a set once, so this is much faster on large files.
+                This is the default if the f keyword is given.
+    Any other keywords are passed on to normalize_line. In particular the f and
+    fs keywords compare only the given columns of each line, so that
+    "Smith,John,10" and "Smith,John,11" match when f="1-2".
+
+    file1 and file2 may also both be Tables, in which case the rows of file1
+    which are not in file2 are returned as a Table (see Table.difference). Only
+    the f keyword is used then. file1 may also be a LineTable, and file2 a
+    LineTable or the name of a file, in which case an exact difference is
+    taken without decoding the lines (if they are ASCII) and a view of file1
+    is returned, see LineTable.difference. Raises a MissingFileError if
+    either file does not exist. """
+
+    if isinstance(file1, Table):
+        nums = parse_num_range(opts['f']) if 'f' in opts else None
+        return file1.difference(file2, nums)
+
+    if isinstance(file1, LineTable):
+        keys = [key_function(**opts), bytes_key_function(**opts)]
+        if not isinstance(file2, LineTable):
+            with LineTable(file2) as other:
+                return file1.difference(other, *keys)
+        return file1.difference(file2, *keys)
 
-    matches = []
-    nonmatches = []
+    try:
+        mode = opts['mode']
+    except KeyError:
+        mode = "exact" if 'f' in opts else "substring"
+
+    matchers = {"substring": match_substring,
+                "exact": match_exact,
+                "regex": match_regex}
+
+    try:
+        with open_text(file1) as f1:
+            with open_text(file2) as f2:
+                return matchers[mode](f1, f2, **opts)[1]
+    except FileNotFoundError as e:
+        raise MissingFileError(f"One of {file1} or {file2} does not exist.",
+                               [file1, file2]) from e
+
+def line_index(lines, **opts):
+    """ Build a position index for the iterable lines. Returns a dictionary
+    which maps the key of each line (see normalize_line, opts are passed along
+    to it) to the list [line, numbers], where line is the first line having
+    that key and numbers is the list of line numbers (starting at 1) of every
+    line with that key. """
+
+    key_of = key_function(**opts)
+    index = {}
+    for lineno, line in enumerate(lines, 1):
+        line = line.removesuffix('\n')
+        key = key_of(line)
+        try:
+            index[key][1].append(lineno)
+        except KeyError:
+            index[key] = [line, [lineno]]
+    return index
+
+def partition(file1, file2, **opts):
+    """ Split the lines of file1 and file2 into three groups in a single pass,
+    comparing lines the same way as an exact difference (opts are passed on to
+    normalize_line). Returns a dictionary with the keys
+        left  - lines which only appear in file1
+        right - lines which only appear in file2
+        both  - lines which appear in both files
+    Each group is a list of [line, numbers1, numbers2], where numbers1 and
+    numbers2 are the line numbers at which the line appears in file1 and file2
+    respectively (one of these is empty for the left and right groups). The
+    left and both groups are in the order of file1, right in the order of
+    file2. """
+
+    groups = {'left': [], 'right': [], 'both': []}
+
+    try:
+        with open_text(file1) as f1:
+            with open_text(file2) as f2:
+                index1 = line_index(f1, **opts)
+                index2 = line_index(f2, **opts)
+    except FileNotFoundError as e:
+        raise MissingFileError(f"One of {file1} or {file2} does not exist.",
+                               [file1, file2]) from e
+
+    for key, [line, numbers] in index1.items():
+        try:
+            groups['both'].append([line, numbers, index2[key][1]])
+        except KeyError:
+            groups['left'].append([line, numbers, []])
+
+    for key, [line, numbers] in index2.items():
+        if key not in index1:
+            groups['right'].append([line, [], numbers])
+
+    return groups
+
+def stream_difference(file1, file2, **opts):
+    """ Generator version of an exact difference (see normalize_line), for
+    files which are too large to fit in memory. Both files are sorted with
+    external_sort, then walked side by side, so only a few lines of each file
+    are held in memory at any time. Since the files are sorted first, the lines
+    are produced in sorted order rather than the order of file1. The accepted
+    keywords are
+        matches - if True, yield [line, found] for every line of file1, where
+                  found tells whether the line appears in file2. Otherwise
+                  (the default) only the lines which do not appear in file2
+                  are yielded.
+        memory, tmpdir - passed on to external_sort.
+    and any keywords accepted by normalize_line. """
+
+    key = key_function(**opts)
+    sort_opts = {name: opts[name] for name in ('memory', 'tmpdir') if name in opts}
+
+    try:
+        report_matches = opts['matches']
+    except KeyError:
+        report_matches = False
+
+    try:
+        left = external_sort(read_lines(file1), key=key, **sort_opts)
+        right = map(key, external_sort(read_lines(file2), key=key, **sort_opts))
+
+        right_key = next(right, None)
+        for line in left:
+            left_key = key(line)
+            while right_key is not None and right_key < left_key:
+                right_key = next(right, None)
+            found = right_key == left_key
+            if report_matches:
+                yield [line, found]
+            elif not found:
+                yield line
+    except FileNotFoundError as e:
+        raise MissingFileError(f"One of {file1} or {file2} does not exist.",
+                               [file1, file2]) from e
+
+def fuzzy_difference(file1, file2, **opts):
+    """ Like an exact difference, but each line of file1 which is not found in
+    file2 is looked up in a TrigramIndex built over the lines of file2, to find the
+    closest line that may be a misspelling of it. The accepted keywords are
+        distance - the largest edit distance that is still considered a
+                   possible match. Default is 2.
+    and any keywords accepted by normalize_line.
+
+    Returns a list containing [line, candidate, distance] for every line of
+    file1 which has no exact match. If no line of file2 is within distance of
+    line, candidate and distance are both None. """
+
+    try:
+        max_distance = int(opts['distance'])
+    except KeyError:
+        max_distance = 2
+
+    results = []
 
     try:
-        with open(file1,"r",encoding="utf-8") as f1:
-            with open(file2, "r", encoding="utf-8") as f2:
-                f2_text = f2.read()
-                line = f1.readline()
-                while line:
+        with open_text(file1) as f1:
+            with open_text(file2) as f2:
+                # Map each key back to the first line of file2 that produced
+                # it, so the candidate can be shown as it appears in the file.
+                key_of = key_function(**opts)
+                originals = {}
+                for line in f2:
+                    line = line.removesuffix('\n')
+                    originals.setdefault(key_of(line), line)
+                index = TrigramIndex(originals)
+
+                for line in f1:
                     line = line.removesuffix('\n')
-                    match = re.findall(line, f2_text)
-                    if len(match) == 0:
-                        nonmatches.append(line)
+                    key = key_of(line)
+                    if key in originals:
+                        continue
+                    best = index.closest(key, max_distance)
+                    if best is None:
+                        results.append([line, None, None])
                     else:
-                        matches.append(line)
-                    line = f1.readline()
-    except FileNotFoundError:
-        error(None, f"One of {file1} or {file2} does not exist.")
+                        results.append([line, originals[best[0]], best[1]])
+    except FileNotFoundError as e:
+        raise MissingFileError(f"One of {file1} or {file2} does not exist.",
+                               [file1, file2]) from e
 
-    return nonmatches
+    return results
 
-def strip(string, char):
-    """ Strips all instances of char in string. """
+def match_substring(f1, f2, **opts):
+    """ Sort the lines of f1 into those which appear literally somewhere in f2
+    and those which do not. Both arguments are iterables of lines, such as open
+    files. Returns the list [matches, nonmatches]. """
 
-    lines = string.splitlines()
+    lines = [line.removesuffix('\n') for line in f1]
+    found = AhoCorasick(lines).search(f2)
 
-    new_lines = []
+    matches = []
+    nonmatches = []
     for line in lines:
-        new_line = re.sub(char, '', line)
-        new_lines.append(new_line)
+        if line in found:
+            matches.append(line)
+        else:
+            nonmatches.append(line)
+    return [matches, nonmatches]
+
+def match_exact(f1, f2, **opts):
+    """ Sort the lines of f1 into those which are equal to some line of f2 and
+    those which are not, after normalizing both with normalize_line (opts are
+    passed along to it). Returns the list [matches, nonmatches]. """
+
+    key_of = key_function(**opts)
+    index = set(map(key_of, f2))
+
+    matches = []
+    nonmatches = []
+    for line in f1:
+        line = line.removesuffix('\n')
+        if key_of(line) in index:
+            matches.append(line)
+        else:
+            nonmatches.append(line)
+    return [matches, nonmatches]
+
+def match_regex(f1, f2, **opts):
+    """ Sort the lines of f1 into those which, used as a regular expression,
+    match somewhere in f2 and those which do not. Returns the list [matches,
+    nonmatches]. """
+
+    f2_text = ''.join(f2)
+
+    matches = []
+    nonmatches = []
+    for line in f1:
+        line = line.removesuffix('\n')
+        match = re.findall(line, f2_text)
+        if len(match) == 0:
+            nonmatches.append(line)
+        else:
+            matches.append(line)
+    return [matches, nonmatches]
+
+def strip(string, char, **opts):
+    """ Strips all instances of char in string. The mode keyword controls how
+    char is read:
+        chars - (default) char is a set of characters, every one of which is
+                removed, see strip_chars.
+        regex - char is a regular expression, and every match of it is
+                removed from each line.
+    string may also be a Table, in which case a new Table is returned. """
+
+    try:
+        mode = opts['mode']
+    except KeyError:
+        mode = "chars"
 
-    return '\n'.join(new_lines)
+    if isinstance(string, Table):
+        return string.strip(char, mode=mode)
+
+    if mode == "chars":
+        return strip_chars(string, char)
+
+    pattern = re.compile(char)
+    return '\n'.join([pattern.sub('', line) for line in string.splitlines()])
+
+def strip_chars(buffer, chars):
+    """ Removes every one of the characters in the string chars from buffer,
+    which may be a str or bytes, in a single pass with translate. Each
+    character is taken literally, so "." only removes periods. Line endings
+    are left alone, unless they are among chars.
+
+    For bytes, the buffer is taken to be UTF-8. If chars are all ASCII they
+    are removed from the bytes directly, which is safe since no byte of a
+    multibyte UTF-8 character is ASCII. Otherwise the buffer is decoded
+    first. """
+
+    if isinstance(buffer, bytes):
+        if chars.isascii():
+            return buffer.translate(None, chars.encode("ascii"))
+        return strip_chars(buffer.decode("utf-8"), chars).encode("utf-8")
+    return buffer.translate(str.maketrans('', '', chars))
 
 
 def get_num_fields(lines, **opts):
     """ Get the smalled number of records which appears in any line of the file.
     This is used in the cut method to ensure that the range attained from the
-    user does not go out of bounds. """
+    user does not go out of bounds. Raises a DataError if the line with the
+    fewest records is not the last one, since that usually means a line was
+    broken. """
 
     max_number_of_records = 1000
 
@@ -87,46 +474,197 @@ def get_num_fields(lines, **opts):
         index = index + 1
 
     if lineno < len(lines):
-        error(None, f"There is probably a problem with the data, check line number {lineno}")
+        raise DataError(f"There is probably a problem with the data, check line number "
+                        f"{lineno}", lineno)
     return [mnr, lineno]
 
-def cut(string, **opts):
-    """ Mini implementation of the cut command from Linux. """
-
-    lines = string.splitlines()
-    new_lines = []
+def cut_function(**opts):
+    """ Returns a function of a single line (without its line ending) which
+    returns the fields of the line picked out by opts, joined by fs. See
+    cut_lines for the accepted keywords. If the line does not have enough
+    fields, the function raises a ValueError. """
 
     try:
         fs = opts['fs']
     except KeyError:
         fs = ","
 
-    mnr = get_num_fields(lines, fs=fs)[0]
+    nums = parse_num_range(opts['f'])
+    max_num = max(nums)
+    split = field_splitter(fs)
+    # itemgetter returns a single field rather than a tuple when it is only
+    # given one index, so ask for that field twice and use the first.
+    getter = itemgetter(*[i - 1 for i in nums], nums[0] - 1)
+    count = len(nums)
+
+    def project(line):
+        records = split(line)
+        if max_num > len(records):
+            raise ValueError(f"it only has {len(records)} fields.")
+        return fs.join(getter(records)[:count])
+
+    return project
+
+def cut_lines(source, **opts):
+    """ Generator version of cut, which works on one line at a time so that
+    files of any size can be cut in constant memory. source may be the name of
+    a file, or any iterable of lines (such as an open file or a list); line
+    endings are removed. The accepted keywords are
+        f - the range of fields to keep, as in cut, i.e. "1-2,4".
+        fs - the field separator, a regular expression. Default is ",".
+
+    Each line is only split once, and the number of fields is checked as the
+    line goes by. If a line does not have enough fields, a DataError is
+    raised which gives its line number. """
+
+    project = cut_function(**opts)
+
+    if isinstance(source, str):
+        source = read_lines(source)
+
+    for lineno, line in enumerate(source, 1):
+        try:
+            yield project(line.removesuffix('\n'))
+        except ValueError as e:
+            raise DataError(f"There was an error on line {lineno}, {e}", lineno) from e
 
-    if 'f' in opts.keys():
-        nums = parse_num_range(opts['f'])
-        max_num = max(nums)
-        if max_num > mnr:
-            print("invalid range given")
-            return '\n'.join(lines)
-
-        index = 1
-        for line in lines:
-            records = re.split(fs, line)
-            nr = len(records)
-            if max_num > nr:
-                print(f"There was an error on line {index}")
-                return '\n'.join(lines)
-            new_line = fs.join([records[i-1] for i in nums])
-            new_lines.append(new_line)
-            index = index + 1
-        new_string = '\n'.join(new_lines)
-        return new_string
+def cut(string, **opts):
+    """ Mini implementation of the cut command from Linux. See cut_lines for
+    the accepted keywords. If any line of string does not have enough fields,
+    a DataError is raised. string may also be a Table, in which case the cut
+    is done by picking out its columns, without touching any of the rows, and a
+    Table is returned. If string is a LineTable, the lines are cut as bytes
+    and the result is returned as bytes. """
+
+    if 'f' not in opts:
+        return string
+
+    if isinstance(string, Table):
+        return string.cut(parse_num_range(opts['f']))
+
+    if isinstance(string, LineTable):
+        return b'\n'.join(string.cut(parse_num_range(opts['f']), opts.get('fs', ',')))
+
+    return '\n'.join(cut_lines(string.splitlines(), **opts))
+
+
+class EchoWriter: # pylint: disable=R0903
+    """ A file-like object whose write method simply returns what it is given.
+    A csv.writer on top of it returns each formatted row from writerow, so
+    rows can be formatted one at a time without a StringIO. """
+
+    def write(self, text):
+        """ Return text unchanged. """
+        return text
+
+def csv_projector(header, columns):
+    """ Compile a selection of columns into a function which takes a row (a
+    list of fields) and returns the list of selected fields. columns is a comma
+    separated list whose items are either ranges of column numbers, as in cut,
+    or the names of columns in header (the list of fields of the first row). For
+    example "Last,First,4-5". The lookups are all done here, once, so the
+    projector itself is just an itemgetter.
+
+    Returns the list [projector, width], where width is the number of fields a
+    row needs to have for the projector to work. Raises a ValueError if a name
+    is not in header. """
+
+    names = [name.strip() for name in header]
+
+    indices = []
+    for item in columns.split(','):
+        item = item.strip()
+        if re.match(r'^[0-9]+(-[0-9]+)?$', item):
+            indices.extend(i - 1 for i in parse_num_range(item))
+        elif item in names:
+            indices.append(names.index(item))
+        else:
+            raise ValueError(f"There is no column named {item}.")
+
+    # As in cut_lines, ask for the first field twice so that itemgetter always
+    # returns a tuple.
+    getter = itemgetter(*indices, indices[0])
+    count = len(indices)
+
+    def projector(row):
+        return list(getter(row)[:count])
+
+    return [projector, max(indices) + 1]
+
+def csv_cut_lines(source, **opts):
+    """ Generator version of csv_cut. source may be the name of a file or any
+    iterable of lines. Unlike cut_lines, fields are read according to RFC
+    4180, so a quoted field such as "Carlson, Braden" is kept in one piece (and
+    may even contain line breaks), and the output is quoted again where
+    needed. The accepted keywords are
+        f - the columns to keep, see csv_projector, i.e. "Last,First" or "1-2".
+        fs - the field delimiter, a single character. Default is ",".
+        header - whether the first row holds the names of the columns. Default
+                 is True. If False, columns can only be chosen by number.
+
+    If a row does not have enough fields, a DataError is raised which gives
+    its line number, and a column name which is not in the header raises a
+    DataError as well. """
 
+    try:
+        fs = opts['fs']
+    except KeyError:
+        fs = ","
+
+    try:
+        header = opts['header']
+    except KeyError:
+        header = True
+
+    if isinstance(source, str):
+        with open_text(source, newline='') as f_handle:
+            yield from csv_cut_lines(f_handle, **opts)
+        return
+
+    # csv is only needed here, so it is not imported with the rest of the
+    # module (see tests/import-tests.py).
+    import csv # pylint: disable=C0415
+    reader = csv.reader(source, delimiter=fs)
+    # The writer only quotes a field holding a line break if the break is in
+    # its lineterminator, so the default one is kept and cut off each row.
+    writer = csv.writer(EchoWriter(), delimiter=fs, lineterminator='\r\n')
+
+    first = next(reader, None)
+    if first is None:
+        return
+    try:
+        [projector, width] = csv_projector(first if header else [], opts['f'])
+    except ValueError as e:
+        raise DataError(f"{e}") from e
+
+    # The header (if there is one) is cut just like any other row.
+    for row in chain([first], reader):
+        if not row:
+            # Blank lines are kept as they are.
+            yield ''
+            continue
+        if len(row) < width:
+            raise DataError(f"There was an error on line {reader.line_num}, it only "
+                            f"has {len(row)} fields.", reader.line_num)
+        yield writer.writerow(projector(row)).removesuffix('\r\n')
+
+def csv_cut(string, **opts):
+    """ Quote aware version of cut, for comma separated values. See
+    csv_cut_lines for the accepted keywords. If any row of string does not
+    have enough fields, or a column name is not found, a DataError is
+    raised. """
+
+    if 'f' not in opts:
+        return string
+
+    return '\n'.join(csv_cut_lines(string.splitlines(keepends=True), **opts))
 
 def parse_num_range(rng):
     """ Take a string, which represents a range of of numbers, and return a list
-    of the numbers in that range. """
+    of the numbers in that range. Raises a DataError if rng is not a comma
+    separated list of numbers and ranges (i.e. "1-2,4"), or if one of them
+    is 0 or a range runs backwards (i.e. "3-1"), since fields are numbered
+    from 1. """
 
     def parse_range(r):
         """ This method actually does the parsing of the range. It takes a
@@ -136,9 +674,6 @@ def parse_num_range(rng):
         num1 = re.search(r'^[0-9]+',r)
         num2 = re.search(r'-?[0-9]*$',r)
 
-        if num1 is None:
-            return 0
-
         num1_start = num1.span()[0] # Should always be zero.
         num2_start = num2.span()[0]
 
@@ -160,14 +695,17 @@ def parse_num_range(rng):
 
     rng = re.sub(r'\s+','',rng)
 
-    if re.search(r',',rng):
-        lst = re.split(r',', rng)
-        for r in lst:
-            [start, end] = parse_range(r)
-            for i in range(start, end + 1):
-                nums.append(i)
-    else:
-        [start, end] = parse_range(rng)
+    if re.match(r'^[0-9]+(-[0-9]+)?(,[0-9]+(-[0-9]+)?)*$', rng) is None:
+        raise DataError(f"{rng} is not a valid range of fields, such as 1-2,4.")
+
+    for r in re.split(r',', rng):
+        [start, end] = parse_range(r)
+        if start == 0:
+            raise DataError(f"{rng} is not a valid range of fields, the first field "
+                            "is 1.")
+        if end < start:
+            raise DataError(f"{rng} is not a valid range of fields, {r} runs "
+                            "backwards.")
         for i in range(start, end + 1):
             nums.append(i)
 
@@ -24,16 +24,42 @@ The TextTab class is an extension of the LinkTab class, and is a LinkTab which
 contains a Text object to be used to view and modify files. The constructor
 for this class has some keyword arguments, which are described in the class
 definition. """
+# pylint: disable=C0302
 
-from tkinter import Menu, Menubutton, StringVar, Text, Scrollbar
+from tkinter import Menu, Menubutton, StringVar, BooleanVar, Text, Scrollbar, TclError
 from tkinter import ttk
-from tkinter import filedialog, messagebox
+from tkinter import filedialog, messagebox, simpledialog
 from functools import partial
+import os
 import re
 import colors as color
 import fops as fo
+from pipeline import Pipeline
+from incremental import DifferenceIndex
+from reader import open_text
+from instrument import RECORDER, records
+from textview import VirtualView, VIRTUAL_SIZE, transform, csv_cut_lines
+from worker import Job, BACKGROUND, POLL
+from errors import FopsError
 import dialog as dlg
 
+def file_size(*filenames):
+    """ Returns the total size in bytes of filenames, see LinkTab.run_job. A
+    file which does not exist counts as empty, so that the operation itself
+    reports it. """
+
+    return sum(os.path.getsize(name) for name in filenames if os.path.isfile(name))
+
+def lock_controls(widget, locked):
+    """ Disables (or enables again, if locked is False) every button, entry,
+    combobox, spinbox and checkbutton inside widget, see OperationTab.lock.
+    The readonly state of a Combobox is kept. """
+
+    for child in widget.winfo_children():
+        if isinstance(child, (ttk.Button, ttk.Entry, ttk.Checkbutton)):
+            child.state(["disabled" if locked else "!disabled"])
+        lock_controls(child, locked)
+
 class LinkNotebook(ttk.Notebook):
     """ A notebook to hold tabs for the user. Currently this class has the
     add_tab method, and a style method. The style method sets the style for the
@@ -106,6 +132,12 @@ class LinkNotebook(ttk.Notebook):
         tabs = [tab.filename.get() for tab in self.tab_list if isinstance(tab, TextTab) ]
         return tabs
 
+    def get_text_tabs(self):
+        """ Returns a list of the TextTabs in this notebook, in the same order
+        as get_filenames. """
+
+        return [tab for tab in self.tab_list if isinstance(tab, TextTab)]
+
     def get_text_tab_labels(self):
         """ Returns a list of TextTab labels """
 
@@ -163,6 +195,13 @@ class LinkTab(ttk.Frame):
             menu = self.create_menubar(default_menu_dict)
 
         menu.grid(row=0, column=0,sticky="ew")
+        self.menu = menu
+
+        # The worker.Job running an operation for this tab, if any, and the
+        # frame holding its progress bar and Cancel button. See run_job.
+        self.job = None
+        self.progress = None
+        self.progress_text = StringVar()
 
 
     def create_menubar(self, menu_dict):
@@ -195,13 +234,14 @@ class LinkTab(ttk.Frame):
 
     def open_file(self, filename, permissions="r"):
         """ Opens a file for editing, if there is any error in opening the file, a
-        dialog is opened and the user is asked to select a file for opening. """
+        dialog is opened and the user is asked to select a file for opening. The
+        encoding of the file is detected and DOS line endings are removed as it
+        is read, see reader.open_text. """
 
         f_handle = 0
         while not f_handle:
             try:
-                # pylint: disable=W1514,R1732
-                f_handle = open(filename, permissions)
+                f_handle = open_text(filename, permissions)
                 return f_handle
             except FileNotFoundError as e:
                 dlg.log(f"{e}")
@@ -216,9 +256,113 @@ class LinkTab(ttk.Frame):
         index = self.master.index(self.master.select())
         self.master.forget(index)
 
+    def run_job(self, name, done, function, value, *args, size=None, **kwargs):
+        """ Runs function(value, *args, **kwargs), and calls done with its
+        result. If the input is at least worker.BACKGROUND long (len(value),
+        or size if it is given, such as for files), the function is run in a
+        worker process, see the worker module. Until it finishes, the tab is
+        locked and a progress bar with a Cancel button is shown, and done is
+        called from the event loop afterwards. Smaller inputs are run
+        directly, as a phase called name. Returns nothing; a FopsError raised
+        by function is shown in an ErrorDialog. """
+
+        if self.job is not None:
+            dlg.error(self, "Another operation is still running on this tab.")
+            return
 
+        if (len(value) if size is None else size) < BACKGROUND:
+            try:
+                result = RECORDER.call(name, function, value, *args, **kwargs)
+            except FopsError as e:
+                dlg.error(self, f"{e}")
+                return
+            done(result)
+            return
+
+        self.job = Job(function, value, *args, **kwargs)
+        # The operation is finished by check_job, once the worker is done.
+        self.job.operation = RECORDER.defer()
+        self.lock(True)
+        self.progress_text.set(f"{name} ...")
+        # The size of a file name says nothing about the input.
+        self.after(POLL, self.check_job, self.job, name, None if size else value, done)
+
+    def check_job(self, job, name, value, done):
+        """ Called every worker.POLL milliseconds while job runs, see run_job.
+        Once it is done, the tab is unlocked and done is called with the
+        result, or the error is shown. """
+
+        if job is not self.job:
+            # It was cancelled.
+            return
+        message = job.poll()
+        if message is None:
+            self.progress_text.set(f"{name} {job.elapsed():.1f} s")
+            self.after(POLL, self.check_job, job, name, value, done)
+            return
 
-class TextTab(LinkTab):
+        self.job = None
+        self.lock(False)
+        [status, result] = message
+        with RECORDER.resume(job.operation) as operation:
+            RECORDER.ran(name, job.seconds, value, result if status == "done" else None)
+            if status == "error":
+                if operation is not None:
+                    operation.error = f"{result}"
+                dlg.error(self, f"{result}")
+                return
+            done(result)
+
+    def cancel_job(self):
+        """ Stops the operation running in a worker, if there is one. Nothing
+        it did is kept. """
+
+        job = self.job
+        if job is None:
+            return
+        job.cancel()
+        self.job = None
+        self.lock(False)
+        with RECORDER.resume(job.operation) as operation:
+            if operation is not None:
+                operation.error = "Cancelled."
+
+    def lock(self, locked):
+        """ While an operation runs in a worker (locked is True), the menus of
+        this tab are disabled so nothing else is started on it, and the
+        progress bar is shown. """
+
+        for child in self.menu.winfo_children():
+            child.configure(state="disabled" if locked else "normal")
+        if self.progress is None:
+            self.progress = self.create_progress()
+        progress_bar = self.progress.winfo_children()[0]
+        if locked:
+            self.progress.grid(row=99, column=0, columnspan=2, sticky="EW", padx=5)
+            progress_bar.start(POLL)
+        else:
+            progress_bar.stop()
+            self.progress.grid_remove()
+
+    def create_progress(self):
+        """ Creates the frame holding the progress bar, a label giving the time
+        so far, and the Cancel button, see lock. It is not placed in the tab
+        until an operation starts. """
+
+        frm = ttk.Frame(self)
+        # The worker can't tell how far along it is, so the bar only shows
+        # that it is still going.
+        progress_bar = ttk.Progressbar(frm, mode="indeterminate", length=200)
+        progress_bar.pack(side="left", pady=2)
+        lbl = ttk.Label(frm, textvariable=self.progress_text)
+        lbl.pack(side="left", padx=5)
+        cancel = ttk.Button(frm, text="Cancel", command=self.cancel_job)
+        cancel.pack(side="left")
+        return frm
+
+
+
+class TextTab(LinkTab): # pylint: disable=R0902,R0904
     """ Tab which contains a large text area for viewing files, as well as a
     menu which contains the standard things for dealing with files, along with
     some operations which are specific to this application. """
@@ -240,7 +384,8 @@ class TextTab(LinkTab):
                               "Undo": self.undo,
                               "Redo": self.redo, 
                               "Cut": self.cut,
-                              "Strip": self.strip}}
+                              "Strip": self.strip,
+                              "Pipeline": self.run_pipeline}}
 
         super().__init__(master, **kwargs, menu=default_menu_dict)
 
@@ -249,6 +394,16 @@ class TextTab(LinkTab):
         self.filename = StringVar()
         self.textarea = None
         self.scrollbar = None
+        # The VirtualView showing the open file a window at a time, if it is
+        # larger than VIRTUAL_SIZE (see the textview module), otherwise None.
+        self.view = None
+        # Timings of the last operation run on this tab, see the instrument
+        # module.
+        self.status = StringVar()
+
+        # Functions to call with this tab whenever its text changes, see
+        # add_listener.
+        self.listeners = []
 
         # start counting rows at 1, since the menu (placed by
         # super().__init__() ) is at row 0.
@@ -262,6 +417,9 @@ class TextTab(LinkTab):
         except KeyError:
             self.textarea = self.create_file_area()
         super().grid_rowconfigure(self.row_counter - 1, weight=1)
+        self.create_status_bar()
+        RECORDER.add_listener(self.show_operation)
+        self.bind("<Destroy>", self.on_destroy)
 
     def create_file_area(self):
         """ Creates an area where text can be displayed.  Returns both a reference to the
@@ -289,6 +447,38 @@ class TextTab(LinkTab):
         lbl.grid(row=self.row_counter,column=0,sticky="W")
         self.row_counter = self.row_counter + 1
 
+    def create_status_bar(self):
+        """ Creates a label below the text area which shows how long the last
+        operation run on this tab took, see show_operation. """
+
+        lbl = ttk.Label(self, textvariable=self.status)
+        lbl.grid(row=self.row_counter, column=0, columnspan=2, sticky="W", padx=5)
+        self.row_counter = self.row_counter + 1
+
+    def close(self):
+        """ Close this tab, see LinkTab.close. It stops hearing about
+        operations, and a file shown by a VirtualView is let go. """
+
+        RECORDER.remove_listener(self.show_operation)
+        self.close_view()
+        super().close()
+
+    def on_destroy(self, event):
+        """ Called when this tab (or one of its children) is destroyed. Once
+        the tab itself is, it stops hearing about operations, so the RECORDER
+        does not keep it alive. """
+
+        if event.widget is self:
+            RECORDER.remove_listener(self.show_operation)
+
+    def show_operation(self, operation):
+        """ Called by the RECORDER (see the instrument module) whenever an
+        operation finishes. If it was run on this tab, its timings are shown
+        in the status bar. """
+
+        if operation.source is self:
+            self.status.set(operation.summary())
+
     def open_file(self, filename, permissions="r"):
         """ Opens a file in the TextTab's textarea. The way this is done is by passing
         the actual open operation to the parent, then simply loading the text into
@@ -297,11 +487,18 @@ class TextTab(LinkTab):
         returns nothing and stops. """
 
         f_handle = super().open_file(filename, permissions)
-        if f_handle == '':
+        if not f_handle:
             return
-        self.textarea.delete(1.0,"end")
-        self.textarea.insert(1.0, f_handle.read())
-        self.textarea.index(1.0)
+        self.close_view()
+        if os.path.getsize(f_handle.name) > VIRTUAL_SIZE:
+            # Only the lines around the visible ones are put in the textarea.
+            f_handle.close()
+            self.view = VirtualView(self.textarea, self.scrollbar, f_handle.name)
+            self.status.set(f"{len(self.view):,} lines, shown a window at a time.")
+        else:
+            self.textarea.delete(1.0,"end")
+            self.textarea.insert(1.0, f_handle.read())
+            self.textarea.index(1.0)
 
         # Set the filename_label variable.
         temp_filename = f_handle.name
@@ -316,7 +513,21 @@ class TextTab(LinkTab):
         # Since we just opened a new file, make sure that the edit_modified flag
         # is turned off so there is no * next to the file name.
         self.textarea.edit_modified(False)
+        self.notify_listeners()
+
+    def close_view(self):
+        """ Stops showing the file through self.view, if it is. """
 
+        if self.view is not None:
+            self.view.close()
+            self.view = None
+
+    def lock(self, locked):
+        """ See LinkTab.lock. The text can't be edited either while an
+        operation runs, since its result will replace the text. """
+
+        super().lock(locked)
+        self.textarea.configure(state="disabled" if locked else "normal")
 
     # pylint: disable=W0613
     def on_modified(self, event):
@@ -325,8 +536,35 @@ class TextTab(LinkTab):
         already. """
 
         if self.textarea.edit_modified():
+            if self.view is not None:
+                self.view.edited = True
             if not self.filename_label.get().endswith("*"):
                 self.filename_label.set(self.filename_label.get() + "*")
+            if self.listeners:
+                # Tk only sends <<Modified>> when the flag changes, so turn it
+                # back off to hear about the next edit as well. The * stays
+                # until the file is saved.
+                self.textarea.edit_modified(False)
+                self.notify_listeners()
+
+    def add_listener(self, function):
+        """ Calls function, with this tab as its argument, every time the
+        text of this tab changes, until remove_listener is called. """
+
+        if function not in self.listeners:
+            self.listeners.append(function)
+
+    def remove_listener(self, function):
+        """ Stops calling function when the text of this tab changes. """
+
+        if function in self.listeners:
+            self.listeners.remove(function)
+
+    def notify_listeners(self):
+        """ Calls each function given to add_listener with this tab. """
+
+        for function in list(self.listeners):
+            function(self)
 
 
     def save_file(self):
@@ -337,8 +575,12 @@ class TextTab(LinkTab):
             self.filename.set(filedialog.asksaveasfilename())
             self.filename_label.set(re.sub(r"(.*)/([^/]*)$",r'\2',self.filename.get()))
         try:
-            # pylint: disable=W1514,R1732
-            f_handle = open(self.filename.get(), "w", encoding='utf-8')
+            if self.view is not None:
+                # Written from the lines of the file and the edits made to it.
+                self.view.save(self.filename.get())
+            else:
+                with open(self.filename.get(), "w", encoding='utf-8') as f_handle:
+                    f_handle.write(self.textarea.get(1.0, "end-1c"))
         except FileNotFoundError:
             dlg.log(f"{self.filename} was not found.")
             return
@@ -348,19 +590,23 @@ class TextTab(LinkTab):
 
         self.textarea.edit_modified(False)
         self.filename_label.set(re.sub(r"(.*)\*$",r"\1",self.filename_label.get()))
-        f_handle.write(self.textarea.get(1.0, "end-1c"))
 
     def new_file(self):
         """ If there are unsaved changes, save them, then clear the textarea and reset
         the filename label so the user can start a new file. """
 
-        if self.textarea.edit_modified():
+        # The edit_modified flag is turned off by on_modified while this tab
+        # has listeners, but the * is only removed by save_file.
+        if self.filename_label.get().endswith("*"):
             self.save_file()
+        self.close_view()
         self.textarea.delete(1.0,"end")
         self.filename.set('')
         self.textarea.edit_modified(False)
         self.filename_label.set("New File")
+        self.notify_listeners()
 
+    @records("capitalize")
     def capitalize_names(self):
         """ Capitalize each word of the current file. Send a warning to the user first
         confirming that this is what they want to do. """
@@ -370,21 +616,31 @@ class TextTab(LinkTab):
         if not messagebox.askyesno("Are you sure?", msg):
             return
 
+        if self.view is not None:
+            self.run_on_view(Pipeline().capitalize().lines)
+            return
+
         # mark this point
         self.mark_jump_point()
 
         content = self.get_content()
-        content = fo.capitalize_words(content)
-        self.replace(1.0,"end",content)
+        self.run_job("fops.capitalize_words", partial(self.replace, 1.0, "end"),
+                     fo.capitalize_words, content)
 
+    @records("sort")
     def sort(self):
         """ Sort lines of the textbox """
 
+        if self.view is not None:
+            # An external sort, so the lines need not fit in memory.
+            self.run_on_view(Pipeline().sort().lines)
+            return
+
         # mark this point
         self.mark_jump_point()
         s = self.get_content()
-        s = fo.sort_lines(s)
-        self.replace(1.0,"end-1c",s)
+        self.run_job("fops.sort_lines", partial(self.replace, 1.0, "end-1c"),
+                     fo.sort_lines, s)
 
     def mark_jump_point(self):
         """ Make the point at which this is called a place the user can jump
@@ -400,66 +656,166 @@ class TextTab(LinkTab):
         return self.get_content().splitlines()
 
     def get_content(self):
-        """ Get the content of the text area, as a single string. """
+        """ Get the content of the text area, as a single string. If the file is
+        shown by self.view, this is the whole file, not just the lines in the
+        text area. """
 
-        return self.textarea.get(1.0,"end-1c")
+        with RECORDER.phase("get_content") as phase:
+            if self.view is not None:
+                return phase.gives(self.view.text())
+            return phase.gives(self.textarea.get(1.0,"end-1c"))
 
     def undo(self):
-        """ Use the undo feature from the textbox. """
-        self.textarea.edit_undo()
+        """ Use the undo feature from the textbox. If the file is shown by
+        self.view and there are no edits left to undo in the text area, the
+        last operation is undone instead. """
+        if self.view is None:
+            self.textarea.edit_undo()
+            return
+        try:
+            self.textarea.edit_undo()
+        except TclError:
+            self.view.undo()
 
     def redo(self):
-        """ Use the redo feature from the textbox. """
-        self.textarea.edit_redo()
+        """ Use the redo feature from the textbox, see undo. """
+        if self.view is None:
+            self.textarea.edit_redo()
+            return
+        try:
+            self.textarea.edit_redo()
+        except TclError:
+            self.view.redo()
 
     def replace(self, start, end, string):
         """ Call the replace method of the textarea in this tab. """
         self.mark_jump_point()
-        self.textarea.delete(start,end)
-        self.textarea.insert(start,string)
-
+        with RECORDER.phase("insert") as phase:
+            phase.takes(string)
+            self.textarea.delete(start,end)
+            self.textarea.insert(start,string)
+
+    def run_on_view(self, function, **opts):
+        """ Runs an operation on the file shown by self.view, rather than on
+        the text area, see textview.transform. function takes an iterable of
+        lines and returns one, such as Pipeline.lines, and is run in a worker
+        (see run_job) unless the file is small. """
+
+        source = self.view.source()
+        output = self.view.output()
+        self.run_job("textview.transform", partial(self.adopt_output, output), transform,
+                     source, output, function, size=os.path.getsize(source), **opts)
+
+    def adopt_output(self, output, result): # pylint: disable=W0613
+        """ Shows output, the file written by run_on_view, in self.view. """
+
+        self.view.adopt(output)
+        if not self.filename_label.get().endswith("*"):
+            self.filename_label.set(self.filename_label.get() + "*")
+        self.notify_listeners()
+
+    @dlg.shows_errors
+    @records("cut")
     def cut(self,**opts):
-        """ Call the cut method of the fops module on the current text. """
+        """ Call the cut method of the fops module on the current text. If the
+        csv keyword is True (or the user checks the box in the CutDialog), the
+        quote aware fops.csv_cut is used instead, and columns may be given by
+        name. """
         rng = None
         fs = None
+        quoted = False
         try:
             rng = opts['r']
             if 'fs' in opts.keys():
                 fs = opts['fs']
             else:
                 fs = ','
+            quoted = opts.get('csv', False)
 
         except KeyError:
-            [rng, fs] = dlg.ask_num_range(self)
+            [rng, fs, quoted] = dlg.ask_num_range(self)
 
         # ask_num_range returns None if the user presses Cancel. In this case, just stop here.
         if rng is None:
             return
 
-        content = self.get_content()
-        new_content = fo.cut(content,f=rng,fs=fs)
-        self.replace(1.0,"end", new_content)
+        if self.view is not None and quoted:
+            self.run_on_view(csv_cut_lines, f=rng, fs=fs)
+            return
+        if self.view is not None:
+            self.run_on_view(Pipeline().cut(f=rng, fs=fs).lines)
+            return
 
+        content = self.get_content()
+        if quoted:
+            self.run_job("fops.csv_cut", partial(self.replace, 1.0, "end"),
+                         fo.csv_cut, content, f=rng, fs=fs)
+        else:
+            self.run_job("fops.cut", partial(self.replace, 1.0, "end"),
+                         fo.cut, content, f=rng, fs=fs)
+
+    @records("strip")
     def strip(self, **opts):
-        """ Takes the contents of the textarea and strips all instances of char
-        from it. """
+        """ Takes the contents of the textarea and strips all instances of each
+        character in char from it. """
 
         try:
             char = opts['char']
         except KeyError:
             char = dlg.ask_char(self)
 
-        if char == '':
+        if not char:
+            return
+
+        if self.view is not None:
+            self.run_on_view(Pipeline().strip(char).lines)
             return
 
         content = self.get_content()
-        new_content = fo.strip(content, char)
-        self.replace(1.0,"end", new_content)
+        self.run_job("fops.strip", partial(self.replace, 1.0, "end"), fo.strip, content, char)
+
+    @records("pipeline")
+    def run_pipeline(self, **opts):
+        """ Runs several operations over the contents of the textarea in one
+        pass, see the pipeline module. The result replaces the contents as a
+        single edit, so one undo takes back the whole pipeline. Keywords:
+          spec - the pipeline to run, i.e. "strip chars=. | capitalize | sort".
+                 If not given, the user is asked for it. """
+
+        try:
+            spec = opts['spec']
+        except KeyError:
+            spec = simpledialog.askstring("Pipeline", "Operations to run, separated \
+by |, i.e.\nstrip chars=. | capitalize | cut f=1-2 | sort | difference other=master.txt",
+                                          parent=self)
+
+        if not spec:
+            return
+
+        try:
+            pipeline = Pipeline.parse(spec)
+        except ValueError as e:
+            dlg.error(self, f"{e}")
+            return
+
+        if self.view is not None:
+            self.run_on_view(pipeline.lines)
+            return
+
+        # mark this point
+        self.mark_jump_point()
+        self.run_job("pipeline", partial(self.replace, 1.0, "end"),
+                     pipeline.run, self.get_content())
 
     def scroll(self,*args):
         """ Command that is performed when the scrollbar is moved or one of it's
         buttons is clicked, This adjusts the view of the file to match that of
-        the scrollbar. """
+        the scrollbar. If the file is shown by self.view, the scrollbar stands
+        for the whole file, so the view moves the window of lines instead. """
+
+        if self.view is not None:
+            self.view.scroll(*args)
+            return
 
         if len(args) == 2:
             # should be something like ("moveto", 'number')
@@ -479,6 +835,7 @@ class TextTab(LinkTab):
 
 
 
+# pylint: disable=R0902
 class OperationTab(LinkTab):
     """ This tab contains the controls for taking diffs of files (not line by
     line) which are contained in the other tabs of the app. """
@@ -500,6 +857,7 @@ class OperationTab(LinkTab):
         master.bind("<<NotebookTabChanged>>", self.update_tab_list)
 
         self.output = None # Text()
+        self.controls = None # ttk.Frame, see create_controls
 
         self.row_counter = 1 # int (obviously)
 
@@ -509,6 +867,38 @@ class OperationTab(LinkTab):
         self.filename = StringVar() # String
         self.filename.set("NONE")
 
+        # How lines are matched when taking a difference. This is kept outside
+        # of the controls frame so the choice survives update_tab_list.
+        self.match_modes = {"Substring": "substring",
+                            "Exact line": "exact",
+                            "Regular expression": "regex"}
+        self.match_mode = StringVar() # String
+        self.match_mode.set("Substring")
+
+        # Columns (in the range syntax of cut) to compare, and their
+        # separator. If no columns are given, whole lines are compared.
+        self.key_columns = StringVar() # String
+        self.key_separator = StringVar() # String
+        self.key_separator.set(",")
+
+        # Largest edit distance used by the fuzzy difference.
+        self.fuzzy_distance = StringVar() # String
+        self.fuzzy_distance.set("2")
+
+        # The result of the last partition, and which of its groups is shown.
+        self.partition_result = None # dict, see fops.partition
+        self.partition_views = {"Only in first tab": "left",
+                                "Only in second tab": "right",
+                                "In both tabs": "both"}
+        self.partition_view = StringVar() # String
+        self.partition_view.set("Only in first tab")
+
+        # The live difference, which is kept up to date as the two tabs it
+        # was started on are edited. See start_live.
+        self.live = BooleanVar() # bool
+        self.live.set(False)
+        self.live_difference = None # LiveDifference
+
         # Create the layout for this tab
 
         self.create_output_area()
@@ -520,11 +910,9 @@ class OperationTab(LinkTab):
         controls and recreates them. """
 
         self.tab_list = self.master.get_text_tab_labels()
-        # Destroy the contols frame before recreating it, this is HIGHLY
-        # dependent on the order in which create_output_area and create_controls
-        # are called and should eventually be changed to make sure that the
-        # controls frame is really the one being removed here.
-        self.winfo_children()[2].destroy()
+        # Destroy the contols frame before recreating it.
+        if self.controls is not None:
+            self.controls.destroy()
         self.create_controls()
 
     def save_as(self):
@@ -591,11 +979,91 @@ class OperationTab(LinkTab):
 
         self.file2_select.pack(pady=5)
 
-        buttons = {'Take Difference': self.take_difference}
+        # Create the Combobox for choosing how lines are matched
+        mode_label = ttk.Label(frm, text="Match lines by:",
+                               anchor="w", width=50)
+        mode_label.pack()
+        mode_select = ttk.Combobox(frm, values=list(self.match_modes),
+                                   textvariable=self.match_mode,
+                                   state="readonly")
+        mode_select.pack(pady=5)
+
+        self.create_key_controls(frm)
+
+        buttons = {'Take Difference': self.take_difference,
+                   'Fuzzy Difference': self.take_fuzzy_difference}
         button_box = self.create_button_box(frm, buttons,"h")
         button_box.pack(pady=5)
+        live_check = ttk.Checkbutton(frm, text="Live difference (exact lines), updated \
+as the tabs are edited", variable=self.live, command=self.toggle_live)
+        live_check.pack(pady=5)
+
+        # Create the Spinbox for the fuzzy difference distance
+        distance_label = ttk.Label(frm, text="Fuzzy difference, largest edit distance:",
+                                   anchor="w", width=50)
+        distance_label.pack()
+        distance_select = ttk.Spinbox(frm, from_=1, to=10, width=5,
+                                      textvariable=self.fuzzy_distance)
+        distance_select.pack(pady=5)
+
+        # Create the controls for partitioning the two tabs
+        partition_label = ttk.Label(frm, text="Partition, show lines:",
+                                    anchor="w", width=50)
+        partition_label.pack()
+        view_select = ttk.Combobox(frm, values=list(self.partition_views),
+                                   textvariable=self.partition_view,
+                                   state="readonly")
+        view_select.bind("<<ComboboxSelected>>", self.show_partition)
+        view_select.pack(pady=5)
+        button_box = self.create_button_box(frm, {'Partition': self.take_partition}, "h")
+        button_box.pack(pady=5)
         frm.grid(row=self.row_counter,column=0,sticky="NS")
+        self.controls = frm
+        if self.job is not None:
+            # Recreated by update_tab_list while an operation runs.
+            lock_controls(frm, True)
+
+    def create_key_controls(self, frm):
+        """ Create the Entries which let the user choose which columns of each
+        line are compared, and the separator of those columns. These are packed
+        into the frame frm. """
+
+        # Create the Entries for choosing which columns are compared
+        columns_label = ttk.Label(frm, text="Key columns, i.e. 1-2 (blank compares \
+whole lines, otherwise lines are matched exactly):",
+                                  anchor="w", width=50, wraplength=350)
+        columns_label.pack()
+        columns_entry = ttk.Entry(frm, textvariable=self.key_columns)
+        columns_entry.pack(pady=5)
+        separator_label = ttk.Label(frm, text="Key column separator (default ,):",
+                                    anchor="w", width=50)
+        separator_label.pack()
+        separator_entry = ttk.Entry(frm, textvariable=self.key_separator)
+        separator_entry.pack(pady=5)
+
+    def key_options(self):
+        """ Returns the keywords for the fops difference functions which
+        select the key columns entered by the user, i.e. {'f': "1-2", 'fs':
+        ","}, or an empty dictionary if no columns were entered. If the columns
+        are not a valid range, the user is told so and None is returned. This
+        only saves starting the operation, fops.parse_num_range checks the
+        range as well (such as 0, or 3-1). """
+
+        columns = self.key_columns.get().strip()
+        if columns == "":
+            return {}
+
+        if re.match(r'^\d+(-\d+)?(,\d+(-\d+)?)*$', columns) is None:
+            dlg.error(self, f"{columns} is not a valid range of columns.")
+            return None
 
+        separator = self.key_separator.get()
+        if separator == "":
+            separator = ","
+        return {'f': columns, 'fs': separator}
+
+    @dlg.shows_errors
+    @records("difference")
     def take_difference(self):
         """ Takes a difference (not line by line) of the files specified by the
         current selection in the two ComboBoxes in this Tab. Specifically, it
@@ -608,12 +1076,182 @@ class OperationTab(LinkTab):
         if idx1 == -1 or idx2 == -1:
             return
 
+        key_opts = self.key_options()
+        if key_opts is None:
+            return
+
+        self.output.delete(1.0, "end")
+        filename_one = self.master.get_filenames()[idx1]
+        filename_two = self.master.get_filenames()[idx2]
+        if key_opts:
+            mode = "exact"
+        else:
+            mode = self.match_modes[self.match_mode.get()]
+        self.run_job("fops.difference",
+                     lambda nonmatches: self.show_output('\n'.join(nonmatches)),
+                     fo.difference, filename_one, filename_two,
+                     size=file_size(filename_one, filename_two), mode=mode, **key_opts)
+
+    def toggle_live(self):
+        """ Starts or stops the live difference, following the Checkbutton. """
+
+        if self.live.get():
+            self.start_live()
+        else:
+            self.stop_live()
+
+    def start_live(self):
+        """ Starts the live difference of the two tabs currently selected in
+        the ComboBoxes, using the key columns entered by the user. Lines are
+        always matched exactly (see incremental.DifferenceIndex). From then
+        on, every change to either tab updates the output, and only the lines
+        which changed are looked at. """
+
+        self.stop_live()
+        idx1 = self.file1_select.current()
+        idx2 = self.file2_select.current()
+        key_opts = self.key_options()
+        if idx1 == -1 or idx2 == -1 or key_opts is None:
+            self.live.set(False)
+            return
+
+        tabs = self.master.get_text_tabs()
+        if tabs[idx1].view is not None or tabs[idx2].view is not None:
+            self.refuse_live()
+            return
+        self.output.delete(1.0, "end")
+        self.live_difference = LiveDifference(self, [tabs[idx1], tabs[idx2]], **key_opts)
+        self.live_difference.refresh()
+
+    def stop_live(self):
+        """ Stops the live difference, if there is one. The output is left as
+        it is. """
+
+        if self.live_difference is not None:
+            self.live_difference.stop()
+        self.live_difference = None
+
+    def refuse_live(self):
+        """ Stops the live difference, because one of its tabs shows a file a
+        window at a time (see the textview module). Keeping it up to date
+        would mean reading the whole file into memory on every edit. """
+
+        self.stop_live()
+        self.live.set(False)
+        dlg.error(self, "The live difference can't be used on files larger than "
+                        f"{VIRTUAL_SIZE // 2**20} MB, use Difference instead.")
+
+    def lock(self, locked):
+        """ See LinkTab.lock. The controls are disabled as well, so that no
+        other operation is started from this tab, and the options of the one
+        running are not changed under it. """
+
+        super().lock(locked)
+        lock_controls(self.controls, locked)
+
+    @dlg.shows_errors
+    @records("fuzzy difference")
+    def take_fuzzy_difference(self):
+        """ Like take_difference, but every line of the first file which is
+        not found in the second file is shown next to the closest line of the
+        second file (and its edit distance), if there is one within the
+        distance chosen in the Spinbox. These are most likely typos. """
+
+        idx1 = self.file1_select.current()
+        idx2 = self.file2_select.current()
+
+        if idx1 == -1 or idx2 == -1:
+            return
+
+        try:
+            distance = int(self.fuzzy_distance.get())
+        except ValueError:
+            dlg.error(self, "The edit distance must be a whole number.")
+            return
+
+        key_opts = self.key_options()
+        if key_opts is None:
+            return
+
         self.output.delete(1.0, "end")
         filename_one = self.master.get_filenames()[idx1]
         filename_two = self.master.get_filenames()[idx2]
-        nonmatches = fo.difference(filename_one, filename_two)
-        self.output.insert(1.0, '\n'.join(nonmatches))
+        self.run_job("fops.fuzzy_difference", self.show_fuzzy_difference,
+                     fo.fuzzy_difference, filename_one, filename_two,
+                     size=file_size(filename_one, filename_two), distance=distance,
+                     **key_opts)
+
+    def show_fuzzy_difference(self, results):
+        """ Shows the results of fops.fuzzy_difference, see
+        take_fuzzy_difference. """
+
+        lines = []
+        for [line, candidate, dist] in results:
+            if candidate is None:
+                lines.append(line)
+            else:
+                lines.append(f"{line} -> {candidate} ({dist})")
+        self.show_output('\n'.join(lines))
+
+
+    @dlg.shows_errors
+    @records("partition")
+    def take_partition(self):
+        """ Splits the lines of the files specified by the current selection in
+        the two ComboBoxes into the lines found only in the first file, only in
+        the second file, and in both files. All three groups are computed at
+        once and kept, so switching between them with the view Combobox does
+        not require running the partition again. """
+
+        idx1 = self.file1_select.current()
+        idx2 = self.file2_select.current()
+
+        if idx1 == -1 or idx2 == -1:
+            return
+
+        key_opts = self.key_options()
+        if key_opts is None:
+            return
+
+        filename_one = self.master.get_filenames()[idx1]
+        filename_two = self.master.get_filenames()[idx2]
+        self.run_job("fops.partition", self.keep_partition, fo.partition,
+                     filename_one, filename_two,
+                     size=file_size(filename_one, filename_two), **key_opts)
+
+    def keep_partition(self, result):
+        """ Keeps result, the groups returned by fops.partition, and shows the
+        one selected in the view Combobox. """
+
+        self.partition_result = result
+        self.show_partition()
+
+    def show_partition(self, event=None):
+        """ Shows the group of the last partition selected in the view
+        Combobox, with the line numbers at which each line was found in the
+        first and second files. """
+
+        if self.partition_result is None:
+            return
+
+        group = self.partition_result[self.partition_views[self.partition_view.get()]]
+        lines = []
+        for [line, numbers1, numbers2] in group:
+            where = []
+            if numbers1:
+                where.append("first: " + ", ".join(str(n) for n in numbers1))
+            if numbers2:
+                where.append("second: " + ", ".join(str(n) for n in numbers2))
+            lines.append(f"{line}\t({'; '.join(where)})")
+
+        self.output.delete(1.0, "end")
+        self.show_output('\n'.join(lines))
 
+    def show_output(self, text):
+        """ Inserts text at the start of the output area. """
+
+        with RECORDER.phase("insert") as phase:
+            self.output.insert(1.0, phase.takes(text))
 
     def create_button_box(self, master, button_dict, orientation):
         """ Creates a ttk.Frame which contains the buttons defined in the
@@ -632,3 +1270,60 @@ class OperationTab(LinkTab):
             elif orientation in ('horizontal', 'h'):
                 btn.pack(side="left",padx=3)
         return frm
+
+class LiveDifference:
+    """ The live difference shown by an OperationTab: the lines of one TextTab
+    which are not in another, kept up to date as either of them is edited.
+    Only the lines which changed are looked at, see
+    incremental.DifferenceIndex. Started by OperationTab.start_live. """
+
+    def __init__(self, operations, tabs, **opts):
+        """ operations is the OperationTab which shows the difference, tabs
+        the list [first, second] of the TextTabs it is taken between, and opts
+        the keywords of fops.key_function. """
+
+        self.operations = operations
+        self.tabs = tabs
+        self.index = DifferenceIndex(**opts)
+        # The sides of index waiting to be updated.
+        self.changed = {0, 1}
+        for tab in tabs:
+            tab.add_listener(self.on_change)
+
+    def stop(self):
+        """ Stops listening to the tabs. """
+
+        for tab in self.tabs:
+            tab.remove_listener(self.on_change)
+
+    def on_change(self, tab):
+        """ Called by one of the tabs when its text changes. The output is
+        updated once Tk is idle, so a burst of changes (such as a paste) is
+        only applied once. """
+
+        if not self.changed:
+            self.operations.after_idle(self.refresh)
+        self.changed.update(side for side in (0, 1) if self.tabs[side] is tab)
+
+    @records("live difference")
+    def refresh(self):
+        """ Applies the changes to the tabs, and shows the lines of the first
+        tab which are not in the second. The second tab is done first, so the
+        new lines of the first are checked against it. """
+
+        if self.operations.live_difference is not self:
+            # Stopped since the refresh was scheduled.
+            return
+        if any(tab.view is not None for tab in self.tabs):
+            # One of the tabs has since opened a large file.
+            self.operations.refuse_live()
+            return
+        changed = False
+        for side in sorted(self.changed, reverse=True):
+            content = self.tabs[side].get_content()
+            with RECORDER.phase("incremental.update") as phase:
+                changed = self.index.update(side, phase.takes(content)) or changed
+        self.changed = set()
+        if changed:
+            self.operations.output.delete(1.0, "end")
+            self.operations.show_output('\n'.join(self.index.results()[1]))
@@ -0,0 +1,350 @@
+""" incremental.py
+Author: Braden Carlson
+Date: October 2026
+
+Keeps the result of an exact difference (see fops.difference) up to date while
+its two files are being edited, without starting over each time. Run it with
+
+    python -m incremental accepted.txt master.txt --match found.txt --no-match missing.txt
+
+and it will watch both files, rewriting found.txt and missing.txt whenever
+either of them changes, until it is stopped with Ctrl-C.
+
+The files are watched by polling their modification time and size (os.stat),
+so nothing outside the standard library is needed. When a file changes, it is
+read and compared with what it held before: the text the two have in common at
+the start and at the end is skipped (a block at a time, so the comparison is
+done in C), and the lines in between are the ones which were added and
+removed. Only the keys of those lines are computed, and they are applied as
+deltas:
+  - a line added to or removed from the first file is added to or removed
+    from the matches or the nonmatches, depending on whether its key is in
+    the second file.
+  - when the last line with some key is removed from the second file (or the
+    first line with a new key is added), only the lines of the first file with
+    that key are moved between the matches and the nonmatches.
+So the work done for a change depends on the size of the change, apart from
+reading the file and writing the results.
+
+The bookkeeping itself is done by DifferenceIndex, which is given the new
+text directly rather than reading files, so that the live difference of the
+OperationTab can use it on the contents of two TextTabs. """
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+from collections import Counter
+from itertools import chain, repeat
+from errors import FopsError, MissingFileError
+from reader import read_text
+import fops
+
+# Default number of seconds between checks of the files.
+INTERVAL = 0.1
+
+# Number of characters compared at a time by common_prefix and common_suffix.
+BLOCK = 65536
+
+class DifferenceIndex: # pylint: disable=R0902
+    """ The matches and nonmatches of the exact difference of two texts,
+    which are brought up to date with update as the texts change. A line of
+    the first text is a match if its key (see fops.key_function) is the key of
+    some line of the second. The accepted keywords are those of
+    fops.key_function. """
+
+    def __init__(self, **opts):
+        """ Both texts start out empty. """
+
+        self.key_of = fops.key_function(**opts)
+        self.texts = ['', '']
+
+        # Key of each distinct line of the first text, the lines of the first
+        # text with each key, and the number of lines of the second text with
+        # each key.
+        self.keys = {}
+        self.by_key = {}
+        self.right_keys = Counter()
+
+        # Each distinct line of the first text is in exactly one of these,
+        # with the number of times it appears.
+        self.matches = {}
+        self.nonmatches = {}
+        # Whether the matches and nonmatches have changed since they were
+        # last written (see IncrementalDifference.write).
+        self.unwritten = [True, True]
+
+    def update(self, side, text):
+        """ Replaces the first (side 0) or second (side 1) text with text, and
+        applies the lines which were added and removed. Returns True if the
+        matches or nonmatches changed. """
+
+        if text and not text.endswith('\n'):
+            text = text + '\n'
+        [added, removed] = changed_lines(self.texts[side], text)
+        self.texts[side] = text
+        if side == 0:
+            return self.update_left(added, removed)
+        return self.update_right(added, removed)
+
+    def update_left(self, added, removed):
+        """ Applies the Counters of lines added to and removed from the first
+        text.
+        Returns True if anything changed. """
+
+        for line, count in removed.items():
+            group = self.matches if line in self.matches else self.nonmatches
+            self.unwritten[group is self.nonmatches] = True
+            group[line] = group[line] - count
+            if group[line] <= 0:
+                del group[line]
+                key = self.keys.pop(line)
+                del self.by_key[key][line]
+                if not self.by_key[key]:
+                    del self.by_key[key]
+
+        for line, count in added.items():
+            if line not in self.keys:
+                key = self.key_of(line)
+                self.keys[line] = key
+                self.by_key.setdefault(key, {})[line] = None
+            group = self.matches if self.keys[line] in self.right_keys else self.nonmatches
+            self.unwritten[group is self.nonmatches] = True
+            group[line] = group.get(line, 0) + count
+
+        return bool(added or removed)
+
+    def update_right(self, added, removed):
+        """ Applies the Counters of lines added to and removed from the second
+        text. Only the keys which appear or disappear from it altogether move
+        lines of the first text between the matches and nonmatches. Returns True if
+        anything moved. """
+
+        right_keys = self.right_keys
+        gone = set()
+        for line, count in removed.items():
+            key = self.key_of(line)
+            right_keys[key] = right_keys[key] - count
+            if right_keys[key] <= 0:
+                del right_keys[key]
+                gone.add(key)
+        new = set()
+        for line, count in added.items():
+            key = self.key_of(line)
+            if key not in right_keys:
+                new.add(key)
+            right_keys[key] = right_keys[key] + count
+
+        # A key which was removed and added back again has not moved.
+        moved = False
+        for keys, source, target in ((gone - new, self.matches, self.nonmatches),
+                                     (new - gone, self.nonmatches, self.matches)):
+            for key in keys:
+                for line in self.by_key.get(key, ()):
+                    target[line] = source.pop(line)
+                    moved = True
+        if moved:
+            self.unwritten = [True, True]
+        return moved
+
+    def results(self):
+        """ Returns the list [matches, nonmatches], each a list of lines of
+        the first text just like fops.match_exact. A line appearing several
+        times in it appears that many times here. Lines are in the order in which
+        they were first read, except that a line which moved from one list to
+        the other goes at the end. """
+
+        return [expand(self.matches), expand(self.nonmatches)]
+
+class IncrementalDifference(DifferenceIndex):
+    """ A DifferenceIndex of the contents of the files file1 and file2, which
+    is brought up to date with refresh. """
+
+    def __init__(self, file1, file2, **opts):
+        """ Reads both files. Raises a MissingFileError if either does not
+        exist. """
+
+        super().__init__(**opts)
+        self.files = [file1, file2]
+        # os.stat results of each file when it was last read.
+        self.stats = [None, None]
+        self.refresh()
+
+    def refresh(self):
+        """ Checks whether either file has changed since it was last read, and
+        if so applies the lines which were added and removed. Returns True if
+        the matches or nonmatches changed. Raises a MissingFileError if one of
+        the files has been removed. """
+
+        changed = False
+        # file2 first, so that new lines of file1 are checked against it.
+        for side in (1, 0):
+            filename = self.files[side]
+            try:
+                stat = os.stat(filename)
+            except FileNotFoundError as e:
+                raise MissingFileError(f"{filename} does not exist.", [filename]) from e
+            if self.stats[side] is not None and \
+               (stat.st_mtime_ns, stat.st_size) == self.stats[side]:
+                continue
+            self.stats[side] = (stat.st_mtime_ns, stat.st_size)
+
+            changed = self.update(side, read_text(filename)) or changed
+        return changed
+
+    def write(self, match=None, no_match=None):
+        """ Writes the matches to the file match and the nonmatches to the
+        file no_match, either of which may be None. Only the ones which have
+        changed since the last call are written. Each file is written to a
+        temporary file first, so a program reading it never sees half of
+        it. """
+
+        groups = (self.matches, self.nonmatches)
+        for side, filename in enumerate((match, no_match)):
+            if filename is None or not self.unwritten[side]:
+                continue
+            self.unwritten[side] = False
+            lines = expand(groups[side])
+            directory = os.path.dirname(os.path.abspath(filename))
+            with tempfile.NamedTemporaryFile("w", encoding="utf-8", dir=directory,
+                                             delete=False) as f_handle:
+                if lines:
+                    f_handle.write('\n'.join(lines))
+                    f_handle.write('\n')
+            os.replace(f_handle.name, filename)
+
+def expand(group):
+    """ Returns the list of lines in group, a dictionary giving the number of
+    times each line appears. """
+
+    return list(chain.from_iterable(map(repeat, group, group.values())))
+
+def common_prefix(old, new):
+    """ Returns the length of the longest common prefix of the strings old and
+    new. They are compared a BLOCK at a time, and only the block in which
+    they differ is searched one character at a time. """
+
+    start = 0
+    end = min(len(old), len(new))
+    while start < end and old[start:start + BLOCK] == new[start:start + BLOCK]:
+        start = start + BLOCK
+    end = min(start + BLOCK, end)
+    while start < end and old[start] == new[start]:
+        start = start + 1
+    return start
+
+def common_suffix(old, new, limit):
+    """ Returns the length of the longest common suffix of the strings old and
+    new, which is no longer than limit. Works like common_prefix. """
+
+    length = 0
+    while length < limit and old[len(old) - min(length + BLOCK, limit):len(old) - length] \
+            == new[len(new) - min(length + BLOCK, limit):len(new) - length]:
+        length = min(length + BLOCK, limit)
+    while length < limit and old[-length - 1] == new[-length - 1]:
+        length = length + 1
+    return length
+
+def at_line_start(text, position):
+    """ Returns True if position is the index of the first character of a
+    line of text. """
+
+    return position == 0 or text[position - 1] == '\n'
+
+def changed_lines(old, new):
+    """ Compares old and new, the text of a file before and after a change
+    (each empty or ending in a newline), and returns the list [added,
+    removed] of the Counters of lines which were added and removed. The
+    lines the two have in common at the start and at the end are not
+    looked at. """
+
+    # Back up to the start of the line in which they first differ.
+    start = old.rfind('\n', 0, common_prefix(old, new)) + 1
+    length = common_suffix(old, new, min(len(old), len(new)) - start)
+    end = len(old) - length
+    if length and not (at_line_start(old, end) and at_line_start(new, len(new) - length)):
+        # Move up to the start of the next line, which is also in the suffix.
+        length = len(old) - (old.index('\n', end) + 1)
+    removed = Counter(old[start:len(old) - length].splitlines())
+    added = Counter(new[start:len(new) - length].splitlines())
+    # A line which was moved is both added and removed.
+    return [added - removed, removed - added]
+
+def watch(file1, file2, **opts):
+    """ Keeps the files match and no_match (keywords, either may be left out)
+    up to date with the matches and nonmatches of the exact difference of
+    file1 and file2, checking for changes every interval seconds. The other
+    accepted keywords are
+        interval - seconds between checks. Default is INTERVAL.
+        polls - stop after this many checks. Default is None, which keeps
+                going until interrupted.
+        report - a function called with the IncrementalDifference and the
+                 seconds taken, every time the results are written.
+    and those of fops.key_function. """
+
+    match = opts.pop('match', None)
+    no_match = opts.pop('no_match', None)
+    interval = opts.pop('interval', INTERVAL)
+    polls = opts.pop('polls', None)
+    report = opts.pop('report', None)
+
+    start = time.perf_counter()
+    diff = IncrementalDifference(file1, file2, **opts)
+    changed = True
+    while True:
+        if changed:
+            diff.write(match, no_match)
+            if report is not None:
+                report(diff, time.perf_counter() - start)
+        if polls is not None:
+            polls = polls - 1
+            if polls <= 0:
+                return diff
+        time.sleep(interval)
+        start = time.perf_counter()
+        changed = diff.refresh()
+
+def main(argv=None):
+    """ Runs the command line interface, and returns the exit status. """
+
+    parser = argparse.ArgumentParser(
+        prog="python -m incremental",
+        description="Watch two files, and keep the lines of the first which are "
+                    "(and are not) in the second written out as they change.")
+    parser.add_argument("file1", help="File whose lines are looked for.")
+    parser.add_argument("file2", help="File the lines are looked for in.")
+    parser.add_argument("--match", metavar="file",
+                        help="Write the lines of file1 which are in file2 to file.")
+    parser.add_argument("-n", "--no-match", metavar="file",
+                        help="Write the lines of file1 which are not in file2 to file.")
+    parser.add_argument("-f", metavar="fields",
+                        help="Only compare these fields of each line, i.e. 1-2.")
+    parser.add_argument("--fs", default=",", help="Field separator used with -f.")
+    parser.add_argument("-i", "--ignore-case", action="store_true",
+                        help="Compare lines without regard to case.")
+    parser.add_argument("--interval", type=float, default=INTERVAL,
+                        help="Seconds between checks of the files.")
+    args = parser.parse_args(argv)
+
+    opts = {'ignore_case': args.ignore_case}
+    if args.f is not None:
+        opts.update(f=args.f, fs=args.fs)
+
+    def report(diff, seconds):
+        [matches, nonmatches] = diff.results()
+        print(f"{time.strftime('%H:%M:%S')} {len(matches)} matches, "
+              f"{len(nonmatches)} not matched ({seconds * 1000:.1f} ms)", flush=True)
+
+    try:
+        watch(args.file1, args.file2, match=args.match, no_match=args.no_match,
+              interval=args.interval, report=report, **opts)
+    except FopsError as e:
+        print(f"{e} Exiting.", file=sys.stderr)
+        return 1
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,334 @@
+""" instrument.py
+Author: Braden Carlson
+Date: October 2026
+
+Records where the time goes when an operation is run from the GUI. Each run
+of an operation (a sort, a cut, a difference, ...) is an Operation, made up of
+the phases it went through, such as
+    get_content -> fops.sort_lines -> insert
+(reading the text out of the Text widget, the work done by fops, and putting
+the result back in the Text widget). For each phase the wall time is
+recorded, along with the number of rows and bytes which went in and came out,
+and the peak memory allocated during it (with tracemalloc).
+
+Nothing is measured unless an operation is being recorded, so the phases
+marked inside TextTab.get_content and TextTab.replace cost nothing when
+they are called on their own.
+
+The operations are recorded by RECORDER, which keeps the last HISTORY of them
+(see Recorder.stats) and tells its listeners about each one as it finishes,
+which is how a TextTab shows them in its status bar. If a trace file is set
+(or the BLUE_TRACE environment variable names one), every operation is also
+appended to it as a line of JSON, so a session can be looked at afterwards.
+
+An operation whose work is done in a worker process (see the worker module)
+is put aside with Recorder.defer when its worker is started, and carried on
+with Recorder.resume once the worker is done, so its phases are still
+recorded as one Operation. The memory used in the worker is not measured.
+
+Measuring memory with tracemalloc slows down a phase which allocates a lot,
+so it can be turned off with Recorder.memory, in which case only the times are
+recorded and they are exact. """
+
+import json
+import os
+import time
+import tracemalloc
+from collections import deque
+from contextlib import contextmanager
+from functools import wraps
+
+# Number of operations kept by a Recorder.
+HISTORY = 200
+
+class Phase:
+    """ One phase of an Operation. rows_in, bytes_in, rows_out and bytes_out
+    are None until they are set with takes and gives, and peak is None if
+    memory was not measured. """
+
+    def __init__(self, name):
+        self.name = name
+        self.seconds = 0.0
+        self.peak = None
+        [self.rows_in, self.bytes_in] = [None, None]
+        [self.rows_out, self.bytes_out] = [None, None]
+
+    def takes(self, value):
+        """ Records the size of value as the input of the phase, and returns
+        it, so that it can be used inline. """
+
+        [self.rows_in, self.bytes_in] = size_of(value)
+        return value
+
+    def gives(self, value):
+        """ Records the size of value as the output of the phase, and returns
+        it. """
+
+        [self.rows_out, self.bytes_out] = size_of(value)
+        return value
+
+    def as_dict(self):
+        """ Returns the phase as a dictionary, as it is written to a trace. """
+
+        return dict(self.__dict__)
+
+class Operation:
+    """ A single run of an operation, the list of its phases in the order in
+    which they were run. source is the object which ran it (such as a
+    TextTab), or None. """
+
+    def __init__(self, name, source=None):
+        self.name = name
+        self.source = source
+        self.started = time.time()
+        self.phases = []
+        # The message of the exception which stopped the operation, if any.
+        self.error = None
+        # Whether the operation goes on in a worker, see Recorder.defer.
+        self.deferred = False
+
+    @property
+    def seconds(self):
+        """ The time spent in the phases of the operation. Time spent waiting
+        on the user (in a dialog) is not in any phase, so it is not counted. """
+
+        return sum(phase.seconds for phase in self.phases)
+
+    @property
+    def peak(self):
+        """ The largest peak memory of any phase, or None if memory was not
+        measured. """
+
+        peaks = [phase.peak for phase in self.phases if phase.peak is not None]
+        return max(peaks) if peaks else None
+
+    def as_dict(self):
+        """ Returns the operation as a dictionary, as it is written to a
+        trace. """
+
+        return {'operation': self.name, 'started': self.started,
+                'seconds': self.seconds, 'peak': self.peak, 'error': self.error,
+                'phases': [phase.as_dict() for phase in self.phases]}
+
+    def summary(self):
+        """ Returns a line of text describing the operation, for a status
+        bar. """
+
+        phases = ', '.join(f"{phase.name} {phase.seconds * 1000:.1f} ms"
+                           for phase in self.phases)
+        text = f"{self.name}: {self.seconds * 1000:.1f} ms ({phases})"
+        rows = [phase.rows_in for phase in self.phases if phase.rows_in is not None] + \
+               [phase.rows_out for phase in self.phases if phase.rows_out is not None]
+        if rows:
+            text = f"{text}, {rows[0]:,} -> {rows[-1]:,} rows"
+        if self.peak is not None and self.peak >= 2**20:
+            text = f"{text}, peak {self.peak / 2**20:.1f} MB"
+        elif self.peak is not None:
+            text = f"{text}, peak {self.peak / 2**10:.0f} KB"
+        if self.error is not None:
+            text = f"{text}, failed: {self.error}"
+        return text
+
+class Recorder:
+    """ Records Operations, see the top of this module. """
+
+    def __init__(self, memory=True, trace=None):
+        """ memory is whether to measure the peak memory of each phase, and
+        trace the name of a file each operation is appended to, or None. """
+
+        self.memory = memory
+        self.trace = trace
+        self.history = deque(maxlen=HISTORY)
+        self.listeners = []
+        # The Operation being recorded, if any.
+        self.current = None
+
+    @contextmanager
+    def operation(self, name, source=None):
+        """ Context manager which records the phases run inside it as an
+        Operation called name, and yields it. An operation started while
+        another is being recorded is part of that one, and yields it. """
+
+        if self.current is not None:
+            yield self.current
+            return
+
+        with self.resume(Operation(name, source)) as operation:
+            yield operation
+
+    @contextmanager
+    def resume(self, operation):
+        """ Context manager which records the phases run inside it as part of
+        operation, and finishes it at the end unless defer is called. This
+        carries on an operation which was deferred after starting a worker
+        (see the worker module) once the worker is done. If operation is
+        None, nothing is recorded. """
+
+        if operation is None:
+            yield None
+            return
+
+        self.current = operation
+        operation.deferred = False
+        try:
+            yield operation
+        except BaseException as e:
+            operation.error = f"{e}"
+            raise
+        finally:
+            self.current = None
+            # An operation the user cancelled has nothing to show.
+            if not operation.deferred and (operation.phases or operation.error is not None):
+                self.finish(operation)
+
+    def defer(self):
+        """ Keeps the current operation from finishing at the end of its
+        operation block, since it goes on in a worker. Returns it (or None if
+        no operation is being recorded), to be given to resume. """
+
+        if self.current is not None:
+            self.current.deferred = True
+        return self.current
+
+    @contextmanager
+    def phase(self, name):
+        """ Context manager which times the code inside it as a phase called
+        name of the current operation, and yields the Phase so that the sizes
+        of its input and output can be set. Phases are run one after another,
+        not inside each other. Nothing is measured if no operation is being
+        recorded. """
+
+        phase = Phase(name)
+        if self.current is None:
+            yield phase
+            return
+
+        self.current.phases.append(phase)
+        tracing = self.memory and not tracemalloc.is_tracing()
+        if tracing:
+            tracemalloc.start()
+        if self.memory:
+            tracemalloc.reset_peak()
+            base = tracemalloc.get_traced_memory()[0]
+        start = time.perf_counter()
+        try:
+            yield phase
+        finally:
+            phase.seconds = time.perf_counter() - start
+            if self.memory:
+                phase.peak = tracemalloc.get_traced_memory()[1] - base
+            if tracing:
+                tracemalloc.stop()
+
+    def call(self, name, function, value, *args, **kwargs):
+        """ Runs function(value, *args, **kwargs) as a phase called name, with
+        value as its input and the result as its output, and returns the
+        result. """
+
+        with self.phase(name) as phase:
+            return phase.gives(function(phase.takes(value), *args, **kwargs))
+
+    def ran(self, name, seconds, value, result):
+        """ Adds a phase called name to the current operation, which was run
+        in a worker and took seconds, with value as its input and result as
+        its output. The memory it used is not known. """
+
+        if self.current is None:
+            return
+        phase = Phase(name)
+        phase.seconds = seconds
+        phase.takes(value)
+        phase.gives(result)
+        self.current.phases.append(phase)
+
+    def finish(self, operation):
+        """ Keeps operation, appends it to the trace, and tells the listeners
+        about it. """
+
+        self.history.append(operation)
+        if self.trace is not None:
+            with open(self.trace, "a", encoding="utf-8") as f_handle:
+                f_handle.write(json.dumps(operation.as_dict()))
+                f_handle.write('\n')
+        for function in list(self.listeners):
+            function(operation)
+
+    def add_listener(self, function):
+        """ Calls function with each Operation as it finishes. """
+
+        self.listeners.append(function)
+
+    def remove_listener(self, function):
+        """ Stops calling function, see add_listener. """
+
+        if function in self.listeners:
+            self.listeners.remove(function)
+
+    def stats(self, name=None):
+        """ Returns a dictionary of the operations kept, by name (or only the
+        one called name), each a dictionary with the keys
+            count   - number of times it was run.
+            seconds - total time of those runs.
+            mean    - average time of a run.
+            max     - time of the slowest run.
+            phases  - total time of each phase, by the name of the phase.
+            peak    - largest peak memory of any run, or None.
+            last    - the last run, see Operation.as_dict. """
+
+        stats = {}
+        for operation in self.history:
+            if name is not None and operation.name != name:
+                continue
+            entry = stats.setdefault(operation.name, {'count': 0, 'seconds': 0.0,
+                                                      'max': 0.0, 'phases': {},
+                                                      'peak': None})
+            entry['count'] = entry['count'] + 1
+            entry['seconds'] = entry['seconds'] + operation.seconds
+            entry['max'] = max(entry['max'], operation.seconds)
+            for phase in operation.phases:
+                entry['phases'][phase.name] = entry['phases'].get(phase.name, 0.0) \
+                                              + phase.seconds
+            if operation.peak is not None:
+                entry['peak'] = max(entry['peak'] or 0, operation.peak)
+            entry['mean'] = entry['seconds'] / entry['count']
+            entry['last'] = operation.as_dict()
+        return stats
+
+def size_of(value):
+    """ Returns the list [rows, bytes] giving the size of value: the number of
+    lines and of UTF-8 bytes of a str (or bytes), the number of items of a
+    list and the total length of its strings, or the number of items in all
+    of the values of a dictionary. Either is None if it can't be told. """
+
+    [rows, size] = [None, None]
+    if isinstance(value, (str, bytes)):
+        newline = '\n' if isinstance(value, str) else b'\n'
+        rows = value.count(newline) + (0 if value.endswith(newline) else 1) if value else 0
+        if isinstance(value, bytes) or value.isascii():
+            size = len(value)
+        else:
+            size = len(value.encode("utf-8", errors="replace"))
+    elif isinstance(value, dict):
+        # Such as the groups of fops.partition, count the rows of every group.
+        rows = sum(len(group) for group in value.values() if hasattr(group, '__len__'))
+    elif hasattr(value, '__len__'):
+        rows = len(value)
+        if isinstance(value, (list, tuple)) and all(isinstance(item, str) for item in value):
+            size = sum(map(len, value))
+    return [rows, size]
+
+def records(name):
+    """ Decorator for the methods of a widget which run an operation, so that
+    each call is recorded by RECORDER as an Operation called name, with the
+    widget as its source. """
+
+    def decorator(method):
+        @wraps(method)
+        def wrapper(self, *args, **kwargs):
+            with RECORDER.operation(name, self):
+                return method(self, *args, **kwargs)
+        return wrapper
+    return decorator
+
+# Records every operation run from the GUI.
+RECORDER = Recorder(trace=os.environ.get("BLUE_TRACE"))
@@ -0,0 +1,297 @@
+""" linetable.py
+Author: Braden Carlson
+Date: October 2026
+
+Defines the LineTable class, which gives access to the lines of a file without
+reading the file into Python strings. The file is memory mapped (mmap), and the
+only thing built for it is an array('Q') holding the offset at which each line
+starts, 8 bytes per line. A line is only turned into a Python object when it is
+asked for, as bytes or as a memoryview (which does not copy at all), and it is
+only decoded if it is asked for as a str.
+
+The offsets are found a block at a time with bytes.split, map and accumulate,
+so no Python code runs for each line.
+
+As in the reader module, a UTF-8 BOM is skipped, \r\n line endings are read
+as \n (the \r is left off of each line), and a file in cp1252 is decoded as
+such. A UTF-16 file, or one whose lines end in \r alone, can't be split on
+b'\n' and is decoded into memory as UTF-8 instead.
+
+The functions difference, cut and sort_lines in the fops module accept a
+LineTable in place of a file name or string, and call the methods of the same
+name here. These work on bytes: sorting bytes of UTF-8 gives the same order as
+sorting the decoded strings, and splitting on a separator can't break a
+multibyte character, so neither needs to decode anything. Comparing lines
+without regard to case (or whitespace) only matches what fops does on strings
+if the lines are ASCII, so a difference only skips decoding when both files
+are ASCII (see fops.bytes_key_function). """
+
+import codecs
+import mmap
+from array import array
+from bisect import bisect_left
+from itertools import accumulate, chain, compress, islice, repeat
+from operator import not_
+from errors import DataError, MissingFileError
+from table import field_splitter
+import reader
+
+# Number of bytes of the file looked at a time while finding the offsets.
+BLOCK = 1024 * 1024
+
+class LineTable:
+    """ The lines of a file, read through a memory map. Lines are numbered
+    from 0 and do not include their line ending. A LineTable may also be a
+    view of some of the lines of another one, in some order (see take), in
+    which case it shares the memory map and the offsets. """
+
+    def __init__(self, filename):
+        """ Maps filename and finds the start of every line. Raises a
+        MissingFileError if filename does not exist. """
+
+        try:
+            with open(filename, "rb") as f_handle:
+                try:
+                    self.data = mmap.mmap(f_handle.fileno(), 0, access=mmap.ACCESS_READ)
+                except ValueError:
+                    # An empty file can't be mapped.
+                    self.data = b''
+        except FileNotFoundError as e:
+            raise MissingFileError(f"{filename} does not exist.", [filename]) from e
+
+        self.filename = filename
+        # See the reader module. The lines of a UTF-16 file can't be found in
+        # its bytes, and an old Mac file (ending its lines with \r alone) has
+        # no b'\n' at all, so those two are decoded and held as UTF-8 instead.
+        encoding = reader.detect_encoding(self.data[:reader.SAMPLE],
+                                          len(self.data) < reader.SAMPLE)
+        # A UTF-8 BOM is skipped rather than being part of the first line.
+        self.encoding = "utf-8" if encoding == "utf-8-sig" else encoding
+        if reader.byte_lines(encoding):
+            [self.offsets, self.ascii, self.crlf] = find_offsets(
+                self.data, len(codecs.BOM_UTF8) if encoding == "utf-8-sig" else 0)
+        if not reader.byte_lines(encoding) or \
+           (self.crlf and len(self.offsets) == 2 and b'\n' not in self.data):
+            self.close()
+            self.data = reader.read_text(filename, encoding).encode("utf-8")
+            self.encoding = "utf-8"
+            [self.offsets, self.ascii, self.crlf] = find_offsets(self.data)
+        # The line numbers in this view, or None for every line in order.
+        self.rows = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def close(self):
+        """ Unmaps the file. Any view taken of this LineTable can't be used
+        afterwards either. """
+
+        if isinstance(self.data, mmap.mmap):
+            self.data.close()
+
+    def __len__(self):
+        if self.rows is None:
+            return len(self.offsets) - 1
+        return len(self.rows)
+
+    def __getitem__(self, index):
+        """ Returns line index as bytes. """
+
+        [start, end] = self.span(index)
+        return self.data[start:end]
+
+    def span(self, index):
+        """ Returns the list [start, end] of the offsets of the first byte of
+        line index, and the byte after its last. """
+
+        if self.rows is not None:
+            index = self.rows[index]
+        # The offset after the last line is one past the end of the file if
+        # the file does not end with a newline, so that the newline can always
+        # be left off by subtracting one.
+        [start, end] = [self.offsets[index], self.offsets[index + 1] - 1]
+        if self.crlf and start < end and self.data[end - 1] == 13:
+            # Leave off the \r of a \r\n as well, or a \r which ends the
+            # last line of the file (as the reader module does).
+            end = end - 1
+        return [start, end]
+
+    def view(self, index):
+        """ Returns line index as a memoryview of the file, without copying
+        it. """
+
+        [start, end] = self.span(index)
+        return memoryview(self.data)[start:end]
+
+    def text(self, index):
+        """ Returns line index as a str. """
+
+        return self[index].decode("ascii" if self.ascii else self.encoding, errors="replace")
+
+    def take(self, rows):
+        """ Returns a view of this LineTable holding the given lines, in that
+        order. Nothing is copied but the list of line numbers. """
+
+        view = LineTable.__new__(LineTable)
+        view.data = self.data
+        view.filename = self.filename
+        view.offsets = self.offsets
+        view.ascii = self.ascii
+        view.crlf = self.crlf
+        view.encoding = self.encoding
+        if self.rows is None:
+            view.rows = array('Q', rows)
+        else:
+            view.rows = array('Q', map(self.rows.__getitem__, rows))
+        return view
+
+    def lines(self, start=0, stop=None):
+        """ Returns an iterator over every line (or the lines start up to
+        stop) as bytes. Reading the lines of the whole file is done a block at
+        a time with bytes.split. """
+
+        stop = len(self) if stop is None else stop
+        if self.rows is not None:
+            return map(self.__getitem__, range(start, stop))
+        blocks = self.blocks(start, stop)
+        if self.crlf:
+            blocks = map(bytes.replace, blocks, repeat(b'\r\n'), repeat(b'\n'))
+        return chain.from_iterable(map(bytes.split, blocks, repeat(b'\n')))
+
+    def blocks(self, start=0, stop=None):
+        """ Generator which yields the lines of the whole file (or the lines
+        start up to stop) a block of about BLOCK bytes at a time (but at least
+        one line), as bytes without the final newline. """
+
+        offsets = self.offsets
+        stop = len(offsets) - 1 if stop is None else stop
+        first = start
+        while first < stop:
+            last = max(bisect_left(offsets, offsets[first] + BLOCK, first + 1, stop),
+                       first + 1)
+            end = offsets[last] - 1
+            if self.crlf and self.data[end - 1:end] == b'\r':
+                end = end - 1
+            yield self.data[offsets[first]:end]
+            first = last
+
+    def texts(self, start=0, stop=None):
+        """ Generator which yields every line (or the lines start up to stop)
+        as a str. """
+
+        encoding = "ascii" if self.ascii else self.encoding
+        for line in self.lines(start, stop):
+            yield line.decode(encoding, errors="replace")
+
+    def write(self, filename):
+        """ Writes the lines to filename, each followed by a newline. The
+        bytes are copied as they are, so nothing is decoded and the file is
+        written in the same encoding (see encoding) as this one. """
+
+        with open(filename, "wb") as f_handle:
+            for line in self.lines():
+                f_handle.write(line)
+                f_handle.write(b'\n')
+
+    def difference(self, other, key, bytes_key=None):
+        """ Returns a view (see take) of the lines whose key does not appear
+        in other, another LineTable. key is the function computing the key of
+        a line as a str, see fops.key_function. If bytes_key is given and both
+        LineTables are ASCII, it is used instead on the bytes of each line,
+        so nothing is decoded (see fops.bytes_key_function). """
+
+        if bytes_key is not None and self.ascii and other.ascii:
+            keys = map(bytes_key, self.lines())
+            index = set(map(bytes_key, other.lines()))
+        else:
+            keys = map(key, self.texts())
+            index = set(map(key, other.texts()))
+        return self.take(compress(range(len(self)), map(not_, map(index.__contains__, keys))))
+
+    def sort(self, **opts):
+        """ Returns a view (see take) of the lines in sorted order, which is
+        the same order as fops.sort_lines. The keywords ignore_case, reverse
+        and unique are accepted, just as in fops.sort_lines. Lines are
+        compared as bytes if the file is ASCII, or is UTF-8 and ignore_case
+        is not given. """
+
+        if opts.get('ignore_case', False):
+            if self.ascii:
+                keys = [line.lower() for line in self.lines()]
+            else:
+                keys = [line.casefold() for line in self.texts()]
+        elif self.ascii or self.encoding == "utf-8":
+            keys = list(self.lines())
+        else:
+            # In other encodings the bytes are not in the order of the text.
+            keys = list(self.texts())
+        order = sorted(range(len(keys)), key=keys.__getitem__,
+                       reverse=opts.get('reverse', False))
+        if opts.get('unique', False):
+            order = [row for row, previous in zip(order, [None] + order)
+                     if previous is None or keys[row] != keys[previous]]
+        return self.take(order)
+
+    def cut(self, nums, fs=","):
+        """ Generator which yields the fields in the list nums (numbered from
+        1, as returned by fops.parse_num_range) of each line, joined by fs, as
+        bytes in the encoding of the file. Just as in fops.cut, fs is a
+        regular expression unless it has no special characters. If a line does
+        not have enough fields, a DataError is raised which gives its line
+        number. """
+
+        needed = max(nums)
+        separator = fs.encode(self.encoding)
+        split = field_splitter(fs, self.encoding)
+
+        for lineno, line in enumerate(self.lines(), 1):
+            fields = split(line)
+            if len(fields) < needed:
+                raise DataError(f"There was an error on line {lineno}, it only has "
+                                f"{len(fields)} fields.", lineno)
+            yield separator.join([fields[i - 1] for i in nums])
+
+def find_offsets(data, start=0):
+    """ Returns the list [offsets, ascii, crlf] for the bytes (or mmap) data,
+    whose first line begins at the offset start: offsets is an array('Q')
+    holding the offset of the start of each line, followed by one more offset
+    (see LineTable.span), ascii tells whether every byte of the lines is
+    ASCII, and crlf whether any of them is a \r. """
+
+    offsets = array('Q', [start])
+    ascii_only = True
+    crlf = False
+    while start < len(data):
+        block = data[start:start + BLOCK]
+        ascii_only = ascii_only and block.isascii()
+        end = block.rfind(b'\n') + 1
+        if end == 0:
+            if start + len(block) < len(data):
+                # A line longer than BLOCK, look further ahead for its end.
+                found = data.find(b'\n', start + len(block))
+                end = len(data) - start if found == -1 else found + 1 - start
+                block = data[start:start + end]
+                ascii_only = ascii_only and block.isascii()
+            else:
+                end = len(block)
+        block = block[:end]
+        # The start of each line is the sum of the lengths of the lines
+        # before it, newlines included. splitlines keeps the newlines, but
+        # also splits on a lone \r, so it is only used if there are none.
+        if b'\r' not in block:
+            lengths = map(len, block.splitlines(keepends=True))
+        else:
+            crlf = True
+            parts = block.split(b'\n')
+            if parts[-1] == b'':
+                parts.pop()
+            lengths = map((1).__add__, map(len, parts))
+        offsets.extend(islice(accumulate(lengths, initial=start), 1, None))
+        start = start + end
+    if len(offsets) > 1 and data[len(data) - 1:] != b'\n':
+        # See LineTable.span.
+        offsets[-1] = len(data) + 1
+    return [offsets, ascii_only, crlf]
@@ -216,11 +216,14 @@ fix_line_endings $ACCEPTED_FILE
 
 ## Helper functions
 
+# A word like deAndre, whose capitals each sit between small letters, was typed
+# that way on purpose and only gets its first letter capitalized. The rest of
+# any other word (like jOHN) is lowercased.
 capitalize_names() {
         if [[ $BACKUP_FLAG == 1 ]]; then
-                [[ ! -z $1 ]] && [[ -f $1 ]] && sed -Ei.before_caps 's/\<([a-z])([a-zA-Z]*)\>/\u\1\L\2/g' $1
+                [[ ! -z $1 ]] && [[ -f $1 ]] && sed -Ei.before_caps 's/\<([a-z])(([a-z]+[A-Z][a-z]+)+)\>/\u\1\2/g; s/\<([a-z])([a-zA-Z]*)\>/\u\1\L\2/g; s/\<Mc([a-z]{2,})\>/Mc\u\1/g' $1
         else 
-                [[ ! -z $1 ]] && [[ -f $1 ]] && sed -E -i 's/\<([a-z])([a-zA-Z]*)\>/\u\1\L\2/g' $1
+                [[ ! -z $1 ]] && [[ -f $1 ]] && sed -E -i 's/\<([a-z])(([a-z]+[A-Z][a-z]+)+)\>/\u\1\2/g; s/\<([a-z])([a-zA-Z]*)\>/\u\1\L\2/g; s/\<Mc([a-z]{2,})\>/Mc\u\1/g' $1
         fi
 }
 
@@ -237,7 +240,7 @@ comparison() {
         if  [[ -f $1 && -f $2 ]]; then 
                 while IFS= read -r line; do
                         line=$(echo $line | sed 's/\r//g; s/\n//g')
-                        FOUND=$(grep "$line" < $2)
+                        FOUND=$(grep -F -- "$line" < $2)
                         if [[ -z $FOUND ]]; then 
                                 if [[ -z $NO_MATCH_FILE ]]; then 
                                         echo $line
@@ -0,0 +1,207 @@
+""" link_crew.py
+Author: Braden Carlson
+Date: October 2026
+
+Command line version of the link-crew.sh script, which does not need a display
+(tkinter is never imported). Run it with
+
+    python -m link_crew [options]
+
+It accepts the same options as link-crew.sh, see python -m link_crew --help,
+but does its work with the fops module instead of running sed and grep once
+for every line:
+  - A difference loads the lines of the first file into an AhoCorasick
+    automaton and reads the second file once, instead of running grep over the
+    second file for every line of the first.
+  - Line endings are fixed as the files are read, rather than by rewriting the
+    files with sed -i beforehand. The files themselves are left alone.
+  - Capitalizing a file uses the NameCapitalizer, a batch of lines at a time.
+
+As in link-crew.sh, the operations are done in the order they are given. """
+
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+from itertools import islice
+from matching import AhoCorasick
+from reader import read_lines as read_file
+from reader import file_encoding, open_text
+import fops
+
+# Directory the backups are moved into, as in link-crew.sh.
+BACKUP_DIR = "backups"
+
+# Number of lines capitalized at a time.
+BATCH = 16384
+
+# The files a difference may be taken between, by the name used with -d.
+FILE_NAMES = ("accepted", "master", "recommended")
+
+class ActionList(argparse.Action): # pylint: disable=R0903
+    """ argparse action which records each operation in the list actions, in
+    the order the options were given on the command line. """
+
+    def __call__(self, parser, namespace, values, option_string=None):
+        if namespace.actions is None:
+            namespace.actions = []
+        namespace.actions.append([self.dest, values])
+
+def make_parser():
+    """ Returns the ArgumentParser for the command line options. """
+
+    parser = argparse.ArgumentParser(
+        prog="python -m link_crew",
+        description="Compare lists of students (recommended, accepted, and a "
+                    "master list), and fix the capitalization of names.")
+    parser.set_defaults(actions=None)
+    parser.add_argument("-m", "--master", metavar="file",
+                        help="Use file as the master file.")
+    parser.add_argument("-r", "--recommended", metavar="file",
+                        help="Use file as the recommended file.")
+    parser.add_argument("-a", "--accepted", metavar="file",
+                        help="Use file as the accepted file.")
+    parser.add_argument("--skip-line-endings", action="store_true",
+                        help="Don't remove the \\r of DOS line endings when "
+                             "reading files.")
+    parser.add_argument("-d", "--difference", nargs="+", metavar="file",
+                        action=ActionList, dest="diff",
+                        help="Take a difference, i.e. -d recommended - accepted. "
+                             "Each line of the first file is searched for in "
+                             "the second, and the lines which are not found are "
+                             "printed (or written to the --no-match file). The "
+                             "files may be any of accepted, master, recommended.")
+    parser.add_argument("-c", "--capitalize", metavar="file", action=ActionList,
+                        dest="capitalize",
+                        help="Capitalize the names in file. Use this only on "
+                             "files which contain lists of names.")
+    parser.add_argument("--match", metavar="file",
+                        help="Append the lines of the second file which match "
+                             "to file.")
+    parser.add_argument("-n", "--no-match", metavar="file",
+                        help="Append the lines which do not match to file, "
+                             "instead of printing them.")
+    parser.add_argument("--backup", action="store_true",
+                        help="Backup all files before changing them in any way.")
+    return parser
+
+def read_lines(filename, args):
+    """ Generator which yields the lines of filename, with the \\r of DOS line
+    endings removed unless --skip-line-endings was given. The encoding of the
+    file is detected, see the reader module. """
+
+    yield from read_file(filename, newline='' if args.skip_line_endings else None)
+
+def comparison(file1, file2, args):
+    """ Searches for each line of file1 in file2, just like grep -F, and
+    reports the lines which are not found. If --match was given, the lines of
+    file2 which contain a line of file1 are appended to it (for each line of
+    file1, in order). Returns the number of lines which were not found. """
+
+    lines = list(read_lines(file1, args))
+    automaton = AhoCorasick(lines)
+
+    # Remember which lines of file2 each line of file1 was found in, but only
+    # if they are going to be written out. Otherwise file2 is scanned in one
+    # go, which can stop as soon as every line has been found.
+    matches = {}
+    if args.match is None:
+        found = automaton.search(line + '\n' for line in read_lines(file2, args))
+    else:
+        for line in read_lines(file2, args):
+            for pattern in automaton.search(line):
+                matches.setdefault(pattern, []).append(line)
+        found = matches.keys()
+
+    missing = [line for line in lines if line not in found]
+    if args.no_match is None:
+        sys.stdout.writelines(line + '\n' for line in missing)
+    else:
+        with open(args.no_match, "a", encoding="utf-8") as f_handle:
+            f_handle.writelines(line + '\n' for line in missing)
+
+    if args.match is not None:
+        with open(args.match, "a", encoding="utf-8") as f_handle:
+            for line in lines:
+                f_handle.writelines(match + '\n' for match in matches.get(line, []))
+
+    return len(missing)
+
+def backup(filename):
+    """ Copies filename into BACKUP_DIR, adding .before_caps to its name. """
+
+    os.makedirs(BACKUP_DIR, exist_ok=True)
+    shutil.copy2(filename, os.path.join(BACKUP_DIR,
+                                        os.path.basename(filename) + ".before_caps"))
+
+def capitalize_names(filename, args):
+    """ Capitalizes the names in filename, replacing the file. The new
+    contents are written to a temporary file next to it first, so the file is
+    never left half written. Only the names change: the file is written back
+    in the encoding it was read in (see the reader module), and every line
+    keeps its own line ending, or lack of one at the end of the file. """
+
+    if args.backup:
+        backup(filename)
+
+    encoding = file_encoding(filename)
+    directory = os.path.dirname(os.path.abspath(filename))
+    with open_text(filename, encoding=encoding, newline='') as old, \
+         tempfile.NamedTemporaryFile("w", encoding=encoding, errors="replace",
+                                     newline='', dir=directory, delete=False) as new:
+        while True:
+            batch = list(islice(old, BATCH))
+            if not batch:
+                break
+            new.write(fops.capitalize_words(''.join(batch)))
+    os.replace(new.name, filename)
+
+def main(argv=None):
+    """ Runs the command line interface, and returns the exit status. """
+
+    parser = make_parser()
+    args = parser.parse_args(argv)
+
+    files = {"accepted": args.accepted, "master": args.master,
+             "recommended": args.recommended}
+    for filename in files.values():
+        if filename is not None and not os.path.isfile(filename):
+            print(f"{filename} does not exist... exiting", file=sys.stderr)
+            return 1
+
+    try:
+        return run_actions(args, files)
+    except fops.FopsError as e:
+        print(f"{e} Exiting.", file=sys.stderr)
+        return 1
+
+def run_actions(args, files):
+    """ Does each of the operations given on the command line, in order, and
+    returns the exit status. files maps the names used with -d to the files
+    given for them. """
+
+    for [action, values] in args.actions or []:
+        if action == "capitalize":
+            if not os.path.isfile(values):
+                print(f"{values} does not exist... exiting", file=sys.stderr)
+                return 1
+            capitalize_names(values, args)
+            continue
+
+        # The files may be separated by a -, as in link-crew.sh.
+        names = [name for name in values if name != "-"]
+        if len(names) != 2 or not set(names) <= set(FILE_NAMES):
+            print("Looks like the difference operation you requested is\n"
+                  "not valid... exiting.", file=sys.stderr)
+            return 1
+        if names[0] == names[1] or None in (files[names[0]], files[names[1]]):
+            print(f"Please provide both the {names[0]} and {names[1]} files "
+                  f"for this difference... exiting.", file=sys.stderr)
+            return 1
+        comparison(files[names[0]], files[names[1]], args)
+
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -12,6 +12,7 @@ children of the Notebook contained in this class.  """
 
 from tkinter import Widget, Menu
 from graphic_elements import LinkNotebook
+from instrument import RECORDER
 import colors as color
 import dialog as dlg
 
@@ -92,3 +93,34 @@ class Link(Widget):
         specified index. """
 
         return self.notebook.get_tab(index)
+
+    def run_pipeline(self, spec, index=None):
+        """ Runs the pipeline spec (see the pipeline module) over the text in
+        the tab at index, or the current tab if index is not given. """
+
+        tab = self.current_tab() if index is None else self.get_tab(index)
+        tab.run_pipeline(spec=spec)
+
+    def stats(self, name=None):
+        """ Returns the timings of the operations run so far (or only of the
+        operation called name, such as "sort"), see the instrument module and
+        Recorder.stats. """
+
+        return RECORDER.stats(name)
+
+    def last_operation(self):
+        """ Returns the last operation which was run, as a dictionary (see
+        instrument.Operation.as_dict), or None if nothing has been run. """
+
+        if not RECORDER.history:
+            return None
+        return RECORDER.history[-1].as_dict()
+
+    def trace(self, filename=None, memory=True):
+        """ Appends every operation run from now on to filename as a line of
+        JSON, or stops doing so if filename is None. memory is whether the
+        peak memory of each phase is measured, which makes the phases which
+        allocate a lot slower. """
+
+        RECORDER.trace = filename
+        RECORDER.memory = memory
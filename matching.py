@@ -0,0 +1,250 @@
+""" matching.py
+Author: Braden Carlson
+Date: October 2026
+
+Provides the matchers which are used by the difference operations in the fops
+module. These are kept separate from fops since they are data structures
+rather than operations on files, and so that they can be reused by other parts
+of the application.
+
+The AhoCorasick class searches for many patterns at once. All of the patterns
+are loaded into an automaton, then the text is scanned a single time, so the
+cost of a search is linear in the total size of the patterns and the text
+instead of being one full scan of the text per pattern. Patterns are always
+treated literally, so a name like "Smith (Jr.)" is searched for as written.
+
+The TrigramIndex class is an index for finding words which are close to a
+given word, where "close" is measured by the edit_distance function. It is used
+to find likely typos, since only a few words have to be compared for each
+lookup instead of every word in the index. """
+
+from collections import Counter, deque
+
+class AhoCorasick:
+    """ An Aho-Corasick automaton built over a list of literal patterns. Use the
+    search method to find out which of the patterns occur in a text. """
+
+    def __init__(self, patterns):
+        """ Build the automaton for patterns, which may be any iterable of
+        strings. Duplicate patterns are only stored once. """
+
+        # Each state of the automaton is an index into these lists.
+        #   goto - dictionary mapping a character to the next state
+        #   fail - state to fall back to when there is no transition
+        #   out  - patterns which end exactly at this state
+        #   link - nearest state on the fail chain which has an output
+        self.goto = [{}]
+        self.fail = [0]
+        self.out = [[]]
+        self.link = [0]
+        self.patterns = set()
+
+        for pattern in patterns:
+            self.add(pattern)
+        self.build()
+
+    def add(self, pattern):
+        """ Add pattern to the trie. The build method must be called after all
+        patterns have been added. """
+
+        if pattern in self.patterns:
+            return
+        self.patterns.add(pattern)
+
+        state = 0
+        for char in pattern:
+            nxt = self.goto[state].get(char)
+            if nxt is None:
+                nxt = len(self.goto)
+                self.goto.append({})
+                self.fail.append(0)
+                self.out.append([])
+                self.link.append(0)
+                self.goto[state][char] = nxt
+            state = nxt
+        self.out[state].append(pattern)
+
+    def build(self):
+        """ Compute the fail and output links with a breadth first walk of the
+        trie. """
+
+        queue = deque(self.goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, nxt in self.goto[state].items():
+                queue.append(nxt)
+                fallback = self.fail[state]
+                while fallback and char not in self.goto[fallback]:
+                    fallback = self.fail[fallback]
+                self.fail[nxt] = self.goto[fallback].get(char, 0)
+                target = self.fail[nxt]
+                self.link[nxt] = target if self.out[target] else self.link[target]
+
+    def search(self, chunks):
+        """ Scan the text given by chunks, which is either a string or an
+        iterable of strings (such as an open file), and return the set of
+        patterns which occur somewhere in it. The state of the automaton is
+        carried from one chunk to the next. """
+
+        if isinstance(chunks, str):
+            chunks = [chunks]
+
+        goto = self.goto
+        fail = self.fail
+        out = self.out
+        link = self.link
+
+        found = set(out[0])
+        # States whose outputs (and the outputs of their link chain) have
+        # already been collected. Once a state is reported there is no reason
+        # to walk its link chain again.
+        reported = bytearray(len(goto))
+        reported[0] = 1
+        remaining = len(self.patterns) - len(found)
+
+        state = 0
+        for chunk in chunks:
+            for char in chunk:
+                while state and char not in goto[state]:
+                    state = fail[state]
+                state = goto[state].get(char, 0)
+
+                node = state if out[state] else link[state]
+                while not reported[node]:
+                    reported[node] = 1
+                    found.update(out[node])
+                    remaining = remaining - len(out[node])
+                    node = link[node]
+            if remaining == 0:
+                break
+
+        return found
+
+
+def edit_distance(word1, word2, limit=None):
+    """ Returns the edit distance between word1 and word2, that is the number of
+    single character insertions, deletions, substitutions, or swaps of two
+    neighboring characters needed to turn one into the other. Swaps are counted
+    so that a typo like "Jonh" is only one edit away from "John".
+
+    If limit is given, the computation stops as soon as the distance is known
+    to be larger than limit, and limit + 1 is returned. """
+
+    if len(word1) < len(word2):
+        word1, word2 = word2, word1
+    if limit is not None and len(word1) - len(word2) > limit:
+        return limit + 1
+
+    before = []
+    previous = list(range(len(word2) + 1))
+    for i, char1 in enumerate(word1, 1):
+        current = [i]
+        for j, char2 in enumerate(word2, 1):
+            dist = min(previous[j] + 1,
+                       current[j - 1] + 1,
+                       previous[j - 1] + (char1 != char2))
+            if (i > 1 and j > 1 and char1 == word2[j - 2]
+                    and word1[i - 2] == char2):
+                dist = min(dist, before[j - 2] + 1)
+            current.append(dist)
+        # A swap can reach back two rows, so both rows have to be past the
+        # limit before giving up.
+        if limit is not None and min(previous) > limit and min(current) > limit:
+            return limit + 1
+        before = previous
+        previous = current
+    if limit is not None and previous[-1] > limit:
+        return limit + 1
+    return previous[-1]
+
+def trigrams(word):
+    """ Returns the set of three character substrings of word, after padding
+    the word so that its first and last characters appear in grams of their
+    own. """
+
+    padded = "\0\0" + word + "\0"
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+class TrigramIndex:
+    """ An inverted index from trigrams to the words which contain them, used
+    to find the words closest to a given word without comparing it against
+    every word in the index.
+
+    Each edit can destroy at most four of the trigrams of a word, so a word
+    within distance d of the query still shares all but 4d of the query's
+    trigrams. Counting the shared trigrams with the index is cheap, and only
+    the words which pass that count are checked with edit_distance. """
+
+    def __init__(self, words=()):
+        """ Build the index over words, which may be any iterable of strings.
+        Duplicate words are only stored once. """
+
+        self.words = []
+        self.ids = {}
+        self.postings = {}
+
+        for word in words:
+            self.add(word)
+
+    def __len__(self):
+        return len(self.words)
+
+    def add(self, word):
+        """ Add word to the index, if it is not already there. """
+
+        if word in self.ids:
+            return
+        word_id = len(self.words)
+        self.ids[word] = word_id
+        self.words.append(word)
+        for gram in trigrams(word):
+            self.postings.setdefault(gram, []).append(word_id)
+
+    def candidates(self, word, max_distance):
+        """ Returns a list of [shared, word_id] for the words which could be
+        within max_distance of word, where shared is the number of trigrams
+        that word has in common with it. The list is sorted so the words
+        sharing the most trigrams come first. Every word within max_distance
+        is included, along with some which are not. """
+
+        grams = trigrams(word)
+        needed = len(grams) - 4 * max_distance
+
+        counts = Counter()
+        for gram in grams:
+            counts.update(self.postings.get(gram, ()))
+
+        if needed <= 0:
+            # Too short to filter on, every word is a candidate.
+            found = [[counts[word_id], word_id] for word_id in range(len(self.words))]
+        else:
+            found = [[shared, word_id] for word_id, shared in counts.items()
+                     if shared >= needed]
+        found.sort(reverse=True)
+        return found
+
+    def closest(self, word, max_distance):
+        """ Returns the list [candidate, distance] for the word in the index
+        which is closest to word, or None if no word in the index is within
+        max_distance of it. Ties are broken in favor of the word that sorts
+        first, so that the result does not depend on insertion order. """
+
+        size = len(trigrams(word))
+        best_word = None
+        bound = max_distance
+        for [shared, word_id] in self.candidates(word, max_distance):
+            # Once a close word has been found, the others have to share
+            # even more trigrams to have a chance at being closer.
+            if shared < size - 4 * bound:
+                break
+            other = self.words[word_id]
+            dist = edit_distance(word, other, bound)
+            if dist > bound:
+                continue
+            if best_word is None or dist < bound or other < best_word:
+                best_word = other
+                bound = dist
+
+        if best_word is None:
+            return None
+        return [best_word, bound]
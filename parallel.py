@@ -0,0 +1,211 @@
+""" parallel.py
+Author: Braden Carlson
+Date: October 2026
+
+Provides a version of the exact difference from the fops module which spreads
+the work over several processes.
+
+The work is done in two rounds, both run in a ProcessPoolExecutor:
+  1. Each file is split into chunks of roughly equal size (on line
+     boundaries). A worker reads one chunk, computes the key of each line (see
+     fops.normalize_line), and sorts the lines into buckets by a hash of their
+     key. Each bucket is written to a temporary file.
+  2. A worker takes one bucket, builds a set of the keys from file2 in that
+     bucket, and checks the lines from file1 in that bucket against it.
+Since two equal keys always land in the same bucket, the buckets can be
+diffed independently. Every line remembers which chunk it came from and its
+position in that chunk, so the results are put back in the order of file1 at
+the end.
+
+Starting the processes, and writing and pickling the buckets, costs more than
+it saves unless the files are large and there are several workers: with a
+single worker the two rounds take about twice as long as fops.difference. So
+with one worker, or files smaller than PARALLEL_SIZE between them, the
+difference is simply taken by fops.difference.
+
+PARALLEL_SIZE, and using every core by default, have not been tuned. The only
+timings so far come from a machine with a single core. There, on a 1M line
+roster, fops.difference took 0.89s, while 1, 2, 4 and 8 workers took 1.09s,
+3.15s, 3.54s and 4.04s. Those numbers only show what the extra processes
+cost, not what they save. On a machine with several cores, run
+
+    python tests/bench.py --sizes 1M,10M --only exact,parallel
+
+and set PARALLEL_SIZE to the size at which the workers start to win. """
+
+import os
+import pickle
+import tempfile
+import zlib
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from errors import MissingFileError
+import fops
+from fops import key_function
+from extsort import chunk_offsets
+from reader import decode_lines, file_encoding
+
+# Total size in bytes of the two files below which the difference is not
+# worth spreading over several processes.
+PARALLEL_SIZE = 32 * 2**20
+
+def join_lines(lines):
+    """ Packs a list of strings, none of which contain a newline, into the
+    list [count, text]. Pickling one large string is much faster than
+    pickling many small ones. """
+
+    return [len(lines), '\n'.join(lines)]
+
+def split_lines(packed):
+    """ Unpacks the list returned by join_lines. """
+
+    [count, text] = packed
+    if count == 0:
+        return []
+    return text.split('\n')
+
+def read_chunk(filename, span, encoding="utf-8"):
+    """ Returns the list of lines of filename (in encoding) between the byte
+    offsets span = [start, end], without line endings. """
+
+    [start, end] = span
+    with open(filename, "rb") as f_handle:
+        f_handle.seek(start)
+        return decode_lines(f_handle.read(end - start), encoding)
+
+# pylint: disable=R0914
+def bucket_chunk(filename, span, buckets, tmpdir, opts):
+    """ Run in a worker process. Reads the lines of filename between the byte
+    offsets span = [start, end], and sorts them into buckets by the crc32 of
+    their key. Each bucket is written with pickle to a file in tmpdir, as the
+    list [linenos, keys, lines] where linenos gives the position of each line
+    within the chunk and keys and lines are packed with join_lines. If opts
+    contains keys_only, only the distinct keys are written, packed with
+    join_lines. Returns the list of files written, one per bucket. """
+
+    lines = read_chunk(filename, span, opts['encoding'])
+    keys = list(map(key_function(**opts), lines))
+
+    if buckets == 1:
+        # Nothing to split, so don't bother hashing.
+        contents = [[array('L', range(len(keys))), keys, lines]]
+    else:
+        contents = [[array('L'), [], []] for _ in range(buckets)]
+        for lineno, key in enumerate(keys):
+            content = contents[zlib.crc32(key.encode("utf-8")) % buckets]
+            content[0].append(lineno)
+            content[1].append(key)
+            content[2].append(lines[lineno])
+
+    written = []
+    for bucket, [linenos, bucket_keys, bucket_lines] in enumerate(contents):
+        if opts.get('keys_only', False):
+            content = join_lines(list(set(bucket_keys)))
+        else:
+            content = [linenos, join_lines(bucket_keys), join_lines(bucket_lines)]
+        name = os.path.join(tmpdir, f"{span[0]}-{bucket}")
+        with open(name, "wb") as f_handle:
+            pickle.dump(content, f_handle, pickle.HIGHEST_PROTOCOL)
+        written.append(name)
+    return written
+
+def load_bucket(name):
+    """ Returns the content of the bucket file name. """
+
+    with open(name, "rb") as f_handle:
+        return pickle.load(f_handle)
+
+def diff_bucket(left_names, right_names):
+    """ Run in a worker process. Takes the bucket files of file1 (left_names,
+    one per chunk) and file2 (right_names) for a single bucket, and finds the
+    lines of file1 whose key does not appear in file2. These are returned as
+    the list [positions, lines], where each position is chunk << 32 | lineno,
+    so that sorting the positions puts the lines back in the order of file1. """
+
+    keys = set()
+    for name in right_names:
+        keys.update(split_lines(load_bucket(name)))
+
+    positions = array('Q')
+    nonmatches = []
+    for chunk, name in enumerate(left_names):
+        [linenos, left_keys, lines] = load_bucket(name)
+        for lineno, key, line in zip(linenos, split_lines(left_keys),
+                                     split_lines(lines)):
+            if key not in keys:
+                positions.append(chunk << 32 | lineno)
+                nonmatches.append(line)
+    return [positions, nonmatches]
+
+def difference(file1, file2, **opts):
+    """ Find each line of file1 which does not appear in file2, comparing lines
+    just like fops.difference with mode="exact", and return them in the order
+    in which they appear in file1. The accepted keywords are
+        workers - number of worker processes. Default is os.cpu_count().
+                  With one, or small files, the difference is taken in this
+                  process, see the top of this module.
+        buckets - number of hash buckets the lines are split into. Default is
+                  the number of workers.
+        tmpdir - directory for the bucket files. Default is the system's
+                 temporary directory.
+    and any keywords accepted by fops.normalize_line. Raises a
+    MissingFileError if either file does not exist. """
+
+    try:
+        workers = opts['workers']
+    except KeyError:
+        workers = os.cpu_count() or 1
+
+    try:
+        buckets = opts['buckets']
+    except KeyError:
+        buckets = workers
+
+    try:
+        tmpdir = opts['tmpdir']
+    except KeyError:
+        tmpdir = None
+
+    for filename in (file1, file2):
+        if not os.path.isfile(filename):
+            raise MissingFileError(f"One of {file1} or {file2} does not exist.",
+                                   [file1, file2])
+
+    key_opts = {name: value for name, value in opts.items()
+                if name not in ('workers', 'buckets', 'tmpdir')}
+    if workers <= 1 or \
+       os.path.getsize(file1) + os.path.getsize(file2) < PARALLEL_SIZE:
+        return fops.difference(file1, file2, **dict(key_opts, mode="exact"))
+    # Only the keys of file2 are ever looked at.
+    right_opts = dict(key_opts, keys_only=True)
+
+    # Both files get their own subdirectory, in case they have the same name.
+    with tempfile.TemporaryDirectory(dir=tmpdir) as work:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            # written[side][chunk][bucket] is the name of a bucket file.
+            written = {}
+            for side, filename, side_opts in (('left', file1, key_opts),
+                                              ('right', file2, right_opts)):
+                side_dir = os.path.join(work, side)
+                os.mkdir(side_dir)
+                # Each file is read in its own encoding, see the reader module.
+                encoding = file_encoding(filename)
+                side_opts = dict(side_opts, encoding=encoding)
+                written[side] = [pool.submit(bucket_chunk, filename, span, buckets,
+                                             side_dir, side_opts)
+                                 for span in chunk_offsets(filename, workers * 4, encoding)]
+            for side, futures in written.items():
+                written[side] = [future.result() for future in futures]
+
+            results = [pool.submit(diff_bucket,
+                                   [names[bucket] for names in written['left']],
+                                   [names[bucket] for names in written['right']])
+                       for bucket in range(buckets)]
+            positions = array('Q')
+            nonmatches = []
+            for result in results:
+                positions.extend(result.result()[0])
+                nonmatches.extend(result.result()[1])
+
+    order = sorted(range(len(positions)), key=positions.__getitem__)
+    return [nonmatches[index] for index in order]
@@ -0,0 +1,399 @@
+""" pipeline.py
+Author: Braden Carlson
+Date: October 2026
+
+Defines the Pipeline class, which runs several of the operations from the fops
+module one after another, such as the yearly
+    strip -> capitalize -> cut -> sort -> difference
+without writing the whole file out between each of them.
+
+Most operations only ever look at one line at a time (strip, capitalize, cut,
+and an exact difference). These are "streaming" stages, and any run of them is
+fused: the lines are read in batches, and each batch goes through every stage
+before the next is read, so no intermediate copy of the whole file is made.
+Working on batches rather than single lines lets each stage use the same fast
+whole-buffer operations (str.translate, the NameCapitalizer) as fops does.
+
+The other operations (sort, and the substring and regex differences) need all
+of their input before they can produce anything, so the lines are only
+gathered up at these stages.
+
+A pipeline can be built in Python,
+    Pipeline().strip('"').capitalize().cut(f="1-2").sort().difference("master.txt")
+or read from a spec, in which the stages are separated by '|' and each is
+given by its name followed by key=value options (or the name of an option
+alone, for one which is True),
+    Pipeline.parse("strip chars='\\"' | capitalize | cut f=1-2 | sort"
+                   " | difference other=master.txt")
+The options of each stage are the keywords of the fops function of the same
+name. Then use run for a string, or run_file for a file. """
+
+import re
+import shlex
+from abc import ABC, abstractmethod
+from itertools import islice
+from extsort import external_sort, read_lines
+from errors import DataError, MissingFileError
+from reader import open_text
+import fops
+
+# Number of lines which go through the streaming stages at a time.
+BATCH = 16384
+
+class Stage(ABC):
+    """ A single step of a Pipeline. Every stage defines apply, which takes an
+    iterable of lines and returns an iterable of lines. Streaming stages are
+    StreamingStage objects instead. """
+
+    name = None
+    streaming = False
+    # Options which must be given, and the others which may be.
+    needs = ()
+    options = ()
+
+    def __init__(self, **opts):
+        """ Raises a KeyError if one of the options in needs is missing, and a
+        ValueError if an option is neither in needs nor in options. """
+
+        for option in self.needs:
+            if option not in opts:
+                raise KeyError(option)
+        for option in opts:
+            if option not in self.needs + self.options:
+                raise ValueError(f"The {self.name} operation has no option called "
+                                 f"{option}.")
+        self.opts = opts
+
+    def __repr__(self):
+        options = ' '.join(f"{name}={shlex.quote(str(value))}"
+                           for name, value in self.opts.items())
+        return f"{self.name} {options}".strip()
+
+    @abstractmethod
+    def apply(self, lines, **opts):
+        """ Returns the lines output by the stage. opts are the options given
+        to Pipeline.lines, which the stage may use as defaults for its
+        own. """
+
+    def inputs(self):
+        """ Returns the list of the files read by the stage, apart from the
+        lines it is given. """
+
+        return []
+
+class StreamingStage(Stage):
+    """ A stage which works on a batch of lines at a time, so that it can be
+    fused with the stages around it. It defines function, which returns a
+    function taking a list of lines and returning the list of lines which come
+    out of the stage. """
+
+    streaming = True
+
+    @abstractmethod
+    def function(self):
+        """ Returns the function applied to each batch of lines. This is
+        called once per run, so anything the stage needs to set up (such as
+        reading a file) is done here. """
+
+    def apply(self, lines, **opts):
+        """ Calls function on each batch of lines, for when the stage is run
+        on its own. """
+
+        return fuse(lines, [self.function()])
+
+class StripStage(StreamingStage):
+    """ Removes characters from each line, see fops.strip. Options are chars
+    and mode. """
+
+    name = "strip"
+    needs = ('chars',)
+    options = ('mode',)
+
+    def function(self):
+        chars = self.opts['chars']
+        if self.opts.get('mode', "chars") == "chars":
+            # The lines are joined for translate, so the newlines between
+            # them have to stay.
+            table = str.maketrans('', '', chars.replace('\n', ''))
+            return lambda lines: joined(lines, lambda text: text.translate(table))
+        pattern = re.compile(chars)
+        return lambda lines: [pattern.sub('', line) for line in lines]
+
+class CapitalizeStage(StreamingStage):
+    """ Capitalizes the names on each line, see fops.capitalize_words. """
+
+    name = "capitalize"
+
+    def function(self):
+        return lambda lines: joined(lines, fops.capitalize_words)
+
+class CutStage(StreamingStage):
+    """ Keeps only some fields of each line, see fops.cut. Options are f and
+    fs. """
+
+    name = "cut"
+    needs = ('f',)
+    options = ('fs',)
+
+    def function(self):
+        project = fops.cut_function(**self.opts)
+
+        def cut(lines):
+            try:
+                return list(map(project, lines))
+            except ValueError:
+                # Go back and find which line it was.
+                for index, line in enumerate(lines):
+                    try:
+                        project(line)
+                    except ValueError as e:
+                        raise LineError(index, e) from e
+                raise
+        return cut
+
+class SortStage(Stage):
+    """ Sorts the lines, see fops.sort_lines. Options are ignore_case, reverse
+    and unique, along with memory and tmpdir for extsort.external_sort, so
+    that files which do not fit in memory can still be sorted. """
+
+    name = "sort"
+    options = ('ignore_case', 'reverse', 'unique', 'memory', 'tmpdir')
+
+    def apply(self, lines, **opts):
+        opts = dict(opts, **self.opts)
+        if 'memory' in self.opts:
+            opts['memory'] = int(self.opts['memory'])
+        return external_sort(lines, **opts)
+
+class DifferenceStage(StreamingStage):
+    """ Keeps only the lines which do not appear in other, the name of a file,
+    see fops.difference. The other options are passed on as well. With
+    matches=True, the lines which do appear in other are kept instead. An exact
+    difference is a streaming stage, the other modes are not. """
+
+    name = "difference"
+    needs = ('other',)
+    options = ('matches', 'mode', 'f', 'fs', 'ignore_case', 'squeeze')
+
+    def __init__(self, **opts):
+        super().__init__(**opts)
+        self.other = opts['other']
+        self.keep = 0 if opts.get('matches', False) else 1
+        self.match_opts = {name: value for name, value in opts.items()
+                           if name not in ('other', 'matches')}
+        try:
+            self.mode = opts['mode']
+        except KeyError:
+            self.mode = "exact" if 'f' in opts else "substring"
+        self.streaming = self.mode == "exact"
+
+    def inputs(self):
+        return [self.other]
+
+    def missing(self):
+        """ Returns the MissingFileError raised when other does not exist. """
+
+        return MissingFileError(f"{self.other} does not exist.", [self.other])
+
+    def function(self):
+        key_of = fops.key_function(**self.match_opts)
+        try:
+            index = set(map(key_of, read_lines(self.other)))
+        except FileNotFoundError as e:
+            raise self.missing() from e
+        keep = self.keep
+        return lambda lines: [line for line, key in zip(lines, map(key_of, lines))
+                              if (key not in index) == keep]
+
+    def apply(self, lines, **opts):
+        if self.streaming:
+            return super().apply(lines)
+        matchers = {"substring": fops.match_substring, "regex": fops.match_regex}
+        try:
+            with open_text(self.other) as f2:
+                return matchers[self.mode](lines, f2, **self.match_opts)[self.keep]
+        except FileNotFoundError as e:
+            raise self.missing() from e
+
+class LineError(ValueError):
+    """ Raised by the function of a stage when one of the lines it was given
+    is bad. index is the position of that line in the list. """
+
+    def __init__(self, index, error):
+        super().__init__(f"{error}")
+        self.index = index
+
+def joined(lines, function):
+    """ Applies function, which takes and returns a string, to all of lines at
+    once by joining them with newlines, and returns the list of resulting
+    lines. """
+
+    if not lines:
+        return lines
+    return function('\n'.join(lines)).split('\n')
+
+# Every kind of stage, by the name used for it in a spec.
+STAGES = {stage.name: stage for stage in
+          (StripStage, CapitalizeStage, CutStage, SortStage, DifferenceStage)}
+
+def parse_value(value):
+    """ Converts the text of an option in a spec to the value passed to the
+    stage: true and false become booleans, and everything else is left as a
+    string. """
+
+    if value.lower() in ("true", "false"):
+        return value.lower() == "true"
+    return value
+
+class Pipeline:
+    """ A list of stages which are run one after another over the lines of a
+    string or file. See the top of this module. """
+
+    def __init__(self, stages=None):
+        """ stages is a list of Stage objects. """
+
+        self.stages = list(stages or [])
+
+    def __repr__(self):
+        return ' | '.join(map(repr, self.stages))
+
+    @classmethod
+    def parse(cls, spec):
+        """ Builds a Pipeline from its spec, see the top of this module.
+        Raises a ValueError if a stage is unknown, is given an option it does
+        not have, or is missing an option it needs, or if a quote is not
+        closed. """
+
+        # The whole spec is split at once, so that a quoted | (such as
+        # chars='|', or a regex a|b) stays in its option.
+        lexer = shlex.shlex(spec, posix=True, punctuation_chars='|')
+        lexer.whitespace_split = True
+        lexer.commenters = ''
+        stages = [[]]
+        for word in lexer:
+            if word.strip('|') == '':
+                stages.append([])
+            else:
+                stages[-1].append(word)
+
+        pipeline = cls()
+        for words in stages:
+            if not words:
+                continue
+            opts = {}
+            for word in words[1:]:
+                [name, equals, value] = word.partition('=')
+                # An option given without a value, such as unique, is a flag.
+                opts[name] = parse_value(value) if equals else True
+            pipeline.add(words[0], **opts)
+        return pipeline
+
+    def add(self, name, **opts):
+        """ Adds the stage called name, with options opts, to the end of the
+        pipeline and returns the pipeline, so that calls can be chained. """
+
+        try:
+            stage = STAGES[name](**opts)
+        except KeyError as e:
+            if name not in STAGES:
+                raise ValueError(f"There is no operation called {name}.") from e
+            raise ValueError(f"The {name} operation needs the {e} option.") from e
+        self.stages.append(stage)
+        return self
+
+    def strip(self, chars, **opts):
+        """ Adds a strip stage, see fops.strip. """
+        return self.add("strip", chars=chars, **opts)
+
+    def capitalize(self):
+        """ Adds a capitalize stage, see fops.capitalize_words. """
+        return self.add("capitalize")
+
+    def cut(self, **opts):
+        """ Adds a cut stage, see fops.cut. """
+        return self.add("cut", **opts)
+
+    def sort(self, **opts):
+        """ Adds a sort stage, see fops.sort_lines. """
+        return self.add("sort", **opts)
+
+    def difference(self, other, **opts):
+        """ Adds a difference stage against the file other, see
+        fops.difference. """
+        return self.add("difference", other=other, **opts)
+
+    def inputs(self):
+        """ Returns the list of the files read by the stages of the pipeline
+        (the other file of each difference), apart from the one it is run
+        on. """
+
+        return [name for stage in self.stages for name in stage.inputs()]
+
+    def lines(self, source, **opts):
+        """ Generator which runs the pipeline over source, any iterable of
+        lines without line endings, and yields the resulting lines. Runs of
+        streaming stages are fused and applied a batch at a time. opts are
+        defaults for the options of the other stages, such as the memory
+        budget of a sort. Raises a DataError if a cut fails, and
+        MissingFileError if the file of a difference does not exist. """
+
+        lines = iter(source)
+        functions = []
+        for stage in self.stages:
+            if stage.streaming:
+                functions.append(stage.function())
+                continue
+            if functions:
+                lines = fuse(lines, functions)
+                functions = []
+            lines = stage.apply(lines, **opts)
+        if functions:
+            lines = fuse(lines, functions)
+        yield from lines
+
+    def run(self, string):
+        """ Runs the pipeline over the lines of string, and returns the result
+        as a string. Since string is already in memory, a sort is done in
+        memory too unless it is given its own memory budget. """
+
+        return '\n'.join(self.lines(string.splitlines(), memory=None))
+
+    def run_file(self, filename, output=None):
+        """ Runs the pipeline over the lines of filename. If output is given,
+        the result is written to that file, otherwise it is returned as a
+        generator of lines. A sort stays within the memory budget of
+        extsort.external_sort, so files of any size can be run. """
+
+        lines = self.lines(read_lines(filename))
+        if output is None:
+            return lines
+        with open(output, "w", encoding="utf-8") as f_handle:
+            for line in lines:
+                f_handle.write(line)
+                f_handle.write('\n')
+        return None
+
+def fuse(lines, functions):
+    """ Generator which reads lines in batches of BATCH, passes each batch
+    through every one of functions in turn, and yields the resulting lines. A
+    batch goes through all of the functions before the next one is read, so
+    only one batch is ever held in memory. If a function raises a LineError,
+    a DataError is raised which gives the line number (counting the lines
+    which went into that function). """
+
+    lines = iter(lines)
+    # Number of lines which have gone into each function so far.
+    counts = [0] * len(functions)
+    while True:
+        batch = list(islice(lines, BATCH))
+        if not batch:
+            return
+        for position, function in enumerate(functions):
+            try:
+                size = len(batch)
+                batch = function(batch)
+            except LineError as e:
+                lineno = counts[position] + e.index + 1
+                raise DataError(f"There was an error on line {lineno}, {e}", lineno) from e
+            counts[position] = counts[position] + size
+        yield from batch
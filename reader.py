@@ -0,0 +1,106 @@
+""" reader.py
+Author: Braden Carlson
+Date: October 2026
+
+Opens the files given to blue for reading, whatever wrote them. Rosters come
+from spreadsheets, student information systems and text editors on every kind
+of machine, so a file may start with a byte order mark (BOM), may be UTF-16
+(Excel's "Unicode Text"), may be in the Windows code page cp1252 rather than
+UTF-8, and may end its lines with \\r\\n (DOS) or \\r (old Macs).
+
+Rather than rewriting such a file in place before using it, as link-crew.sh
+does with sed, everything is handled while the file is read:
+  - the encoding is taken from the BOM if there is one (and the BOM is
+    skipped), and otherwise the start of the file is checked to see whether it
+    is valid UTF-8. If it is not, FALLBACK is used.
+  - \\r\\n and \\r are turned into \\n as the lines are read (the universal
+    newlines mode of open), so no line ends with a stray \\r.
+The source file is never changed, so there is no extra pass over it and no
+.bak copy left behind. """
+
+import codecs
+
+# Number of bytes at the start of a file looked at to detect its encoding.
+SAMPLE = 65536
+
+# Byte order marks and the codec which reads past each of them. The UTF-32 LE
+# mark begins with the UTF-16 LE one, so it has to be checked first.
+BOMS = [(codecs.BOM_UTF32_LE, "utf-32"), (codecs.BOM_UTF32_BE, "utf-32"),
+        (codecs.BOM_UTF8, "utf-8-sig"),
+        (codecs.BOM_UTF16_LE, "utf-16"), (codecs.BOM_UTF16_BE, "utf-16")]
+
+# Encoding of a file which has no BOM and is not UTF-8. This is what Excel and
+# Notepad on Windows write, and it agrees with ASCII and with latin-1 for
+# every letter used in a name.
+FALLBACK = "cp1252"
+
+def detect_encoding(sample, complete=False):
+    """ Returns the name of the encoding of a file which starts with the bytes
+    sample, or is sample if complete is True. Otherwise the sample may end in
+    the middle of a character, so that is not counted against UTF-8. """
+
+    for bom, encoding in BOMS:
+        if sample.startswith(bom):
+            return encoding
+    try:
+        codecs.getincrementaldecoder("utf-8")().decode(sample, final=complete)
+    except UnicodeDecodeError:
+        return FALLBACK
+    return "utf-8"
+
+def file_encoding(filename):
+    """ Returns the name of the encoding of filename, see detect_encoding.
+    Raises a FileNotFoundError if filename does not exist. """
+
+    with open(filename, "rb") as f_handle:
+        sample = f_handle.read(SAMPLE)
+    return detect_encoding(sample, len(sample) < SAMPLE)
+
+def byte_lines(encoding):
+    """ Returns True if the lines of a file in encoding can be found by looking
+    for the byte b'\\n', so that it can be split into pieces at byte offsets
+    (see extsort.chunk_offsets). This is not so for UTF-16 and UTF-32. """
+
+    return codecs.lookup(encoding).name not in ("utf-16", "utf-32")
+
+def open_text(filename, mode="r", encoding=None, newline=None):
+    """ Opens filename for reading text, and returns the file object. The
+    encoding is detected (see detect_encoding) unless it is given, and a BOM
+    is skipped. With newline None, every line ending is read as \\n, see the
+    top of this module; newline is passed on to open, so use '' to leave
+    them as they are (for the csv module). A byte which is not valid in the
+    encoding is read as U+FFFD rather than stopping the read. Raises a
+    FileNotFoundError if filename does not exist. """
+
+    if encoding is None:
+        encoding = file_encoding(filename)
+    # pylint: disable=R1732
+    return open(filename, mode, encoding=encoding, errors="replace", newline=newline)
+
+def read_lines(filename, encoding=None, newline=None):
+    """ Generator which yields the lines of filename without line endings,
+    see open_text. """
+
+    with open_text(filename, encoding=encoding, newline=newline) as f_handle:
+        for line in f_handle:
+            yield line.removesuffix('\n')
+
+def read_text(filename, encoding=None):
+    """ Returns the whole text of filename, with every line ending read as
+    \\n, see open_text. """
+
+    with open_text(filename, encoding=encoding) as f_handle:
+        return f_handle.read()
+
+def decode_lines(raw, encoding):
+    """ Returns the list of the lines in the bytes raw (a piece of a file in
+    encoding, see byte_lines, starting at the start of a line), without their
+    line endings. Every line ending is read as \\n, just as by open_text. """
+
+    text = raw.decode(encoding, errors="replace")
+    if '\r' in text:
+        text = text.replace('\r\n', '\n').replace('\r', '\n')
+    lines = text.split('\n')
+    if lines[-1] == '':
+        lines.pop()
+    return lines
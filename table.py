@@ -0,0 +1,323 @@
+""" table.py
+Author: Braden Carlson
+Date: October 2026
+
+Defines the Table class, which holds delimited text (such as a roster) parsed
+into columns, so that several operations can be applied to it without splitting
+and joining every line over and over again.
+
+Each column is stored in one of two ways:
+  StringColumn - dictionary encoded. Every distinct value is stored once, and
+                 each row holds a small integer code in an array. Rosters
+                 repeat surnames, grades, and teacher names heavily, so this
+                 is much smaller than a list of strings.
+  NumberColumn - an array('q') of integers or array('d') of floats. A column
+                 is only stored this way if every value turns back into
+                 exactly the same text, so nothing is lost by doing so, and
+                 every integer fits in 64 bits (long ID numbers may not).
+
+The functions sort_lines, cut, strip and difference in the fops module accept
+a Table in place of a string and call the methods of the same name here. The
+text is only rebuilt (with str, or the lines method) when it is needed.
+
+The tabs of the GUI do not use a Table. The result of every operation there is
+shown in a Text widget, which needs the whole text anyway, and may be edited
+before the next operation, which would then have to parse it again. A run of
+operations which is not shown in between is what a Pipeline (see the pipeline
+module) is for. """
+
+from array import array
+from functools import partial
+from itertools import islice
+import re
+from errors import DataError
+
+# Characters which have a special meaning in a regular expression.
+REGEX_SPECIAL = set(".^$*+?{}[]\\|()")
+
+# Number of lines which are split and encoded at a time by Table.from_lines.
+BATCH = 65536
+
+class StringColumn:
+    """ A dictionary encoded column of strings. """
+
+    def __init__(self, values, codes):
+        """ values is the list of distinct strings, and codes the array('I')
+        giving the index into values of each row. """
+
+        self.values = values
+        self.codes = codes
+
+    def __len__(self):
+        return len(self.codes)
+
+    def __getitem__(self, row):
+        return self.values[self.codes[row]]
+
+    def take(self, rows):
+        """ Returns a new column holding the given rows of this one, in that
+        order. The list of values is shared, only the codes are copied. """
+
+        return StringColumn(self.values, array('I', map(self.codes.__getitem__, rows)))
+
+    def map(self, function):
+        """ Returns a new column with function applied to every value. Since
+        each distinct value is stored once, function is called once per
+        distinct value rather than once per row. """
+
+        return StringColumn([function(value) for value in self.values], self.codes)
+
+    def text(self):
+        """ Returns the list of the values of every row. """
+
+        return list(map(self.values.__getitem__, self.codes))
+
+class NumberColumn:
+    """ A column of integers or floats, stored in an array. """
+
+    def __init__(self, data):
+        """ data is an array('q') or array('d'). """
+
+        self.data = data
+        self.format = str if data.typecode == 'q' else repr
+
+    def __len__(self):
+        return len(self.data)
+
+    def __getitem__(self, row):
+        return self.format(self.data[row])
+
+    def take(self, rows):
+        """ Returns a new column holding the given rows of this one, in that
+        order. """
+
+        return NumberColumn(array(self.data.typecode, map(self.data.__getitem__, rows)))
+
+    def map(self, function):
+        """ Returns a new StringColumn with function applied to the text of
+        every row, since the result might not be a number anymore. """
+
+        return encode([function(value) for value in self.text()])
+
+    def text(self):
+        """ Returns the list of the text of every row. """
+
+        return list(map(self.format, self.data))
+
+def encode(values):
+    """ Builds the most compact column for the list of strings values: a
+    NumberColumn if every value is the exact text of an integer (or a float),
+    otherwise a StringColumn. """
+
+    distinct = {}
+    codes = array('I', [distinct.setdefault(value, len(distinct)) for value in values])
+    return encode_codes(list(distinct), codes)
+
+def encode_codes(values, codes):
+    """ Like encode, but for a column which has already been dictionary
+    encoded into the list of distinct values and the array codes. """
+
+    for typecode, convert, fmt in (('q', int, str), ('d', float, repr)):
+        try:
+            numbers = [convert(value) for value in values]
+        except ValueError:
+            continue
+        if not all(fmt(number) == value for number, value in zip(numbers, values)):
+            continue
+        try:
+            return NumberColumn(array(typecode, map(numbers.__getitem__, codes)))
+        except OverflowError:
+            # An integer too large for array('q'), which a float would round.
+            break
+    return StringColumn(values, codes)
+
+def field_splitter(fs, encoding=None):
+    """ Returns a function which splits a line into a list of fields on the
+    separator fs. Just as in fops.cut, fs is a regular expression, but when it
+    does not contain any special characters the much faster str.split is used
+    instead. If encoding is given, the function splits lines of bytes in that
+    encoding instead of strings. """
+
+    special = not REGEX_SPECIAL.isdisjoint(fs)
+    if encoding is not None:
+        fs = fs.encode(encoding)
+    if special:
+        return re.compile(fs).split
+    return partial(type(fs).split, sep=fs)
+
+def matched_separator(fs, lines, rows):
+    """ Returns the text matched by the regular expression fs in the first of
+    lines which has more than one field (the list of fields of each line is
+    in rows), or None if none of them do. """
+
+    for line, row in zip(lines, rows):
+        if len(row) > 1:
+            return re.search(fs, line).group()
+    return None
+
+class Table:
+    """ Delimited text stored by column. Rows may have different numbers of
+    fields; the number of fields of each row is remembered so the text can be
+    rebuilt exactly as it was. """
+
+    def __init__(self, columns, widths, fs=",", sep=None):
+        """ columns is a list of StringColumn or NumberColumn objects, all of
+        the same length, widths the array giving the number of fields of each
+        row, fs the separator the rows were split on, and sep the text used to
+        join the fields back together, which is fs unless it is given (see
+        from_lines). Use from_string or from_lines rather than calling this
+        directly. """
+
+        self.columns = columns
+        self.widths = widths
+        self.fs = fs
+        self.sep = fs if sep is None else sep
+
+    @classmethod
+    def from_lines(cls, lines, fs=",", sep=None): # pylint: disable=R0914
+        """ Parses an iterable of lines into a Table, splitting each line into
+        fields with field_splitter(fs). Missing fields of short rows are
+        stored as empty strings.
+
+        If fs is a regular expression, it can't be used to join the fields
+        back together, so they are joined with sep. If sep is not given, the
+        first separator matched in the lines is used, so that a table split
+        on r",\\s*" is written with ", " between its fields. """
+
+        split = field_splitter(fs)
+        detect = sep is None and not REGEX_SPECIAL.isdisjoint(fs)
+        indexes = []
+        codes = []
+        widths = array('H')
+        lines = iter(lines)
+        while True:
+            # Work through the lines in batches, so that the fields are split
+            # and encoded by builtins rather than one at a time.
+            batch = [line.removesuffix('\n') for line in islice(lines, BATCH)]
+            if not batch:
+                break
+            rows = [split(line) for line in batch]
+            if detect:
+                sep = matched_separator(fs, batch, rows)
+                detect = sep is None
+            batch_widths = array('H', map(len, rows))
+            width = max(batch_widths)
+            while len(codes) < width:
+                # A new column appears, every row so far is missing it.
+                indexes.append({'': 0} if widths else {})
+                codes.append(array('I', bytes(4 * len(widths))))
+            if min(batch_widths) < len(codes):
+                padding = [''] * len(codes)
+                rows = [row + padding[len(row):] for row in rows]
+            for index, column_codes, values in zip(indexes, codes, zip(*rows)):
+                for value in dict.fromkeys(values):
+                    if value not in index:
+                        index[value] = len(index)
+                column_codes.extend(map(index.__getitem__, values))
+            widths.extend(batch_widths)
+
+        if detect:
+            # No line has a separator, so nothing is ever joined.
+            sep = ''
+        return cls([encode_codes(list(index), column_codes)
+                    for index, column_codes in zip(indexes, codes)], widths, fs, sep)
+
+    @classmethod
+    def from_string(cls, string, fs=",", sep=None):
+        """ Parses string into a Table, see from_lines. """
+
+        return cls.from_lines(string.splitlines(), fs, sep)
+
+    def __len__(self):
+        return len(self.widths)
+
+    def __str__(self):
+        return '\n'.join(self.lines())
+
+    def row(self, index):
+        """ Returns the list of fields of row index. """
+
+        return [column[index] for column in self.columns[:self.widths[index]]]
+
+    def lines(self):
+        """ Generator which yields the text of each row. """
+
+        texts = [column.text() for column in self.columns]
+        join = self.sep.join
+        if self.widths.count(len(texts)) == len(self.widths):
+            # Every row has every field.
+            yield from map(join, zip(*texts))
+            return
+        for index, width in enumerate(self.widths):
+            yield join([text[index] for text in texts[:width]])
+
+    def take(self, rows):
+        """ Returns a new Table holding the given rows, in that order. """
+
+        return Table([column.take(rows) for column in self.columns],
+                     array('H', map(self.widths.__getitem__, rows)), self.fs, self.sep)
+
+    def cut(self, nums):
+        """ Returns a new Table with only the columns in the list nums
+        (numbered from 1, as returned by fops.parse_num_range). No data is
+        copied, the columns are shared with this Table. Raises a DataError if
+        some row does not have enough fields, just like fops.cut_lines. """
+
+        needed = max(nums)
+        for index, width in enumerate(self.widths):
+            if width < needed:
+                raise DataError(f"There was an error on line {index + 1}, it only has "
+                                f"{width} fields.", index + 1)
+        columns = [self.columns[i - 1] for i in nums]
+        return Table(columns, array('H', [len(columns)]) * len(self), self.fs, self.sep)
+
+    def sort(self, **opts):
+        """ Returns a new Table with the rows sorted by their text, which is
+        the same order as fops.sort_lines. The keywords ignore_case, reverse
+        and unique are accepted, just as in fops.sort_lines. """
+
+        lines = list(self.lines())
+        if opts.get('ignore_case', False):
+            lines = [line.casefold() for line in lines]
+        order = sorted(range(len(lines)), key=lines.__getitem__,
+                       reverse=opts.get('reverse', False))
+        if opts.get('unique', False):
+            order = [row for row, previous in zip(order, [None] + order)
+                     if previous is None or lines[row] != lines[previous]]
+        return self.take(order)
+
+    def strip(self, char, **opts):
+        """ Returns a new Table with char removed from each field, like
+        fops.strip (which explains the mode keyword). Only the distinct values
+        of each column are touched, and the separators between fields are left
+        alone. """
+
+        if opts.get('mode', "chars") == "chars":
+            table = str.maketrans('', '', char)
+            def remove(value):
+                return value.translate(table)
+        else:
+            remove = partial(re.compile(char).sub, '')
+        return Table([column.map(remove) for column in self.columns],
+                     self.widths, self.fs, self.sep)
+
+    def keys(self, nums=None):
+        """ Returns the list of keys of each row, used by difference. The key
+        of a row is the tuple of its fields in the columns nums (or all the
+        columns if nums is None), with surrounding whitespace removed. """
+
+        if nums is None:
+            nums = range(1, len(self.columns) + 1)
+        texts = [[value.strip() for value in self.columns[i - 1].text()] for i in nums]
+        if not texts:
+            return [()] * len(self)
+        return list(zip(*texts))
+
+    def difference(self, other, nums=None):
+        """ Returns a new Table holding the rows of this Table whose key (see
+        keys) does not appear in the Table other. This is the exact difference
+        of fops.difference, except that each field is stripped on its own. """
+
+        index = set(other.keys(nums))
+        rows = [row for row, key in enumerate(self.keys(nums)) if key not in index]
+        return self.take(rows)
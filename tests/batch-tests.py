@@ -0,0 +1,117 @@
+#!/bin/python3
+
+# Checks batch.run_directory: the results written for each file, and which
+# files the manifest lets it skip on the next run (only those whose contents,
+# pipeline, and the other files read by the pipeline are all unchanged).
+
+import contextlib
+import io
+import json
+import os
+import sys
+import tempfile
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import batch # pylint: disable=C0413
+from batch import run_directory # pylint: disable=C0413
+from errors import MissingFileError # pylint: disable=C0413
+
+def write(filename, text):
+    with open(filename, "w", encoding="utf-8") as f_handle:
+        f_handle.write(text)
+
+def read(filename):
+    with open(filename, encoding="utf-8") as f_handle:
+        return f_handle.read()
+
+with tempfile.TemporaryDirectory() as work:
+    rosters = os.path.join(work, "rosters")
+    done = os.path.join(work, "done")
+    master = os.path.join(work, "master.txt")
+    os.mkdir(rosters)
+    write(os.path.join(rosters, "east.txt"), '"rice", troy\r\n"carlson", braden\r\n')
+    write(os.path.join(rosters, "west.txt"), '"smith", al\n"o\'brien", kate\n')
+    write(os.path.join(rosters, "notes.md"), "not a roster\n")
+    write(master, "Rice, Troy\n")
+
+    spec = f"strip chars='\"' | capitalize | sort | difference other={master}"
+    def run(**opts):
+        return run_directory(spec, rosters, done, pattern="*.txt", workers=1, **opts)
+
+    assert run() == {'done': ["east.txt", "west.txt"], 'skipped': [], 'failed': {}}
+    assert read(os.path.join(done, "east.txt")) == "Carlson, Braden\n"
+    assert read(os.path.join(done, "west.txt")) == "O'Brien, Kate\nSmith, Al\n"
+    assert sorted(os.listdir(done)) == [batch.MANIFEST, "east.txt", "west.txt"]
+
+    # Nothing has changed.
+    assert run() == {'done': [], 'skipped': ["east.txt", "west.txt"], 'failed': {}}
+
+    # Only the file which was edited is run again.
+    write(os.path.join(rosters, "west.txt"), '"smith", al\n')
+    assert run() == {'done': ["west.txt"], 'skipped': ["east.txt"], 'failed': {}}
+    assert read(os.path.join(done, "west.txt")) == "Smith, Al\n"
+
+    # Or whose output has gone missing.
+    os.remove(os.path.join(done, "east.txt"))
+    assert run()['done'] == ["east.txt"]
+
+    # A change to the file of the difference means every file is run again.
+    write(master, "Carlson, Braden\n")
+    assert run()['done'] == ["east.txt", "west.txt"]
+    assert read(os.path.join(done, "east.txt")) == "Rice, Troy\n"
+    assert run()['skipped'] == ["east.txt", "west.txt"]
+
+    # So does a different pipeline, or force.
+    spec = spec + " | sort reverse"
+    assert run()['done'] == ["east.txt", "west.txt"]
+    assert run(force=True)['done'] == ["east.txt", "west.txt"]
+    assert run()['skipped'] == ["east.txt", "west.txt"]
+
+    # A manifest which can't be read is ignored.
+    for text in ("{", "[]", json.dumps({'version': batch.MANIFEST_VERSION + 1, 'files': {}})):
+        write(os.path.join(done, batch.MANIFEST), text)
+        assert run()['done'] == ["east.txt", "west.txt"]
+
+    # A file which fails is reported, and is tried again the next time.
+    spec = "cut f=2"
+    write(os.path.join(rosters, "west.txt"), "smith, al\nbroken\n")
+    result = run()
+    assert result['done'] == ["east.txt"] and list(result['failed']) == ["west.txt"]
+    print(result['failed']["west.txt"])
+    assert "west.txt" not in batch.read_manifest(done)
+    assert run()['failed'].keys() == {"west.txt"}
+    write(os.path.join(rosters, "west.txt"), "smith, al\n")
+    assert run() == {'done': ["west.txt"], 'skipped': ["east.txt"], 'failed': {}}
+    # No temporary files are left behind.
+    assert sorted(os.listdir(done)) == [batch.MANIFEST, "east.txt", "west.txt"]
+
+    # Running the files in worker processes gives the same results.
+    parallel = os.path.join(work, "parallel")
+    spec = "capitalize | sort"
+    assert run_directory(spec, rosters, parallel, workers=2)['done'] == \
+        ["east.txt", "notes.md", "west.txt"]
+    for name in ("east.txt", "west.txt"):
+        assert read(os.path.join(parallel, name)) == \
+            '\n'.join(sorted(read(os.path.join(rosters, name)).title().splitlines())) + '\n'
+
+    # Mistakes which stop the whole run.
+    for source, output, bad_spec, error in (
+            (os.path.join(work, "nowhere"), done, spec, MissingFileError),
+            (rosters, rosters, spec, ValueError),
+            (rosters, done, "shuffle", ValueError),
+            (rosters, done, "difference other=nothing.txt", MissingFileError)):
+        try:
+            run_directory(bad_spec, source, output)
+        except error as e:
+            print(e)
+        else:
+            assert False, error
+
+    # The command line gives the exit status.
+    with contextlib.redirect_stdout(io.StringIO()) as out, \
+         contextlib.redirect_stderr(io.StringIO()):
+        assert batch.main(["-w", "1", "-p", "*.txt", spec, rosters, parallel]) == 0
+        assert batch.main(["-w", "1", "cut f=9", rosters, parallel]) == 1
+        assert batch.main([spec, rosters, rosters]) == 1
+    assert out.getvalue().startswith("0 run, 2 up to date, 0 failed.\n")
+
+print("ok")
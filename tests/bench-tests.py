@@ -0,0 +1,89 @@
+#!/bin/python3
+
+# Checks the parts of tests/bench.py which decide what is timed and how it is
+# judged: the made up rosters (which must be the same on every run), the
+# master list written next to them, parse_size, and compare.
+
+import contextlib
+import io
+import json
+import os
+import sys
+import tempfile
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import bench # pylint: disable=C0413
+from bench import compare, parse_size, roster # pylint: disable=C0413
+
+assert [parse_size(text) for text in ("1000", "10k", "10K", "2M", "1.5m", "0")] == \
+    [1000, 10000, 10000, 2000000, 1500000, 0]
+
+# The same keywords always give the same roster, and a new seed a new one.
+assert roster(500) == roster(500, seed=0, duplicates=0.05, quoted=0.1, lower=0.2)
+assert roster(500, seed=1) != roster(500)
+assert roster(0) == "\n"
+
+lines = roster(2000).splitlines()
+assert len(lines) == 2000
+for line in lines:
+    [first, last, grade, number] = line.split(',')
+    assert first and last and 9 <= int(grade) <= 12 and 100000 <= int(number) < 102000
+# A few lines repeat an earlier one, about 5% of them.
+assert 50 <= len(lines) - len(set(lines)) <= 150
+assert any(line.startswith('"') for line in lines)
+assert any(line[0].islower() for line in lines)
+
+# Each fraction can be turned off or all the way up.
+lines = roster(1000, duplicates=0, quoted=0, lower=0).splitlines()
+assert len(set(lines)) == 1000
+assert not any('"' in line or line[0].islower() for line in lines)
+lines = roster(1000, duplicates=1).splitlines()
+assert set(lines) == {lines[0]}
+for line in roster(1000, quoted=1, lower=1).splitlines():
+    [first, last] = line.split(',')[:2]
+    assert first[0] == first[-1] == last[0] == last[-1] == '"'
+    assert first == first.lower() and last == last.lower()
+
+text = roster(100, crlf=True)
+assert text.endswith("\r\n") and text.count("\r\n") == 100 == text.count("\n")
+
+# The master list holds every other line of the roster, and as many which are
+# not in it.
+with tempfile.TemporaryDirectory() as work:
+    roster_opts = {'seed': 3, 'duplicates': 0, 'quoted': 0.1, 'crlf': True}
+    [text, files] = bench.write_rosters(work, 1000, roster_opts)
+    assert text == roster(1000, **roster_opts)
+    with open(files[0], encoding="utf-8", newline='') as f_handle:
+        assert f_handle.read() == text
+    with open(files[1], encoding="utf-8") as f_handle:
+        master = f_handle.read().splitlines()
+    assert master[:500] == text.splitlines()[::2] and len(master) == 1000
+
+    # Every operation can be run, and gives the same answer as fops.
+    operations = bench.operations(text, files)
+    assert operations["difference exact"]() == \
+        operations["parallel.difference workers=1"]() == text.splitlines()[1::2]
+    assert len(operations["parse_num_range"]()) == 1000
+
+    bench.REPEATS = 1
+    with contextlib.redirect_stdout(io.StringIO()) as out:
+        results = bench.run([10, 20], ["cut", "strip"], {'seed': 0})
+    assert sorted(results) == ["cut f=1-2@10", "cut f=1-2@20", "cut f=2,4@10", "cut f=2,4@20",
+                               "strip@10", "strip@20"]
+    assert len(out.getvalue().splitlines()) == 6
+    assert all(result['seconds'] >= 0 and result['peak'] > 0 for result in results.values())
+    json.dumps(results)
+
+# Only a change by more than the threshold is a regression, and never one of
+# less than FLOOR seconds or a megabyte.
+baseline = {"a@1": {'seconds': 1.0, 'peak': 2**30}, "b@1": {'seconds': 1.0, 'peak': 2**30},
+            "c@1": {'seconds': 0.001, 'peak': 100}, "d@1": {'seconds': 1.0, 'peak': 2**30},
+            "e@1": {'seconds': 1.0, 'peak': 100}}
+results = {"a@1": {'seconds': 1.2, 'peak': 2**30}, "b@1": {'seconds': 1.3, 'peak': 2**30},
+           "c@1": {'seconds': 0.002, 'peak': 2**19}, "d@1": {'seconds': 0.5, 'peak': 2**31},
+           "e@1": {'seconds': 1.0, 'peak': 2**20 + 200}, "new@1": {'seconds': 9, 'peak': 9}}
+with contextlib.redirect_stdout(io.StringIO()) as out:
+    assert compare(results, baseline, 0.25) == ["b@1", "d@1", "e@1"]
+    assert compare(results, baseline, 0.1) == ["a@1", "b@1", "d@1", "e@1"]
+assert "new@1" not in out.getvalue()
+
+print("ok")
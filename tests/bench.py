@@ -0,0 +1,252 @@
+#!/bin/python3
+
+# Benchmarks the operations of fops on synthetic rosters. Run from the base
+# directory of the project:
+#
+#     python tests/bench.py                          time everything at 1k, 10k and 100k lines
+#     python tests/bench.py --sizes 1k,1M,10M        ... at other sizes
+#     python tests/bench.py --save baseline.json     ... and save the results as a baseline
+#     python tests/bench.py --compare baseline.json  ... and flag anything slower than it
+#
+# The rosters are made up by roster() from a fixed seed, so every run (and
+# every machine) times exactly the same input. Each operation is run REPEATS
+# times and the fastest wall time is kept, then run once more under
+# tracemalloc for its peak memory, which tracemalloc slows down too much to
+# time at the same time. With --compare, the exit status is 1 if any
+# operation got slower (or used more memory) than the baseline by more than
+# the threshold, so the script can be used to judge a change.
+
+import argparse
+import json
+import os
+import platform
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import fops # pylint: disable=C0413
+import parallel # pylint: disable=C0413
+
+# Time the parallel difference itself at every size, rather than the
+# fops.difference it falls back to for small files.
+parallel.PARALLEL_SIZE = 0
+
+# Bumped whenever the layout of a baseline changes, so old ones are refused.
+VERSION = 1
+
+# Number of times each operation is timed.
+REPEATS = 3
+
+# A time below this many seconds is too short to flag as a regression, since
+# it is mostly noise.
+FLOOR = 0.002
+
+FIRST = ["James", "Mary", "Robert", "Patricia", "John", "Jennifer", "Michael", "Linda",
+         "David", "Elizabeth", "DeAndre", "Brynnli", "Arlee", "Hannah", "Troy", "José",
+         "Siobhan", "Nguyen", "Zoë", "Mateo"]
+LAST = ["Smith", "Johnson", "Williams", "Brown", "Jones", "Garcia", "Miller", "Davis",
+        "McDonald", "O'Brien", "MacLeod", "Carlson", "Rice", "Van Buren", "Núñez",
+        "Lee", "Thompson", "St. James", "D'Angelo", "Kowalski"]
+SYLLABLES = ["an", "ber", "ca", "del", "en", "fi", "gor", "ha", "is", "jo", "ka", "li",
+             "mo", "ne", "or", "pa", "ri", "so", "tu", "vy"]
+
+def parse_size(text):
+    """ Returns the number of lines given by text, such as 1000, 10k or 2M. """
+
+    multiplier = {"k": 1000, "m": 1000000}.get(text[-1].lower(), 1)
+    return int(float(text.rstrip("kKmM")) * multiplier)
+
+def roster(lines, **opts):
+    """ Returns the text of a made up roster of lines students, one per line as
+    first,last,grade,id. The accepted keywords are
+        seed - seed of the random numbers. Default is 0.
+        duplicates - fraction of the lines which repeat an earlier line.
+                     Default is 0.05.
+        quoted - fraction of the names which are wrapped in double quotes,
+                 as a spreadsheet does. Default is 0.1.
+        lower - fraction of the names typed in lower case. Default is 0.2.
+        crlf - if True, lines end in \\r\\n. Default is False.
+    The same keywords always give the same roster. """
+
+    rng = random.Random(opts.get('seed', 0))
+    duplicates = opts.get('duplicates', 0.05)
+    quoted = opts.get('quoted', 0.1)
+    lower = opts.get('lower', 0.2)
+
+    def name(common):
+        if rng.random() < 0.5:
+            text = rng.choice(common)
+        else:
+            text = ''.join(rng.choices(SYLLABLES, k=rng.randint(2, 4))).capitalize()
+        if rng.random() < lower:
+            text = text.lower()
+        if rng.random() < quoted:
+            text = f'"{text}"'
+        return text
+
+    rows = []
+    for number in range(lines):
+        if rows and rng.random() < duplicates:
+            rows.append(rng.choice(rows))
+            continue
+        rows.append(f"{name(FIRST)},{name(LAST)},{rng.randint(9, 12)},{100000 + number}")
+    ending = "\r\n" if opts.get('crlf', False) else "\n"
+    return ending.join(rows) + ending
+
+def operations(text, files):
+    """ Returns the dictionary of operations to time on the roster text, each
+    a function taking no arguments. files is the list [roster, master] of the
+    names of files holding the roster and a master list (every other line of
+    it, plus as many lines which are not in it) for the differences. """
+
+    [roster_file, master_file] = files
+    return {
+        "capitalize_words": lambda: fops.capitalize_words(text),
+        "sort_lines": lambda: fops.sort_lines(text),
+        "sort_lines ignore_case": lambda: fops.sort_lines(text, ignore_case=True),
+        "difference exact": lambda: fops.difference(roster_file, master_file,
+                                                    mode="exact"),
+        "difference substring": lambda: fops.difference(roster_file, master_file),
+        "difference f=1-2": lambda: fops.difference(roster_file, master_file, f="1-2"),
+        # With one worker this is fops.difference exact, so the speedup of
+        # each number of workers is read against it. The peak memory is only
+        # that of this process, not of the workers.
+        **{f"parallel.difference workers={workers}":
+           lambda workers=workers: parallel.difference(roster_file, master_file,
+                                                       workers=workers)
+           for workers in (1, 2, 4, 8)},
+        "strip": lambda: fops.strip(text, '"'),
+        "cut f=1-2": lambda: fops.cut(text, f="1-2"),
+        "cut f=2,4": lambda: fops.cut(text, f="2,4"),
+        # Far too quick to time once, so it is run once per line of the roster.
+        "parse_num_range": lambda: [fops.parse_num_range("1-3,5,7-9")
+                                    for _ in range(text.count('\n'))],
+    }
+
+def measure(function):
+    """ Returns the dictionary {'seconds': ..., 'peak': ...} of the fastest of
+    REPEATS runs of function, and the peak memory (in bytes) it allocates. """
+
+    best = None
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        function()
+        seconds = time.perf_counter() - start
+        best = seconds if best is None else min(best, seconds)
+
+    tracemalloc.start()
+    function()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return {'seconds': best, 'peak': peak}
+
+def write_rosters(work, size, roster_opts):
+    """ Makes the roster of size lines, and writes it and its master list (see
+    operations) to files in the directory work. Returns the list [text,
+    files] of the text of the roster and the names of the two files. """
+
+    text = roster(size, **roster_opts)
+    master = text.splitlines()[::2] + \
+        roster(size // 2, **dict(roster_opts, seed=roster_opts['seed'] + 1)).splitlines()
+    files = [os.path.join(work, "roster.txt"), os.path.join(work, "master.txt")]
+    for filename, content in zip(files, (text, '\n'.join(master) + '\n')):
+        with open(filename, "w", encoding="utf-8", newline='') as f_handle:
+            f_handle.write(content)
+    return [text, files]
+
+def run(sizes, only, roster_opts):
+    """ Times every operation whose name contains one of only (or every one,
+    if only is empty) at each of sizes, printing each result as it is found.
+    Returns the dictionary of results by "operation@size". """
+
+    results = {}
+    with tempfile.TemporaryDirectory() as work:
+        for size in sizes:
+            [text, files] = write_rosters(work, size, roster_opts)
+            for name, function in operations(text, files).items():
+                if only and not any(word in name for word in only):
+                    continue
+                result = measure(function)
+                results[f"{name}@{size}"] = result
+                print(f"{name:24} {size:>9} lines {result['seconds'] * 1000:10.1f} ms "
+                      f"{result['peak'] / 2**20:9.1f} MB", flush=True)
+    return results
+
+def compare(results, baseline, threshold):
+    """ Prints how each of results compares to the same operation in baseline,
+    and returns the list of names of those which got slower, or used more
+    memory, by more than the fraction threshold. """
+
+    regressions = []
+    for name, result in results.items():
+        if name not in baseline:
+            continue
+        old = baseline[name]
+        time_ratio = result['seconds'] / max(old['seconds'], 1e-9)
+        memory_ratio = result['peak'] / max(old['peak'], 1)
+        slower = time_ratio > 1 + threshold and result['seconds'] - old['seconds'] > FLOOR
+        bigger = memory_ratio > 1 + threshold and result['peak'] - old['peak'] > 2**20
+        flag = "REGRESSION" if slower or bigger else ""
+        print(f"{name:34} time x{time_ratio:5.2f}  memory x{memory_ratio:5.2f}  {flag}")
+        if flag:
+            regressions.append(name)
+    return regressions
+
+def main():
+    """ Runs the benchmarks, and returns the exit status. """
+
+    parser = argparse.ArgumentParser(description="Benchmark the fops operations.")
+    parser.add_argument("--sizes", default="1k,10k,100k",
+                        help="Comma separated numbers of lines, i.e. 1k,1M,10M.")
+    parser.add_argument("--only", default="",
+                        help="Comma separated words; only time the operations whose "
+                             "names contain one of them, i.e. sort,cut.")
+    parser.add_argument("--duplicates", type=float, default=0.05,
+                        help="Fraction of lines which repeat an earlier line.")
+    parser.add_argument("--quoted", type=float, default=0.1,
+                        help="Fraction of names wrapped in double quotes.")
+    parser.add_argument("--crlf", action="store_true", help="End lines with \\r\\n.")
+    parser.add_argument("--seed", type=int, default=0, help="Seed of the rosters.")
+    parser.add_argument("--save", metavar="file", help="Save the results to file.")
+    parser.add_argument("--compare", metavar="file",
+                        help="Compare the results to those saved in file.")
+    parser.add_argument("--threshold", type=float, default=0.25,
+                        help="Fraction by which an operation may get worse before "
+                             "it is flagged.")
+    args = parser.parse_args()
+
+    roster_opts = {'duplicates': args.duplicates, 'quoted': args.quoted,
+                   'crlf': args.crlf, 'seed': args.seed}
+    baseline = None
+    if args.compare is not None:
+        with open(args.compare, "r", encoding="utf-8") as f_handle:
+            baseline = json.load(f_handle)
+        if baseline.get('version') != VERSION or baseline.get('roster') != roster_opts:
+            print(f"{args.compare} was made with a different version or roster, "
+                  "so it can't be compared.")
+            return 1
+
+    # The parallel operations only mean something next to the number of cores.
+    print(f"Python {platform.python_version()}, cores: {os.cpu_count()}")
+    results = run([parse_size(size) for size in args.sizes.split(',')],
+                  [word for word in args.only.split(',') if word], roster_opts)
+
+    if args.save is not None:
+        with open(args.save, "w", encoding="utf-8") as f_handle:
+            json.dump({'version': VERSION, 'roster': roster_opts,
+                       'python': platform.python_version(),
+                       'machine': platform.machine(), 'cpus': os.cpu_count(),
+                       'results': results},
+                      f_handle, indent=1, sort_keys=True)
+
+    if baseline is not None:
+        regressions = compare(results, baseline['results'], args.threshold)
+        print(f"{len(regressions)} regressions.")
+        return 1 if regressions else 0
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
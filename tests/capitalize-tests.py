@@ -0,0 +1,89 @@
+#!/bin/python3
+
+# Checks the NameCapitalizer of the capitalize module: its rules for prefixes
+# (PREFIXES), whole words (WORDS) and words in mixed case, the trie they are
+# kept in, and the TokenCache.
+
+import os
+import sys
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import capitalize # pylint: disable=C0413
+import fops # pylint: disable=C0413
+from capitalize import NameCapitalizer, TokenCache, deliberate # pylint: disable=C0413
+
+cases = {
+    # Plain words, whatever case they were typed in.
+    "braden carlson": "Braden Carlson",
+    "BRADEN CARLSON": "Braden Carlson",
+    "Braden Carlson": "Braden Carlson",
+    # Caps lock was on.
+    "jOHN sMITH": "John Smith",
+    "bRYNNLI cARLSON": "Brynnli Carlson",
+    "jOhn": "John",
+    "McDONALD": "McDonald",
+    # Mixed case on purpose.
+    "DeAndre": "DeAndre",
+    "deAndre": "DeAndre",
+    "McDonald": "McDonald",
+    "mcDonald": "McDonald",
+    "DeLuca LaShawn MacArthur VanDerBerg": "DeLuca LaShawn MacArthur VanDerBerg",
+    # PREFIXES, with the number of letters which must follow them.
+    "mcdonald MCDONALD": "McDonald McDonald",
+    "mcgee mcx": "McGee Mcx",
+    "macarthur macdonald": "MacArthur MacDonald",
+    "mack macha machado mackey mackenzie": "Mack Macha Machado Mackey Mackenzie",
+    "o'brien O'BRIEN o’neil": "O'Brien O'Brien O’Neil",
+    "d'angelo d'": "D'Angelo D'",
+    # WORDS, which start with a prefix but are not spelled like it.
+    "macy MACIAS maceo macario": "Macy Macias Maceo Macario",
+    # Hyphens, digits and punctuation split words.
+    "carlson-rice o'brien-mcdonald": "Carlson-Rice O'Brien-McDonald",
+    "carlson,braden,10\nrice,troy,11": "Carlson,Braden,10\nRice,Troy,11",
+    "\"smith\", (jr.)": "\"Smith\", (Jr.)",
+    # Letters which are not ASCII.
+    "núñez ZOË élodie": "Núñez Zoë Élodie",
+    # Spaces, blank lines and line endings are left as they were.
+    "  a  b \n\n\r\nc\r\n": "  A  B \n\n\r\nC\r\n",
+    "": "",
+}
+capitalizer = NameCapitalizer()
+for text, expected in cases.items():
+    assert capitalizer.capitalize(text) == expected, (text, capitalizer.capitalize(text))
+    assert fops.capitalize_words(text) == expected, text
+    # Going over it again changes nothing.
+    assert capitalizer.capitalize(expected) == expected, expected
+
+assert deliberate("McDonald") and deliberate("deAndre") and deliberate("Van")
+assert not deliberate("jOHN") and not deliberate("jOhn") and not deliberate("McD")
+assert not deliberate("O'Brien")
+
+# Other rules can be given.
+custom = NameCapitalizer(prefixes={"van": 2, "vance": None, "o'": 1},
+                         words=["Vanilla", "Vanya"])
+assert custom.capitalize("vanderberg vance vanilla vanya mcdonald o'hara") == \
+    "VanDerberg Vance Vanilla Vanya Mcdonald O'Hara"
+assert custom.capitalize("VAN") == "Van"
+
+# The trie holds each rule at the node reached by its letters.
+assert capitalizer.node("mc")[''] == ['prefix', 2]
+assert capitalizer.node("mack")[''] == ['prefix', None]
+assert capitalizer.node("macy")[''] == ['word', "Macy"]
+assert '' not in capitalizer.node("ma")
+
+# A TokenCache works out each token once.
+calls = []
+cache = TokenCache(lambda token: calls.append(token) or token.upper())
+assert [cache[token] for token in ["a", "b", "a", "a"]] == ["A", "B", "A", "A"]
+assert calls == ["a", "b"] and len(cache) == 2
+
+# The text is cut into batches at the ends of lines, and the cache is emptied
+# when it gets too large, without changing the result.
+capitalize.BATCH = 7
+capitalize.CACHE_SIZE = 3
+small = NameCapitalizer()
+text = '\n'.join(["mcdonald,o'brien,jOHN", "macy smith", "", "d'angelo-rice"] * 5)
+assert small.capitalize(text) == '\n'.join(
+    ["McDonald,O'Brien,John", "Macy Smith", "", "D'Angelo-Rice"] * 5)
+assert sorted(small.cache) == ["", "\n", "d'angelo-rice"]
+
+print("ok")
@@ -1,6 +1,9 @@
 #!/bin/python3
 
-import fops as fo
+import os
+import sys
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import fops as fo # pylint: disable=C0413
 
 test0 = """first,last,number
 Braden,Carlson,2
@@ -13,4 +16,76 @@ Hannah,Rice,4"""
 print(fo.cut(test0,f="1-2"))
 print(fo.cut(test0,f="2-3"))
 print(fo.cut(test0,f="1,3"))
-print(fo.cut(test0,f="1,4"))
+try:
+    print(fo.cut(test0,f="1,4"))
+except fo.DataError as e:
+    print(e)
+
+# csv_cut keeps quoted fields in one piece, and quotes them again when they
+# hold the separator or a line break.
+test1 = '''Last,First,Note
+"Carlson, Braden",Braden,"two
+lines"
+Rice,Troy,"crlf\r\nnote"'''
+
+print(fo.csv_cut(test1, f="Note,Last"))
+assert fo.csv_cut(test1, f="Note,Last") == \
+    'Note,Last\n"two\nlines","Carlson, Braden"\n"crlf\r\nnote",Rice'
+assert fo.csv_cut('a,b\n"x\ny",z', f="1") == 'a\n"x\ny"'
+
+# Ranges of fields are checked before anything is cut. Fields are numbered from
+# 1, and a range may not run backwards.
+assert fo.parse_num_range("1-2, 4") == [1, 2, 4]
+assert fo.parse_num_range("3,1") == [3, 1]
+for rng in ["0", "0-2", "3-1", "1,", ",1", "", "1-", "-2", "a", "1;2", "1--2"]:
+    for cut in [lambda: fo.cut(test0, f=rng), lambda: fo.csv_cut(test1, f=rng),
+                lambda: fo.key_function(f=rng), lambda: fo.cut_function(f=rng)]:
+        try:
+            cut()
+        except fo.DataError as e:
+            message = f"{e}"
+        else:
+            assert False, rng
+print(message)
+
+# The same goes for the callers which do not use the GUI.
+from pipeline import Pipeline # pylint: disable=C0413,C0411
+try:
+    Pipeline.parse("cut f=3-1").run(test0)
+except fo.DataError as e:
+    print(e)
+else:
+    assert False, "no DataError"
+
+# cut_lines works a line at a time, on a file or any iterable of lines, and
+# gives the same lines as cut.
+import os # pylint: disable=C0413,C0411
+import tempfile # pylint: disable=C0413,C0411
+for opts in [{'f': "1-2"}, {'f': "3,1"}, {'f': "2", 'fs': ";"}, {'f': "1,3", 'fs': r",\s*"}]:
+    text = test0 if 'fs' not in opts else test0.replace(",", opts['fs'].replace(r"\s*", " "))
+    expected = fo.cut(text, **opts).split('\n')
+    assert list(fo.cut_lines(text.splitlines(keepends=True), **opts)) == expected
+    with tempfile.TemporaryDirectory() as work:
+        filename = os.path.join(work, "roster.txt")
+        with open(filename, "w", encoding="utf-8", newline='') as f_handle:
+            f_handle.write(text.replace('\n', '\r\n') + '\r\n')
+        assert list(fo.cut_lines(filename, **opts)) == expected, opts
+
+def endless():
+    """ Lines which never stop, so only a cut which reads one at a time can
+    get the first of them. """
+    number = 0
+    while True:
+        number = number + 1
+        yield f"{number},name{number},x\n"
+
+lines = fo.cut_lines(endless(), f="2")
+assert [next(lines) for _ in range(3)] == ["name1", "name2", "name3"]
+
+# A line without enough fields gives its line number.
+try:
+    list(fo.cut_lines(["a,b,c", "a,b,c", "a,b"], f="3"))
+except fo.DataError as e:
+    assert e.lineno == 3, e.lineno
+else:
+    assert False, "no DataError"
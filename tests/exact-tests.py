@@ -0,0 +1,79 @@
+#!/bin/python3
+
+# Checks the exact difference of fops (mode="exact") against comparing every
+# line of one file with every line of the other, and the keys it compares
+# lines by.
+
+import os
+import random
+import sys
+import tempfile
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import fops # pylint: disable=C0413
+
+def slow_difference(lines1, lines2, same):
+    """ The lines of lines1 which are not the same as any line of lines2. """
+    return [line for line in lines1 if not any(same(line, other) for other in lines2)]
+
+def write(filename, text, encoding="utf-8"):
+    with open(filename, "w", encoding=encoding, newline='') as f_handle:
+        f_handle.write(text)
+
+# The key of a line.
+assert fops.normalize_line("  Carlson, Braden \r") == "Carlson, Braden"
+assert fops.normalize_line("Carlson,  Braden", squeeze=True) == "Carlson, Braden"
+assert fops.normalize_line("NÚÑEZ Straße", ignore_case=True) == "núñez strasse"
+assert fops.normalize_line("Rice , Troy ,5", f="1-2") == "Rice\x1fTroy"
+assert fops.normalize_line("Rice", f="1,3") == "Rice\x1f"
+assert fops.normalize_line("Rice;Troy;5", f="3,1", fs=";") == "5\x1fRice"
+
+rng = random.Random(1)
+names = ["Carlson", "carlson", " Carlson", "Carlson\r", "Rice", "RICE", "O'Brien",
+         "Smith (Jr.)", "Smith .Jr.", "a+b", "ab", "Núñez", "Arlee  Carlson",
+         "Arlee Carlson", ""]
+
+with tempfile.TemporaryDirectory() as work:
+    [file1, file2] = [os.path.join(work, "file1.txt"), os.path.join(work, "file2.txt")]
+
+    for _ in range(200):
+        lines1 = rng.choices(names, k=rng.randint(0, 15))
+        lines2 = rng.choices(names, k=rng.randint(0, 15))
+        write(file1, ''.join(line + '\n' for line in lines1))
+        # file2 only ends with a newline if its last line is empty.
+        write(file2, '\n'.join(lines2) + ('\n' if lines2[-1:] == [''] else ''))
+        # The \r of a line is its line ending, which is not part of the line.
+        lines1 = [line.removesuffix('\r') for line in lines1]
+        for opts in ({}, {'ignore_case': True}, {'squeeze': True}):
+            key = fops.key_function(**opts)
+            expected = slow_difference(lines1, lines2, lambda a, b: key(a) == key(b))
+            assert fops.difference(file1, file2, mode="exact", **opts) == expected, \
+                (lines1, lines2, opts)
+            [matches, nonmatches] = fops.match_exact(lines1, lines2, **opts)
+            assert nonmatches == expected
+            assert sorted(matches + nonmatches) == sorted(lines1)
+
+    # Characters which mean something to a regular expression are taken
+    # literally, and a line must be all of another, not part of it.
+    write(file1, "Smith (Jr.)\na+b\nCarl\nRice\n")
+    write(file2, "Smith (Jr.)\nab\nCarlson\nrice\n")
+    assert fops.difference(file1, file2, mode="exact") == ["a+b", "Carl", "Rice"]
+    assert fops.difference(file1, file2, mode="exact", ignore_case=True) == ["a+b", "Carl"]
+
+    # With f, only those columns are compared, and it is the default mode.
+    write(file1, "Smith,John,10\nSmith,Jane,11\nRice,Troy\n")
+    write(file2, "Smith,John,11\nRice , Troy,5\n")
+    assert fops.difference(file1, file2, f="1-2") == ["Smith,Jane,11"]
+
+    # Each file is read in its own encoding.
+    write(file1, "Núñez\r\nZoë\r\n", encoding="cp1252")
+    write(file2, "Zoë\n", encoding="utf-16")
+    assert fops.difference(file1, file2, mode="exact") == ["Núñez"]
+
+    try:
+        fops.difference(file1, os.path.join(work, "missing.txt"), mode="exact")
+    except fops.MissingFileError as e:
+        assert e.filenames == [file1, os.path.join(work, "missing.txt")]
+    else:
+        assert False, "no MissingFileError"
+
+print("ok")
@@ -0,0 +1,77 @@
+#!/bin/python3
+
+# Checks the external merge sort of the extsort module, and the difference
+# built on it, against sorting in memory. The memory budget and MAX_MERGE are
+# made small, so that even a few hundred lines are written out as many runs
+# and merged in several passes.
+
+import os
+import random
+import sys
+import tempfile
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import extsort # pylint: disable=C0413
+import fops # pylint: disable=C0413
+from extsort import external_sort # pylint: disable=C0413
+
+extsort.MAX_MERGE = 3
+
+rng = random.Random(1)
+names = ["Carlson", "carlson", "Rice", "rice ", " Rice", "O'Brien", "Núñez", "Zoë",
+         "Smith", "", "a", "B"]
+
+def write(filename, lines):
+    with open(filename, "w", encoding="utf-8") as f_handle:
+        f_handle.write(''.join(line + '\n' for line in lines))
+
+with tempfile.TemporaryDirectory() as work:
+    runs = os.path.join(work, "runs")
+    os.mkdir(runs)
+
+    for _ in range(50):
+        lines = [f"{rng.choice(names)} {rng.randint(0, 99)}" for _ in range(rng.randint(0, 300))]
+        for memory in (None, 1, 500, 5000):
+            assert list(external_sort(iter(lines), memory=memory, tmpdir=runs)) == sorted(lines)
+            key = len
+            assert list(external_sort(lines, key=key, memory=memory, tmpdir=runs)) == \
+                sorted(lines, key=key)
+        # Every run is removed once the sort is done.
+        assert os.listdir(runs) == []
+
+    # And if the sort is stopped part way.
+    merged = external_sort(map(str, range(1000)), memory=200, tmpdir=runs)
+    next(merged)
+    assert os.listdir(runs) != []
+    merged.close()
+    assert os.listdir(runs) == []
+
+    # The difference of two sorted files, in sorted order.
+    [file1, file2] = [os.path.join(work, "file1.txt"), os.path.join(work, "file2.txt")]
+    for _ in range(50):
+        lines1 = rng.choices(names, k=rng.randint(0, 40))
+        lines2 = rng.choices(names, k=rng.randint(0, 40))
+        write(file1, lines1)
+        write(file2, lines2)
+        for opts in ({}, {'ignore_case': True}):
+            key = fops.key_function(**opts)
+            expected = sorted((line for line in lines1 if key(line) not in set(map(key, lines2))),
+                              key=key)
+            result = list(fops.stream_difference(file1, file2, memory=100, tmpdir=runs, **opts))
+            assert [key(line) for line in result] == [key(line) for line in expected]
+            assert sorted(result) == sorted(expected), (lines1, lines2, opts)
+            # With matches, every line of file1 is given, with whether it was
+            # found.
+            found = list(fops.stream_difference(file1, file2, matches=True, memory=100,
+                                                tmpdir=runs, **opts))
+            assert sorted(found) == sorted([line, key(line) in set(map(key, lines2))]
+                                           for line in lines1)
+        assert os.listdir(runs) == []
+
+    try:
+        list(fops.stream_difference(file1, os.path.join(work, "missing.txt")))
+    except fops.MissingFileError as e:
+        print(e)
+    else:
+        assert False, "no MissingFileError"
+
+print("ok")
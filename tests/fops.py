@@ -1 +0,0 @@
-../fops.py
\ No newline at end of file
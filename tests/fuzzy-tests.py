@@ -0,0 +1,78 @@
+#!/bin/python3
+
+# Checks fops.fuzzy_difference against comparing each line with every line of
+# the other file.
+
+import os
+import random
+import sys
+import tempfile
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import fops # pylint: disable=C0413
+from matching import edit_distance # pylint: disable=C0413
+
+def write(filename, lines):
+    with open(filename, "w", encoding="utf-8") as f_handle:
+        f_handle.write(''.join(line + '\n' for line in lines))
+
+def slow_fuzzy(lines1, lines2, distance, **opts):
+    """ What fuzzy_difference should return: for each line of lines1 without
+    an exact match, the closest line of lines2 (the first one in the file, of
+    those with the key which sorts first on a tie), or None. """
+    key = fops.key_function(**opts)
+    keys2 = {}
+    for line in lines2:
+        keys2.setdefault(key(line), line)
+    results = []
+    for line in lines1:
+        if key(line) in keys2:
+            continue
+        best = min(([edit_distance(key(line), other), other] for other in keys2),
+                   default=[distance + 1, None])
+        if best[0] > distance:
+            results.append([line, None, None])
+        else:
+            results.append([line, keys2[best[1]], best[0]])
+    return results
+
+with tempfile.TemporaryDirectory() as work:
+    [file1, file2] = [os.path.join(work, "file1.txt"), os.path.join(work, "file2.txt")]
+
+    write(file1, ["John Smith", "Jonh Smtih", "Braden Carlson", "Bradn Carlsen",
+                  "Troy Rice", "Zzzz"])
+    write(file2, ["John Smith", "Braden Carlson", "Hannah Rice", "troy rice"])
+    assert fops.fuzzy_difference(file1, file2) == [
+        ["Jonh Smtih", "John Smith", 2],
+        ["Bradn Carlsen", "Braden Carlson", 2],
+        ["Troy Rice", "troy rice", 2],
+        ["Zzzz", None, None]]
+    assert fops.fuzzy_difference(file1, file2, distance=1) == [
+        ["Jonh Smtih", None, None], ["Bradn Carlsen", None, None],
+        ["Troy Rice", None, None], ["Zzzz", None, None]]
+    # With ignore_case, Troy Rice is an exact match, and the candidate is
+    # shown as it is in file2.
+    assert fops.fuzzy_difference(file1, file2, ignore_case=True)[2] == \
+        ["Zzzz", None, None]
+    write(file1, ["TROY RISE"])
+    assert fops.fuzzy_difference(file1, file2, ignore_case=True) == \
+        [["TROY RISE", "troy rice", 1]]
+
+    rng = random.Random(1)
+    for _ in range(100):
+        words = [''.join(rng.choices("abcd", k=rng.randint(1, 6))) for _ in range(30)]
+        lines1 = rng.choices(words, k=10)
+        lines2 = rng.sample(words, 10)
+        write(file1, lines1)
+        write(file2, lines2)
+        for distance in (0, 1, 2):
+            assert fops.fuzzy_difference(file1, file2, distance=distance) == \
+                slow_fuzzy(lines1, lines2, distance), (lines1, lines2, distance)
+
+    try:
+        fops.fuzzy_difference(file1, os.path.join(work, "missing.txt"))
+    except fops.MissingFileError as e:
+        print(e)
+    else:
+        assert False, "no MissingFileError"
+
+print("ok")
@@ -0,0 +1,48 @@
+#!/bin/python3
+
+# Checks that fops can be imported without a display, and that importing it
+# stays cheap. The time of each module is taken from python -X importtime;
+# only the modules of this project count towards the budget, since the
+# standard library modules they need (re, mostly) are loaded by nearly every
+# program anyway.
+
+import os
+import subprocess
+import sys
+
+# Largest time, in milliseconds, that importing the project's own modules may take.
+BUDGET = 5
+
+# Modules which must not be loaded by import fops.
+FORBIDDEN = ["tkinter", "dialog", "csv", "tempfile", "concurrent.futures"]
+
+# The base directory of the project, which fops is imported from.
+BASE = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PROJECT = {name.removesuffix(".py") for name in os.listdir(BASE) if name.endswith(".py")}
+
+CHECK = f"import sys, fops; print([m for m in {FORBIDDEN!r} if m in sys.modules])"
+
+env = dict(os.environ)
+env.pop("DISPLAY", None)
+env.pop("PYTHONDONTWRITEBYTECODE", None)
+
+# The first run writes the bytecode, so only the second is timed.
+for _ in range(2):
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", CHECK],
+                            capture_output=True, text=True, env=env, check=True, cwd=BASE)
+
+total = 0
+for line in result.stderr.splitlines():
+    [_, own, _, name] = [field.strip() for field in line.replace(":", "|", 1).split("|")]
+    if name in PROJECT:
+        print(f"{name:12} {int(own) / 1000:6.2f} ms")
+        total = total + int(own)
+
+print(f"{'total':12} {total / 1000:6.2f} ms (budget {BUDGET} ms)")
+print(f"forbidden modules loaded: {result.stdout.strip()}")
+
+if total > BUDGET * 1000 or result.stdout.strip() != "[]":
+    print("FAILED")
+    sys.exit(1)
+print("OK")
@@ -0,0 +1,110 @@
+#!/bin/python3
+
+# Checks that a DifferenceIndex, brought up to date one edit at a time, always
+# agrees with taking the whole difference again with fops.match_exact.
+
+import os
+import random
+import sys
+import tempfile
+from collections import Counter
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import fops # pylint: disable=C0413
+import incremental # pylint: disable=C0413
+from incremental import DifferenceIndex, IncrementalDifference # pylint: disable=C0413
+
+# Compare a few characters at a time, so that edits land on both sides of a
+# block.
+incremental.BLOCK = 4
+
+rng = random.Random(1)
+names = ["Carlson", "carlson", "Rice", " Rice", "O'Brien", "Núñez", "Rice,5", "rice,4", ""]
+
+def edit(lines):
+    """ Returns a copy of lines with a few lines added, removed, replaced or
+    moved. """
+    lines = list(lines)
+    for _ in range(rng.randint(1, 3)):
+        where = rng.randint(0, len(lines))
+        choice = rng.random()
+        if choice < 0.3 or not lines:
+            lines[where:where] = rng.choices(names, k=rng.randint(1, 3))
+        elif choice < 0.6:
+            del lines[where:where + rng.randint(1, 3)]
+        elif choice < 0.8:
+            lines[where:where + 1] = [rng.choice(names)]
+        else:
+            lines.insert(rng.randint(0, len(lines)), lines.pop(min(where, len(lines) - 1)))
+    return lines
+
+def text(lines):
+    """ The text of lines, which may or may not end with a newline. """
+    return '\n'.join(lines) + rng.choice(['', '\n'])
+
+def check(index, text1, text2, **opts):
+    """ Compares the results of index with the whole difference of the texts.
+    The order of the lines may differ (see DifferenceIndex.results), but not
+    how many of each there are. """
+    expected = fops.match_exact(text1.splitlines(), text2.splitlines(), **opts)
+    results = index.results()
+    for side in (0, 1):
+        assert Counter(results[side]) == Counter(expected[side]), \
+            (side, text1, text2, results, expected)
+    return expected
+
+for opts in ({}, {'ignore_case': True}, {'f': "1"}):
+    for _ in range(100):
+        index = DifferenceIndex(**opts)
+        lines = [[], []]
+        texts = ['', '']
+        for _ in range(20):
+            side = rng.randint(0, 1)
+            lines[side] = edit(lines[side])
+            texts[side] = text(lines[side])
+            index.update(side, texts[side])
+            check(index, texts[0], texts[1], **opts)
+
+# Line endings are kept apart from the lines.
+index = DifferenceIndex()
+index.update(1, "Rice\r\nCarlson\r\n")
+index.update(0, "Rice\r\nSmith\r\n")
+assert index.results() == [["Rice"], ["Smith"]], index.results()
+
+# The files are only read again when they change.
+with tempfile.TemporaryDirectory() as work:
+    [file1, file2, match, no_match] = [os.path.join(work, name) for name in
+                                       ("file1.txt", "file2.txt", "match.txt", "no-match.txt")]
+    lines = [rng.choices(names, k=50), rng.choices(names, k=10)]
+    texts = [text(lines[0]), text(lines[1])]
+    for filename, contents in zip((file1, file2), texts):
+        with open(filename, "w", encoding="utf-8") as f_handle:
+            f_handle.write(contents)
+    diff = IncrementalDifference(file1, file2)
+    check(diff, *texts)
+    assert not diff.refresh()
+
+    for _ in range(20):
+        side = rng.randint(0, 1)
+        lines[side] = edit(lines[side])
+        texts[side] = text(lines[side])
+        filename = (file1, file2)[side]
+        with open(filename, "w", encoding="utf-8") as f_handle:
+            f_handle.write(texts[side])
+        # Make sure the change is seen even if the size and time are the same.
+        os.utime(filename, ns=(0, rng.randint(1, 10**18)))
+        diff.refresh()
+        expected = check(diff, *texts)
+        diff.write(match, no_match)
+        for group, output in enumerate((match, no_match)):
+            with open(output, encoding="utf-8") as f_handle:
+                assert Counter(f_handle.read().splitlines()) == Counter(expected[group])
+
+    os.remove(file2)
+    try:
+        diff.refresh()
+    except fops.MissingFileError as e:
+        print(e)
+    else:
+        assert False, "no MissingFileError"
+
+print("ok")
@@ -0,0 +1,153 @@
+#!/bin/python3
+
+# Checks the Recorder of the instrument module: the phases recorded for each
+# operation, their sizes and memory, operations which fail, are cancelled, or
+# go on in a worker (defer and resume), the trace file, the listeners, and
+# stats.
+
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import instrument # pylint: disable=C0413
+from instrument import Recorder, records, size_of # pylint: disable=C0413
+
+assert size_of("") == [0, 0]
+assert size_of("a\nb") == [2, 3]
+assert size_of("a\nb\n") == [2, 4]
+assert size_of("Núñez\n") == [1, 8]
+assert size_of(b"a\r\nb") == [2, 4]
+assert size_of(["ab", "c"]) == [2, 3]
+assert size_of([1, 2]) == [2, None]
+assert size_of({'a': [1, 2], 'b': "xyz", 'c': 5}) == [5, None]
+assert size_of(None) == [None, None]
+
+instrument.HISTORY = 3
+with tempfile.TemporaryDirectory() as work:
+    trace = os.path.join(work, "trace.jsonl")
+    recorder = Recorder(trace=trace)
+    finished = []
+    recorder.add_listener(finished.append)
+
+    # Nothing is recorded outside of an operation.
+    with recorder.phase("alone") as phase:
+        phase.takes("a\nb")
+    assert recorder.current is None and finished == [] and phase.seconds == 0.0
+
+    source = object()
+    with recorder.operation("sort", source) as operation:
+        with recorder.phase("get_content") as phase:
+            text = phase.gives("b\na\nc")
+        result = recorder.call("fops.sort_lines", lambda text: '\n'.join(sorted(text.split())),
+                               text)
+        with recorder.phase("insert") as phase:
+            phase.takes(result)
+            time.sleep(0.01)
+        # An operation started inside another is part of it.
+        with recorder.operation("other") as inner:
+            assert inner is operation
+            with recorder.phase("allocate"):
+                block = bytearray(4 * 2**20)
+                del block
+    assert finished == [operation] and operation.source is source
+    assert [phase.name for phase in operation.phases] == \
+        ["get_content", "fops.sort_lines", "insert", "allocate"]
+    [content, work_phase, insert, allocate] = operation.phases
+    assert [content.rows_in, content.rows_out, content.bytes_out] == [None, 3, 5]
+    assert [work_phase.rows_in, work_phase.rows_out] == [3, 3]
+    assert insert.seconds >= 0.01 and operation.seconds >= insert.seconds
+    assert allocate.peak >= 4 * 2**20 and operation.peak == allocate.peak
+    assert not tracemalloc.is_tracing()
+    summary = operation.summary()
+    assert summary.startswith("sort: ") and "get_content" in summary and \
+        summary.endswith(" MB") and "3 -> 3 rows" in summary, summary
+
+    # Without memory, only the times are recorded.
+    recorder.memory = False
+    with recorder.operation("strip"):
+        with recorder.phase("fops.strip"):
+            pass
+    assert finished[-1].peak is None and finished[-1].phases[0].peak is None
+    assert "peak" not in finished[-1].summary()
+
+    # An operation which fails is kept, with its error.
+    try:
+        with recorder.operation("cut"):
+            with recorder.phase("fops.cut"):
+                raise ValueError("line 2 only has 1 fields.")
+    except ValueError:
+        pass
+    else:
+        assert False, "no ValueError"
+    assert finished[-1].name == "cut" and finished[-1].error == "line 2 only has 1 fields."
+    assert finished[-1].summary().endswith("failed: line 2 only has 1 fields.")
+    assert recorder.current is None
+
+    # One which is cancelled before any phase is not.
+    with recorder.operation("difference"):
+        pass
+    assert len(finished) == 3
+
+    # One which goes on in a worker is finished when it is resumed.
+    with recorder.operation("capitalize"):
+        with recorder.phase("get_content"):
+            pass
+        deferred = recorder.defer()
+    assert len(finished) == 3 and recorder.current is None
+    recorder.ran("worker", 0.5, "a\nb", ["A", "B"])
+    assert deferred.phases[-1].name == "get_content"
+    with recorder.resume(deferred):
+        recorder.ran("worker", 0.5, "a\nb", ["A", "B"])
+        with recorder.phase("insert"):
+            pass
+    assert finished[-1] is deferred
+    assert [phase.name for phase in deferred.phases] == ["get_content", "worker", "insert"]
+    assert deferred.phases[1].seconds == 0.5 and deferred.phases[1].rows_out == 2
+    with recorder.resume(None) as nothing:
+        assert nothing is None
+    assert recorder.defer() is None
+
+    # Every finished operation is in the trace, but only the last HISTORY are
+    # kept.
+    with open(trace, encoding="utf-8") as f_handle:
+        lines = [json.loads(line) for line in f_handle]
+    assert [line['operation'] for line in lines] == ["sort", "strip", "cut", "capitalize"]
+    assert lines[0]['phases'][2]['name'] == "insert" and lines[2]['error'] is not None
+    assert [operation.name for operation in recorder.history] == ["strip", "cut", "capitalize"]
+
+    stats = recorder.stats()
+    assert sorted(stats) == ["capitalize", "cut", "strip"]
+    assert stats["capitalize"]['count'] == 1 and stats["capitalize"]['seconds'] >= 0.5
+    assert stats["capitalize"]['phases']["worker"] == 0.5
+    assert stats["capitalize"]['mean'] == stats["capitalize"]['seconds']
+    assert stats["capitalize"]['last']['operation'] == "capitalize"
+    assert list(recorder.stats("cut")) == ["cut"] and recorder.stats("nothing") == {}
+
+    recorder.remove_listener(finished.append)
+    recorder.remove_listener(finished.append)
+    with recorder.operation("sort"):
+        with recorder.phase("fops.sort_lines"):
+            pass
+    assert len(finished) == 4
+
+# The records decorator runs a method as an operation of RECORDER.
+class Widget:
+    """ Runs an operation. """
+
+    @records("widget")
+    def run(self):
+        """ Does one phase. """
+        with instrument.RECORDER.phase("work"):
+            return "done"
+
+seen = []
+instrument.RECORDER.add_listener(seen.append)
+widget = Widget()
+assert widget.run() == "done" and Widget.run.__name__ == "run"
+assert [seen[0].name, seen[0].source] == ["widget", widget]
+instrument.RECORDER.remove_listener(seen.append)
+
+print("ok")
@@ -0,0 +1,104 @@
+#!/bin/python3
+
+# Checks that the difference, cut and sort_lines functions of fops give the
+# same lines when they are given a LineTable as when they are given the text
+# of the same file, in every encoding and with every kind of line ending the
+# reader module handles.
+
+import os
+import random
+import sys
+import tempfile
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import fops # pylint: disable=C0413
+import linetable # pylint: disable=C0413
+from linetable import LineTable # pylint: disable=C0413
+from reader import read_lines, read_text # pylint: disable=C0413
+
+# Look at a few bytes at a time, so that lines fall across blocks.
+linetable.BLOCK = 16
+
+rng = random.Random(6)
+fields = ["Carlson", "carlson", "CARLSON", " Rice ", "rice", "O'Brien", "Núñez", "NÚÑEZ",
+          "Zoë", "Straße", "STRASSE", "", "10", "9", "a  b", "a b"]
+encodings = ["utf-8", "utf-8-sig", "cp1252", "utf-16"]
+
+def write(filename, lines, encoding, ending):
+    with open(filename, "w", encoding=encoding, newline='') as f_handle:
+        f_handle.write(''.join(line + ending for line in lines))
+
+def random_lines(ascii_only):
+    """ Returns a list of lines of up to three fields. The last line is not
+    empty, since splitlines would lose it. """
+
+    choices = [field for field in fields if field.isascii() or not ascii_only]
+    least = rng.randint(1, 3)
+    lines = [','.join(rng.choices(choices, k=rng.randint(least, 3)))
+             for _ in range(rng.randint(0, 20))]
+    return lines + ["last,line,here"]
+
+with tempfile.TemporaryDirectory() as work:
+    [file1, file2] = [os.path.join(work, "file1.txt"), os.path.join(work, "file2.txt")]
+    for _ in range(150):
+        ascii_only = rng.random() < 0.4
+        [lines1, lines2] = [random_lines(ascii_only), random_lines(ascii_only)]
+        write(file1, lines1, rng.choice(encodings), rng.choice(['\n', '\r\n']))
+        write(file2, lines2, rng.choice(encodings), rng.choice(['\n', '\r\n']))
+        text = read_text(file1)
+
+        with LineTable(file1) as table, LineTable(file2) as other:
+            assert list(table.texts()) == lines1
+
+            for opts in ({}, {'ignore_case': True}, {'reverse': True, 'unique': True},
+                         {'ignore_case': True, 'unique': True}):
+                assert list(fops.sort_lines(table, **opts).texts()) == \
+                    fops.sort_lines(text, **opts).split('\n'), opts
+
+            for opts in ({}, {'ignore_case': True}, {'squeeze': True}, {'f': "1"},
+                         {'f': "2-3", 'fs': ",", 'ignore_case': True}):
+                expected = fops.difference(file1, file2, **dict(opts, mode="exact"))
+                assert list(fops.difference(table, other, **opts).texts()) == expected, opts
+                assert list(fops.difference(table, file2, **opts).texts()) == expected
+
+            for f in ("1", "1,1", "1-2", "3"):
+                try:
+                    expected = fops.cut(text, f=f)
+                except fops.DataError as e:
+                    message = f"{e}"
+                    try:
+                        fops.cut(table, f=f)
+                    except fops.DataError as error:
+                        assert f"{error}" == message
+                    else:
+                        assert False, "no DataError"
+                    continue
+                assert fops.cut(table, f=f).decode(table.encoding) == expected
+
+    # A regular expression as the separator.
+    write(file1, ["Carlson ,Braden", "Rice,  Troy", "Núñez,Ana"], "utf-8", '\r\n')
+    with LineTable(file1) as table:
+        assert fops.cut(table, f="2,1", fs=r"\s*,\s*").decode("utf-8") == \
+            fops.cut(read_text(file1), f="2,1", fs=r"\s*,\s*")
+
+    # A \r which ends the last line of the file is left off, as the reader
+    # module does, whatever the other lines end with.
+    for data in (b"a\r\nb\nc\r", b"a\r\nb\r\nc\r", b"a\nb\r", b"a\r\n\r", b"\r\n\r",
+                 b"x\r", b"a\r\n" + b"b" * 40 + b"\r"):
+        with open(file1, "wb") as f_handle:
+            f_handle.write(data)
+        with LineTable(file1) as table:
+            lines = list(read_lines(file1))
+            assert list(table.texts()) == lines, data
+            assert [table.text(index) for index in range(len(table))] == lines, data
+            assert list(fops.sort_lines(table).texts()) == sorted(lines)
+    with LineTable(file1) as table:
+        assert list(table.texts()) == ["a", "b" * 40]
+
+    try:
+        fops.difference(LineTable(file1), os.path.join(work, "missing.txt"))
+    except fops.MissingFileError as e:
+        print(e)
+    else:
+        assert False, "no MissingFileError"
+
+print("ok")
@@ -0,0 +1,96 @@
+#!/bin/python3
+
+# Checks the command line tool in link_crew.py: differences printed or written
+# to the --match and --no-match files, capitalizing a file in place without
+# changing its encoding or line endings, --backup, and the errors which stop
+# it.
+
+import contextlib
+import io
+import os
+import sys
+import tempfile
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from link_crew import main # pylint: disable=C0413
+
+def write(filename, text, encoding="utf-8"):
+    with open(filename, "w", encoding=encoding, newline='') as f_handle:
+        f_handle.write(text)
+
+def read(filename, encoding="utf-8"):
+    with open(filename, encoding=encoding, newline='') as f_handle:
+        return f_handle.read()
+
+def run(*argv):
+    """ Runs the tool, and returns its exit status and what it printed. """
+
+    out = io.StringIO()
+    err = io.StringIO()
+    with contextlib.redirect_stdout(out), contextlib.redirect_stderr(err):
+        status = main(list(argv))
+    return [status, out.getvalue(), err.getvalue()]
+
+with tempfile.TemporaryDirectory() as work:
+    os.chdir(work)
+    write("recommended.txt", "Carlson\r\nRice\r\nO'Brien\r\nNúñez\r\nSmith")
+    write("accepted.txt", "Carlson, Braden, 10\nO'Brien, Kate, 12\r\nNúñez, Ana, 11\n"
+                          "Carlson, Ada, 9\n")
+
+    # Each line of the first file is searched for in the second, like grep -F,
+    # and the ones which are not found are printed.
+    assert run("-r", "recommended.txt", "-a", "accepted.txt", "-d", "recommended", "-",
+               "accepted") == [0, "Rice\nSmith\n", ""]
+    assert run("-r", "recommended.txt", "-a", "accepted.txt", "-d", "accepted",
+               "recommended")[1] == "Carlson, Braden, 10\nO'Brien, Kate, 12\n" \
+                                    "Núñez, Ana, 11\nCarlson, Ada, 9\n"
+
+    # With --skip-line-endings the \r stays on each line, so "Carlson\r" is no
+    # longer found.
+    assert run("-r", "recommended.txt", "-a", "accepted.txt", "--skip-line-endings",
+               "-d", "recommended", "accepted")[1] == \
+        "Carlson\r\nRice\r\nO'Brien\r\nNúñez\r\nSmith\n"
+
+    # The lines which match, and those which don't, may be appended to files.
+    write("found.txt", "already here\n")
+    assert run("-r", "recommended.txt", "-a", "accepted.txt", "-d", "recommended", "-",
+               "accepted", "--match", "found.txt", "-n", "missing.txt") == [0, "", ""]
+    assert read("found.txt") == "already here\nCarlson, Braden, 10\nCarlson, Ada, 9\n" \
+                                "O'Brien, Kate, 12\nNúñez, Ana, 11\n"
+    assert read("missing.txt") == "Rice\nSmith\n"
+
+    # Capitalizing keeps the encoding, the BOM and every line ending, and
+    # --backup keeps a copy of the file as it was.
+    for encoding, text, expected in (
+            ("utf-8", "carlson, braden\r\nnúñez, ana\nmcdonald",
+             "Carlson, Braden\r\nNúñez, Ana\nMcDonald"),
+            ("utf-8-sig", "o'brien, kate\r\n\r\nrice, troy\r\n",
+             "O'Brien, Kate\r\n\r\nRice, Troy\r\n"),
+            ("cp1252", "zoë smith\nsmith-jones, ‘al’\n", "Zoë Smith\nSmith-Jones, ‘Al’\n"),
+            ("utf-16", "carlson\r\nnúñez\r\n", "Carlson\r\nNúñez\r\n")):
+        write("names.txt", text, encoding)
+        assert run("--backup", "-c", "names.txt") == [0, "", ""]
+        with open("names.txt", "rb") as f_handle:
+            assert f_handle.read() == expected.encode(encoding), encoding
+        assert read(os.path.join("backups", "names.txt.before_caps"), encoding) == text
+
+    # The operations are done in the order they are given.
+    write("recommended.txt", "o'brien\n")
+    assert run("-r", "recommended.txt", "-a", "accepted.txt", "-d", "recommended",
+               "accepted", "-c", "recommended.txt", "-d", "recommended", "accepted") == \
+        [0, "o'brien\n", ""]
+
+    # Mistakes stop the tool with a status of 1.
+    for argv in (["-r", "nothing.txt"],
+                 ["-c", "nothing.txt"],
+                 ["-r", "recommended.txt", "-d", "recommended", "accepted"],
+                 ["-r", "recommended.txt", "-d", "recommended", "recommended"],
+                 ["-r", "recommended.txt", "-a", "accepted.txt", "-d", "recommended"],
+                 ["-r", "recommended.txt", "-a", "accepted.txt", "-d", "recommended",
+                  "roster"]):
+        [status, out, err] = run(*argv)
+        assert status == 1 and out == "" and "exiting" in err, argv
+        print(err, end='')
+
+    os.chdir(os.path.dirname(work))
+
+print("ok")
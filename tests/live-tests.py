@@ -0,0 +1,204 @@
+#!/bin/python3
+
+# Checks the live difference of an OperationTab (a LiveDifference), which is
+# kept up to date as the two TextTabs it was started on are edited. The methods
+# of OperationTab and TextTab involved are run on stand-ins for the widgets (as
+# the textview tests do), so no display is needed. After every burst of edits, the output
+# must be the lines of the first text which are not in the second, just as
+# fops.difference would give.
+
+import os
+import random
+import sys
+from collections import Counter
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import dialog # pylint: disable=C0413
+import fops # pylint: disable=C0413
+from graphic_elements import OperationTab, TextTab # pylint: disable=C0413
+
+rng = random.Random(4)
+names = ["Carlson,Braden", "carlson,Braden", "Rice,Troy", " Rice,Troy", "O'Brien,Kate",
+         "Núñez,Ana", "Smith,Al", "Smtih,Al", ""]
+
+# The errors which would be shown in a message box.
+errors = []
+dialog.error = lambda parent, message: errors.append(message)
+
+class Variable:
+    """ Stands in for a StringVar or BooleanVar. """
+
+    def __init__(self, value):
+        self.value = value
+
+    def get(self):
+        return self.value
+
+    def set(self, value):
+        self.value = value
+
+class Select:
+    """ Stands in for a ttk.Combobox, with an item chosen. """
+
+    def __init__(self, index):
+        self.index = index
+
+    def current(self):
+        return self.index
+
+class Output:
+    """ Stands in for the Text widget of the output area. """
+
+    def __init__(self):
+        self.text = ""
+
+    def delete(self, start, end): # pylint: disable=W0613
+        self.text = ""
+
+    def insert(self, index, text): # pylint: disable=W0613
+        self.text = text + self.text
+
+class Tab:
+    """ A TextTab holding text, which tells its listeners when it changes. """
+
+    add_listener = TextTab.add_listener
+    remove_listener = TextTab.remove_listener
+    notify_listeners = TextTab.notify_listeners
+
+    def __init__(self, text):
+        self.text = text
+        self.listeners = []
+        self.view = None
+
+    def get_content(self):
+        return self.text
+
+    def edit(self, text):
+        self.text = text
+        self.notify_listeners()
+
+class Notebook:
+    """ Holds the tabs. """
+
+    def __init__(self, tabs):
+        self.tabs = tabs
+
+    def get_text_tabs(self):
+        return self.tabs
+
+class Operations: # pylint: disable=R0902
+    """ An OperationTab, comparing the first two tabs of the notebook. The
+    functions given to after_idle wait in idle until run_idle is called. """
+
+    toggle_live = OperationTab.toggle_live
+    start_live = OperationTab.start_live
+    stop_live = OperationTab.stop_live
+    refuse_live = OperationTab.refuse_live
+    key_options = OperationTab.key_options
+    show_output = OperationTab.show_output
+
+    def __init__(self, tabs, columns=""):
+        self.master = Notebook(tabs)
+        self.file1_select = Select(0)
+        self.file2_select = Select(1)
+        self.key_columns = Variable(columns)
+        self.key_separator = Variable("")
+        self.live = Variable(False)
+        self.live_difference = None
+        self.output = Output()
+        self.idle = []
+
+    def after_idle(self, function):
+        self.idle.append(function)
+
+    def run_idle(self):
+        [idle, self.idle] = [self.idle, []]
+        for function in idle:
+            function()
+
+    def check(self):
+        """ Checks the output against fops.difference. """
+
+        key = fops.key_function(**self.key_options())
+        right = {key(line) for line in self.master.tabs[1].text.splitlines()}
+        expected = [line for line in self.master.tabs[0].text.splitlines()
+                    if key(line) not in right]
+        assert Counter(self.output.text.split('\n')) - Counter(['']) == \
+            Counter(expected) - Counter(['']), (self.master.tabs, self.output.text)
+
+def random_text():
+    return '\n'.join(rng.choices(names, k=rng.randint(0, 8)))
+
+left = Tab("Carlson,Braden\nSmtih,Al\nRice,Troy\n")
+right = Tab("Carlson,Braden\nRice,Troy\nSmith,Al")
+operations = Operations([left, right])
+operations.live.set(True)
+operations.toggle_live()
+assert operations.output.text == "Smtih,Al"
+live_difference = operations.live_difference
+assert left.listeners == [live_difference.on_change] == right.listeners
+
+# A burst of edits is applied once, when Tk is idle.
+left.edit("Carlson,Braden\nSmith,A\nRice,Troy\n")
+left.edit("Carlson,Braden\nSmith,Al\nRice,Troy\n")
+assert len(operations.idle) == 1 and operations.output.text == "Smtih,Al"
+operations.run_idle()
+assert operations.output.text == ""
+
+right.edit("Carlson,Braden\nSmith,Al")
+operations.run_idle()
+assert operations.output.text == "Rice,Troy"
+
+# Edits to either tab, at random.
+for _ in range(300):
+    for _ in range(rng.randint(1, 3)):
+        rng.choice([left, right]).edit(random_text())
+    operations.run_idle()
+    operations.check()
+
+# Once stopped, the tabs are let go and the output is left alone.
+output = operations.output.text
+operations.live.set(False)
+operations.toggle_live()
+assert left.listeners == [] == right.listeners
+left.edit("Zoë")
+assert operations.idle == [] and operations.output.text == output
+# A refresh scheduled before it was stopped does nothing.
+live_difference.on_change(left)
+live_difference.refresh()
+assert operations.output.text == output
+
+# The key columns are used to compare lines.
+operations.key_columns.set("1")
+operations.live.set(True)
+operations.toggle_live()
+for _ in range(100):
+    rng.choice([left, right]).edit(random_text())
+    operations.run_idle()
+    operations.check()
+
+# A range which is not valid doesn't start it.
+operations.key_columns.set("1-")
+operations.toggle_live()
+assert operations.live.get() is False and operations.live_difference is None
+assert errors.pop() == "1- is not a valid range of columns."
+
+# Nor does a file shown a window at a time, even once it has started.
+operations.key_columns.set("")
+for tab in (left, right):
+    operations.live.set(True)
+    tab.view = object()
+    operations.toggle_live()
+    assert operations.live.get() is False and operations.live_difference is None
+    print(errors.pop())
+    tab.view = None
+    operations.live.set(True)
+    operations.toggle_live()
+    tab.view = object()
+    tab.edit("Rice,Troy")
+    operations.run_idle()
+    assert operations.live.get() is False and tab.listeners == []
+    print(errors.pop())
+    tab.view = None
+assert errors == []
+
+print("ok")
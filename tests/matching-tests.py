@@ -0,0 +1,73 @@
+#!/bin/python3
+
+# Checks the matchers of the matching module against the obvious ways of
+# getting the same answers.
+
+import os
+import random
+import sys
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from matching import AhoCorasick, TrigramIndex, edit_distance # pylint: disable=C0413
+
+rng = random.Random(1)
+
+def word(size):
+    """ A random word over a small alphabet, so that patterns overlap. """
+    return ''.join(rng.choice("abc") for _ in range(size))
+
+# AhoCorasick finds the same patterns as searching for each one with in,
+# including patterns inside other patterns and the empty pattern.
+for _ in range(500):
+    patterns = [word(rng.randint(0, 4)) for _ in range(rng.randint(1, 8))]
+    text = word(rng.randint(0, 30))
+    assert AhoCorasick(patterns).search(text) == {p for p in patterns if p in text}, \
+        (patterns, text)
+
+# The text may come in chunks, and a pattern may span two of them.
+automaton = AhoCorasick(["Smith (Jr.)", "Rice", "Carlson"])
+assert automaton.search(["Braden Smi", "th (Jr.) and Troy Ri", "ce"]) == \
+    {"Smith (Jr.)", "Rice"}
+assert automaton.search("Smith Jr.") == set()
+
+def slow_distance(word1, word2):
+    """ The edit distance with swaps, computed the textbook way. """
+    rows = [[i + j if i * j == 0 else 0 for j in range(len(word2) + 1)]
+            for i in range(len(word1) + 1)]
+    for i in range(1, len(word1) + 1):
+        for j in range(1, len(word2) + 1):
+            rows[i][j] = min(rows[i - 1][j] + 1, rows[i][j - 1] + 1,
+                             rows[i - 1][j - 1] + (word1[i - 1] != word2[j - 1]))
+            if i > 1 and j > 1 and word1[i - 1] == word2[j - 2] \
+               and word1[i - 2] == word2[j - 1]:
+                rows[i][j] = min(rows[i][j], rows[i - 2][j - 2] + 1)
+    return rows[-1][-1]
+
+assert edit_distance("John", "Jonh") == 1
+assert edit_distance("Carlson", "Carlsen") == 1
+assert edit_distance("", "Rice") == 4
+for _ in range(500):
+    [word1, word2] = [word(rng.randint(0, 7)), word(rng.randint(0, 7))]
+    distance = slow_distance(word1, word2)
+    assert edit_distance(word1, word2) == distance, (word1, word2)
+    # With a limit, anything past it is reported as limit + 1.
+    limit = rng.randint(0, 4)
+    assert edit_distance(word1, word2, limit) == min(distance, limit + 1), \
+        (word1, word2, limit)
+
+# TrigramIndex.closest finds the same word as comparing against every word,
+# preferring the one which sorts first on a tie.
+words = [word(rng.randint(1, 8)) for _ in range(300)]
+index = TrigramIndex(words)
+assert len(index) == len(set(words))
+for _ in range(300):
+    query = word(rng.randint(1, 8))
+    most = rng.randint(0, 3)
+    [distance, best] = min([slow_distance(query, other), other] for other in set(words))
+    expected = [best, distance] if distance <= most else None
+    assert index.closest(query, most) == expected, (query, most)
+
+names = TrigramIndex(["Carlson", "Rice", "Brynnli", "Arlee"])
+assert names.closest("Carslon", 2) == ["Carlson", 1]
+assert names.closest("Hannah", 2) is None
+
+print("ok")
@@ -0,0 +1,69 @@
+#!/bin/python3
+
+# Checks that parallel.difference gives the same lines, in the same order, as
+# fops.difference with mode="exact".
+
+import os
+import random
+import sys
+import tempfile
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import fops # pylint: disable=C0413
+import parallel # pylint: disable=C0413
+
+def write(filename, text, encoding="utf-8"):
+    """ Writes text to filename as it is, without translating newlines. """
+    with open(filename, "w", encoding=encoding, newline='') as f_handle:
+        f_handle.write(text)
+
+def check(file1, file2, **opts):
+    """ Compares the two differences, with as many workers as opts says. """
+    expected = fops.difference(file1, file2, mode="exact", **opts)
+    for workers in (1, 2, 3):
+        result = parallel.difference(file1, file2, workers=workers, **opts)
+        assert result == expected, (workers, opts, result[:5], expected[:5])
+    return expected
+
+if __name__ == "__main__":
+    # Even the small files here are split over the workers.
+    parallel.PARALLEL_SIZE = 0
+    rng = random.Random(1)
+    names = ["Carlson", "carlson ", "Rice", "O'Brien", "Núñez", "  rice", "Smith, Jr.",
+             "Arlee Carlson", "arlee  carlson", ""]
+
+    with tempfile.TemporaryDirectory() as work:
+        [file1, file2] = [os.path.join(work, "file1.txt"), os.path.join(work, "file2.txt")]
+
+        for _ in range(20):
+            lines1 = [f"{rng.choice(names)},{rng.randint(1, 50)}" for _ in range(3000)]
+            lines2 = [f"{rng.choice(names)},{rng.randint(1, 50)}" for _ in range(1000)]
+            write(file1, '\n'.join(lines1) + rng.choice(['', '\n']))
+            write(file2, '\n'.join(lines2) + '\n')
+            check(file1, file2)
+            check(file1, file2, ignore_case=True, squeeze=True)
+            check(file1, file2, f="1")
+
+        # The lines come back in the order of file1, duplicates and all.
+        write(file1, "b\na\nc\na\nd\n")
+        write(file2, "c\n")
+        assert check(file1, file2) == ["b", "a", "a", "d"]
+
+        # Empty files.
+        write(file2, "")
+        assert check(file1, file2) == ["b", "a", "c", "a", "d"]
+        write(file1, "")
+        assert check(file1, file2) == []
+
+        # Each file is read in its own encoding, with any line endings.
+        write(file1, "Núñez\r\nRice\r\nZoë\r\n", encoding="cp1252")
+        write(file2, "Zoë\rRice\r", encoding="utf-16")
+        assert check(file1, file2) == ["Núñez"]
+
+        try:
+            parallel.difference(file1, os.path.join(work, "missing.txt"), workers=2)
+        except fops.MissingFileError as e:
+            print(e)
+        else:
+            assert False, "no MissingFileError"
+
+    print("ok")
@@ -0,0 +1,65 @@
+#!/bin/python3
+
+# Checks fops.partition, which splits the lines of two files into those only
+# in the first, only in the second, and in both, with their line numbers.
+
+import os
+import random
+import sys
+import tempfile
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import fops # pylint: disable=C0413
+
+def write(filename, lines):
+    with open(filename, "w", encoding="utf-8") as f_handle:
+        f_handle.write(''.join(line + '\n' for line in lines))
+
+def slow_partition(lines1, lines2, **opts):
+    """ What partition should return, one key at a time. """
+    key = fops.key_function(**opts)
+    groups = {'left': [], 'right': [], 'both': []}
+    keys1 = list(dict.fromkeys(map(key, lines1)))
+    keys2 = list(dict.fromkeys(map(key, lines2)))
+    for k in keys1:
+        line = next(line for line in lines1 if key(line) == k)
+        numbers1 = [n for n, line in enumerate(lines1, 1) if key(line) == k]
+        numbers2 = [n for n, line in enumerate(lines2, 1) if key(line) == k]
+        groups['both' if numbers2 else 'left'].append([line, numbers1, numbers2])
+    for k in keys2:
+        if k not in keys1:
+            line = next(line for line in lines2 if key(line) == k)
+            groups['right'].append([line, [], [n for n, line in enumerate(lines2, 1)
+                                               if key(line) == k]])
+    return groups
+
+with tempfile.TemporaryDirectory() as work:
+    [file1, file2] = [os.path.join(work, "file1.txt"), os.path.join(work, "file2.txt")]
+
+    write(file1, ["Carlson", "Rice", "carlson", "Smith", "Carlson"])
+    write(file2, ["Jones", "carlson ", "Rice", "Jones"])
+    assert fops.partition(file1, file2) == {
+        'left': [["Carlson", [1, 5], []], ["Smith", [4], []]],
+        'right': [["Jones", [], [1, 4]]],
+        'both': [["Rice", [2], [3]], ["carlson", [3], [2]]]}
+    assert fops.partition(file1, file2, ignore_case=True)['both'] == \
+        [["Carlson", [1, 3, 5], [2]], ["Rice", [2], [3]]]
+
+    rng = random.Random(1)
+    names = ["Carlson", "carlson", " Rice", "Rice", "O'Brien", "Núñez", "", "Rice,5", "Rice,4"]
+    for _ in range(200):
+        lines1 = rng.choices(names, k=rng.randint(0, 12))
+        lines2 = rng.choices(names, k=rng.randint(0, 12))
+        write(file1, lines1)
+        write(file2, lines2)
+        for opts in ({}, {'ignore_case': True}, {'f': "1"}):
+            assert fops.partition(file1, file2, **opts) == \
+                slow_partition(lines1, lines2, **opts), (lines1, lines2, opts)
+
+    try:
+        fops.partition(file1, os.path.join(work, "missing.txt"))
+    except fops.MissingFileError as e:
+        print(e)
+    else:
+        assert False, "no MissingFileError"
+
+print("ok")
@@ -0,0 +1,107 @@
+#!/bin/python3
+
+# Checks that a Pipeline gives the same result as running the fops operations
+# one after another, and how specs are parsed.
+
+import os
+import sys
+import tempfile
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import fops # pylint: disable=C0413
+from pipeline import Pipeline, Stage, StreamingStage # pylint: disable=C0413
+
+roster = '''"Braden",carlson,2
+"brynnli",Carlson,2
+"arlee",carlson,4
+"troy",rice,5
+"hannah",rice,4
+"troy",rice,5'''
+
+with tempfile.TemporaryDirectory() as work:
+    master = os.path.join(work, "master.txt")
+    with open(master, "w", encoding="utf-8") as f_handle:
+        f_handle.write("Arlee,Carlson\nTroy,Rice\n")
+    source = os.path.join(work, "roster.txt")
+    with open(source, "w", encoding="utf-8") as f_handle:
+        f_handle.write(roster + '\n')
+
+    # The same as one operation after another.
+    expected = fops.strip(roster, '"')
+    expected = fops.capitalize_words(expected)
+    expected = fops.cut(expected, f="1-2")
+    expected = fops.sort_lines(expected, unique=True)
+    with open(os.path.join(work, "sorted.txt"), "w", encoding="utf-8") as f_handle:
+        f_handle.write(expected + '\n')
+    expected = fops.difference(os.path.join(work, "sorted.txt"), master, mode="exact")
+
+    pipeline = Pipeline().strip('"').capitalize().cut(f="1-2").sort(unique=True) \
+                         .difference(master, mode="exact")
+    print(pipeline)
+    assert pipeline.run(roster).split('\n') == expected
+    assert list(pipeline.run_file(source)) == expected
+    output = os.path.join(work, "output.txt")
+    pipeline.run_file(source, output)
+    with open(output, encoding="utf-8") as f_handle:
+        assert f_handle.read() == '\n'.join(expected) + '\n'
+
+    # The same pipeline from a spec, and back again.
+    spec = f"strip chars='\"' | capitalize | cut f=1-2 | sort unique " \
+           f"| difference other={master} mode=exact"
+    assert Pipeline.parse(spec).run(roster).split('\n') == expected
+    assert Pipeline.parse(repr(Pipeline.parse(spec))).run(roster).split('\n') == expected
+
+    # With matches, the lines of master are kept instead.
+    assert Pipeline.parse(f"difference other={master} f=1-2 matches").run(
+        "Troy,Rice,5\nHannah,Rice,4\nArlee,Carlson,4") == "Troy,Rice,5\nArlee,Carlson,4"
+
+# A quoted | stays in its option rather than starting a new stage.
+pipeline = Pipeline.parse("strip chars='|' | sort unique reverse=true")
+assert len(pipeline.stages) == 2
+assert pipeline.stages[0].opts == {'chars': '|'}
+assert pipeline.stages[1].opts == {'unique': True, 'reverse': True}
+assert pipeline.run("a|b\nc\na|b") == "c\nab"
+pipeline = Pipeline.parse('strip mode=regex chars="[0-9]|x"|sort')
+assert pipeline.stages[0].opts == {'mode': 'regex', 'chars': '[0-9]|x'}
+assert pipeline.run("x1\nb2\na") == "\na\nb"
+
+# A flag may be given as just its name, or with a value.
+assert Pipeline.parse("sort ignore_case").stages[0].opts == {'ignore_case': True}
+assert Pipeline.parse("sort reverse=False").stages[0].opts == {'reverse': False}
+
+# Mistakes in a spec are reported as ValueErrors.
+for spec in ["sort uniq", "shuffle", "cut", "cut f=1 | strip", "strip chars='|",
+             "sort | | unique"]:
+    try:
+        Pipeline.parse(spec)
+    except ValueError as e:
+        print(e)
+    else:
+        assert False, spec
+
+# A bad line gives its line number.
+try:
+    list(Pipeline().strip('"').cut(f="3").lines(["a,b,c", "a,b", "a,b,c"]))
+except fops.DataError as e:
+    print(e)
+    assert e.lineno == 2
+else:
+    assert False, "no DataError"
+
+# Only the files read by a difference are inputs.
+assert Pipeline.parse("strip chars=x | difference other=a.txt | sort"
+                      " | difference other=b.txt mode=regex").inputs() == ["a.txt", "b.txt"]
+
+# A stage must say how it works on its lines.
+class Shuffle(Stage): # pylint: disable=W0223
+    """ A stage without apply. """
+class Reverse(StreamingStage): # pylint: disable=W0223
+    """ A streaming stage without function. """
+for stage in (Stage, StreamingStage, Shuffle, Reverse):
+    try:
+        stage()
+    except TypeError as e:
+        print(e)
+    else:
+        assert False, stage
+
+print("ok")
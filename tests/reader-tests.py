@@ -0,0 +1,69 @@
+#!/bin/python3
+
+# Checks that a file is read as the same lines whatever its encoding, byte
+# order mark and line endings, by the reader module and by the modules which
+# read files a piece at a time (extsort, linetable).
+
+import codecs
+import os
+import sys
+import tempfile
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import reader # pylint: disable=C0413
+from extsort import chunk_offsets, read_span # pylint: disable=C0413
+from linetable import LineTable # pylint: disable=C0413
+
+lines = ["Núñez,José", "O'Brien,Zoë", "", "Carlson,Braden", "Smith – Jr.,Troy"]
+
+assert reader.detect_encoding(b"Carlson\n") == "utf-8"
+assert reader.detect_encoding("Núñez".encode("cp1252"), True) == "cp1252"
+assert reader.detect_encoding(codecs.BOM_UTF8 + b"x") == "utf-8-sig"
+assert reader.detect_encoding(codecs.BOM_UTF16_LE + "x".encode("utf-16-le")) == "utf-16"
+assert reader.detect_encoding(codecs.BOM_UTF32_LE + b"x\0\0\0") == "utf-32"
+# A sample may end in the middle of a character, but a whole file may not.
+assert reader.detect_encoding("Núñ".encode("utf-8")[:-1]) == "utf-8"
+assert reader.detect_encoding("Núñ".encode("utf-8")[:-1], True) == "cp1252"
+
+# A byte which is not valid in the encoding is read as U+FFFD.
+assert reader.decode_lines(b"a\xffb\r\nc\rd\n", "utf-8") == ["a�b", "c", "d"]
+
+with tempfile.TemporaryDirectory() as work:
+    filename = os.path.join(work, "roster.txt")
+    for encoding in ("utf-8", "utf-8-sig", "cp1252", "utf-16", "utf-32"):
+        for ending in ("\n", "\r\n", "\r"):
+            for last in (ending, ""):
+                with open(filename, "w", encoding=encoding, newline='') as f_handle:
+                    f_handle.write(ending.join(lines) + last)
+                case = (encoding, ending, last)
+
+                assert reader.file_encoding(filename) == encoding, case
+                assert list(reader.read_lines(filename)) == lines, case
+                assert reader.read_text(filename) == '\n'.join(lines) + (last and '\n'), case
+                # With newline='' the line endings are left alone.
+                with reader.open_text(filename, newline='') as f_handle:
+                    assert f_handle.read() == ending.join(lines) + last, case
+
+                # In pieces, the lines come out the same. A file whose lines
+                # can't be found byte by byte is left in one piece.
+                for chunks in (1, 3, 7, 100):
+                    spans = chunk_offsets(filename, chunks, encoding)
+                    if not reader.byte_lines(encoding):
+                        assert spans == [[0, os.path.getsize(filename)]], case
+                        continue
+                    assert [line for span in spans
+                            for line in read_span(filename, span, encoding)] == lines, \
+                        (case, chunks)
+
+                with LineTable(filename) as table:
+                    assert len(table) == len(lines), case
+                    assert list(table.texts()) == lines, case
+                    assert list(table.texts(1, 4)) == lines[1:4], case
+                    assert [table.text(index) for index in range(len(lines))] == lines, case
+
+    # A UTF-8 file whose first SAMPLE bytes end in the middle of a character.
+    with open(filename, "w", encoding="utf-8") as f_handle:
+        f_handle.write("a" * (reader.SAMPLE - 1) + "ñ\nZoë\n")
+    assert reader.file_encoding(filename) == "utf-8"
+    assert list(reader.read_lines(filename))[1] == "Zoë"
+
+print("ok")
@@ -0,0 +1,32 @@
+#!/bin/python3
+
+# Runs every *-tests.py script in this directory, each in its own process, and
+# reports the ones which failed. Any one of them can also be run by itself,
+# from any directory:
+#
+#     python tests/run-tests.py            run them all
+#     python tests/cut-tests.py            run just one
+#
+# The exit status is 1 if any of them failed.
+
+import os
+import subprocess
+import sys
+
+TESTS = os.path.dirname(os.path.abspath(__file__))
+
+failed = []
+for name in sorted(os.listdir(TESTS)):
+    if not name.endswith("-tests.py") or name == "run-tests.py":
+        continue
+    result = subprocess.run([sys.executable, os.path.join(TESTS, name)],
+                            capture_output=True, text=True, check=False)
+    print(f"{name:24} {'ok' if result.returncode == 0 else 'FAILED'}")
+    if result.returncode != 0:
+        failed.append(name)
+        print(result.stdout[-2000:] + result.stderr[-2000:])
+
+if failed:
+    print(f"{len(failed)} failed: {', '.join(failed)}")
+    sys.exit(1)
+print("OK")
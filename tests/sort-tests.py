@@ -0,0 +1,77 @@
+#!/bin/python3
+
+# Checks the ignore_case, reverse and unique keywords of fops.sort_lines,
+# extsort.external_sort and fops.sort_file (with and without worker processes)
+# against the sorted builtin. Lines which compare equal must stay in the order
+# they were read, and unique keeps the first of them.
+
+import os
+import random
+import sys
+import tempfile
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import extsort # pylint: disable=C0413
+import fops # pylint: disable=C0413
+from extsort import external_sort # pylint: disable=C0413
+
+extsort.MAX_MERGE = 3
+
+rng = random.Random(3)
+names = ["Carlson", "carlson", "CARLSON", "Rice", "rice", "O'Brien", "o'brien", "Núñez",
+         "núñez", "Zoë", "ZOË", "Straße", "STRASSE", "", " ", "a", "B"]
+
+def expected(lines, **opts):
+    """ The lines sorted by the sorted builtin, following opts. """
+
+    key = str.casefold if opts.get('ignore_case', False) else None
+    lines = sorted(lines, key=key, reverse=opts.get('reverse', False))
+    if not opts.get('unique', False):
+        return lines
+    result = []
+    for line in lines:
+        if not result or (key or str)(line) != (key or str)(result[-1]):
+            result.append(line)
+    return result
+
+every = [dict(ignore_case=ignore_case, reverse=reverse, unique=unique)
+         for ignore_case in (False, True) for reverse in (False, True)
+         for unique in (False, True)]
+
+with tempfile.TemporaryDirectory() as work:
+    runs = os.path.join(work, "runs")
+    os.mkdir(runs)
+    roster = os.path.join(work, "roster.txt")
+
+    for _ in range(30):
+        lines = rng.choices(names, k=rng.randint(0, 200))
+        with open(roster, "w", encoding="utf-8") as f_handle:
+            f_handle.write(''.join(line + '\n' for line in lines))
+        for opts in [{}] + every:
+            result = expected(lines, **opts)
+            if lines and lines[-1] != '':
+                # splitlines loses a last empty line.
+                assert fops.sort_lines('\n'.join(lines), **opts) == '\n'.join(result), opts
+            for memory in (None, 300):
+                assert list(external_sort(lines, memory=memory, tmpdir=runs, **opts)) == \
+                    result, (opts, memory)
+            assert list(fops.sort_file(roster, memory=300, tmpdir=runs, **opts)) == result
+        assert os.listdir(runs) == []
+
+    # Sorting pieces of the file in worker processes, which is slow to start,
+    # so only a few times.
+    for opts in [{}] + every[::3]:
+        lines = rng.choices(names, k=2000)
+        with open(roster, "w", encoding="utf-8", newline="\r\n") as f_handle:
+            f_handle.write(''.join(line + '\n' for line in lines))
+        assert list(fops.sort_file(roster, workers=2, memory=2000, tmpdir=runs, **opts)) == \
+            expected(lines, **opts), opts
+        assert os.listdir(runs) == []
+
+    try:
+        list(fops.sort_file(os.path.join(work, "missing.txt")))
+    except fops.MissingFileError as e:
+        print(e)
+    else:
+        assert False, "no MissingFileError"
+
+print("ok")
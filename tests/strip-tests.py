@@ -0,0 +1,60 @@
+#!/bin/python3
+
+# Checks fops.strip, in both of its modes, and fops.strip_chars on strings and
+# on UTF-8 bytes. Removing a set of characters with translate must give the
+# same text as removing each of them with a regular expression.
+
+import os
+import random
+import re
+import sys
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import fops # pylint: disable=C0413
+from fops import strip, strip_chars # pylint: disable=C0413
+from pipeline import Pipeline # pylint: disable=C0413
+from table import Table # pylint: disable=C0413
+
+rng = random.Random(5)
+alphabet = "abcXYZ .,\"'-*\\[]^|ñé€😀\t\n"
+
+def regex_strip(text, chars):
+    """ Removes the characters chars from each line of text the slow way. """
+
+    pattern = '[' + ''.join(map(re.escape, chars)) + ']'
+    return '\n'.join(re.sub(pattern, '', line) for line in text.splitlines())
+
+for _ in range(500):
+    text = ''.join(rng.choices(alphabet, k=rng.randint(0, 60))).strip('\n')
+    chars = ''.join(rng.sample(alphabet[:-1], rng.randint(1, 5)))
+    result = strip(text, chars)
+    assert result == strip(text, chars, mode="chars")
+    assert result.splitlines() == regex_strip(text, chars).splitlines(), (text, chars)
+    # The same on bytes, whether or not chars is ASCII.
+    assert strip_chars(text.encode("utf-8"), chars) == result.encode("utf-8")
+    # Line endings are kept, unless they are among chars.
+    assert result.count('\n') == text.count('\n')
+    assert strip_chars(text, chars + '\n') == result.replace('\n', '')
+
+# Every character is taken literally.
+assert strip('"Carlson", Braden.\n"Rice", Troy.', '".') == 'Carlson, Braden\nRice, Troy'
+assert strip("a.b*c\\d[e]", ".*\\[]") == "abcde"
+assert strip("a-b^c", "^-") == "abc"
+assert strip("", ",") == ""
+assert strip_chars(b"\"Carlson\",10\r\n", '"') == b"Carlson,10\r\n"
+assert strip_chars("Núñez, José".encode("utf-8"), "ñé,") == "Núez Jos".encode("utf-8")
+assert strip_chars("€1,00".encode("utf-8"), ",") == "€100".encode("utf-8")
+
+# In regex mode, char is a regular expression applied to each line.
+assert strip(" Carlson ,  Braden \n Rice , Troy", r"\s*,\s*|^\s+|\s+$", mode="regex") == \
+    "CarlsonBraden\nRiceTroy"
+assert strip("a.b.c", ".", mode="regex") == ""
+assert strip("a1b22c", "[0-9]+", mode="regex") == "abc"
+
+# A Table and a Pipeline strip the same way.
+roster = '"Carlson", "Braden", 10\n"Rice", "Troy", 11\n"O\'Brien", "Kate", 12'
+for mode, chars in (("chars", '" '), ("regex", r'"|\s')):
+    expected = strip(roster, chars, mode=mode)
+    assert str(fops.strip(Table.from_string(roster), chars, mode=mode)) == expected
+    assert Pipeline().strip(chars, mode=mode).run(roster) == expected
+
+print("ok")
@@ -0,0 +1,92 @@
+#!/bin/python3
+
+# Checks that a Table holds its text without losing any of it, and that the
+# fops operations give the same result on a Table as on the text.
+
+import os
+import random
+import sys
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import fops # pylint: disable=C0413
+from table import NumberColumn, StringColumn, Table, encode # pylint: disable=C0413
+
+roster = """Carlson,Braden,2,3.5,0042
+Carlson,Brynnli,2,4.0,0043
+Carlson,Arlee,4,3.25,0044
+Rice,Troy,5,2.0,0045
+Rice,Hannah,4,3.0,0046"""
+
+# A column is stored as numbers only if they turn back into the same text.
+table = Table.from_string(roster)
+assert [type(column) for column in table.columns] == \
+    [StringColumn, StringColumn, NumberColumn, NumberColumn, StringColumn]
+assert table.columns[2].data.typecode == 'q' and table.columns[3].data.typecode == 'd'
+assert isinstance(encode(["1.50", "2"]), StringColumn)
+assert isinstance(encode(["-3", "0", "12"]), NumberColumn)
+assert isinstance(encode(["-0", "1"]), StringColumn)
+assert isinstance(encode(["1_000"]), StringColumn)
+# Numbers too large for 64 bits (such as long account numbers) are kept as
+# text rather than rounded or refused.
+for values in (["9223372036854775807", "1"], ["9223372036854775808"],
+               ["-9223372036854775809"], ["123456789012345678901234567890"]):
+    column = encode(values)
+    assert column.text() == values, values
+assert isinstance(encode(["9223372036854775807"]), NumberColumn)
+assert isinstance(encode(["9223372036854775808"]), StringColumn)
+ids = "id,name\n123456789012345678901,Carlson\n9,Rice"
+assert str(Table.from_string(ids)) == ids
+
+# The text comes back exactly as it was, short rows and empty fields too.
+rng = random.Random(1)
+values = ["Carlson", "Rice", "", " 7", "7", "-2", "3.5", "1e5", "nan", "Núñez", "18446744073709551616"]
+for _ in range(300):
+    lines = [','.join(rng.choices(values, k=rng.randint(1, 5))) for _ in range(rng.randint(1, 20))]
+    # As for any string, an empty last line would be lost by splitlines.
+    lines[-1] = lines[-1] or "Rice"
+    text = '\n'.join(lines)
+    table = Table.from_string(text)
+    assert str(table) == text, text
+    assert [table.row(index) for index in range(len(table))] == [line.split(',') for line in lines]
+    assert list(Table.from_lines(line + '\n' for line in lines).lines()) == lines
+
+# A table split on a regular expression is joined with the separator it
+# matched, or with the one given.
+table = Table.from_string("Carlson, Braden,2\nRice,  Troy,5", fs=r",\s*")
+assert table.row(1) == ["Rice", "Troy", "5"]
+assert str(table) == "Carlson, Braden, 2\nRice, Troy, 5"
+assert str(fops.cut(table, f="3,1")) == "2, Carlson\n5, Rice"
+table = Table.from_string("Carlson, Braden;2", fs=r"[,;]\s*", sep="\t")
+assert str(table) == "Carlson\tBraden\t2"
+assert str(Table.from_string("Carlson\nRice", fs=r",\s*")) == "Carlson\nRice"
+assert str(Table.from_string("a|b", fs=r"\|")) == "a|b"
+
+# cut, sort, strip and difference on a Table give the same text as on a
+# string.
+table = Table.from_string(roster)
+for f in ("1-2", "3,1", "5", "2,2"):
+    assert str(fops.cut(table, f=f)) == fops.cut(roster, f=f)
+for opts in ({}, {'reverse': True}, {'unique': True}, {'ignore_case': True}):
+    shuffled = '\n'.join(rng.sample(roster.split('\n') * 2 + ["carlson,braden,2,3.5,0042"], 11))
+    assert str(fops.sort_lines(Table.from_string(shuffled), **opts)) == \
+        fops.sort_lines(shuffled, **opts), opts
+assert str(fops.strip(table, "0")) == fops.strip(roster, "0")
+assert str(fops.strip(table, "[aeiou]", mode="regex")) == fops.strip(roster, "[aeiou]", mode="regex")
+# A Table that is sorted or cut still has its numbers.
+assert isinstance(fops.sort_lines(table).columns[2], NumberColumn)
+
+master = Table.from_string("Carlson , Braden,9\nRice,Troy,5")
+assert str(fops.difference(table, master, f="1-2")) == \
+    "Carlson,Brynnli,2,4.0,0043\nCarlson,Arlee,4,3.25,0044\nRice,Hannah,4,3.0,0046"
+assert str(fops.difference(table, Table.from_string(roster))) == ""
+assert str(fops.difference(table, Table.from_string("Rice,Troy,5,2.0,0045"))) == \
+    '\n'.join(roster.split('\n')[:3] + roster.split('\n')[4:])
+
+# A row without enough fields for a cut gives its line number.
+try:
+    fops.cut(Table.from_string("a,b,c\na,b\na,b,c"), f="3")
+except fops.DataError as e:
+    assert e.lineno == 2
+else:
+    assert False, "no DataError"
+
+print("ok")
@@ -0,0 +1,214 @@
+#!/bin/python3
+
+# Checks LineTable and the VirtualView of the textview module against plain
+# lists of lines. BLOCK, WINDOW and MARGIN are made small, so that a few
+# hundred lines cross many blocks and windows. The VirtualView is given a
+# FakeText in place of a Tk Text widget, so no display is needed.
+
+import os
+import random
+import sys
+import tempfile
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import linetable # pylint: disable=C0413
+import textview # pylint: disable=C0413
+from linetable import LineTable # pylint: disable=C0413
+from pipeline import Pipeline # pylint: disable=C0413
+from textview import Document, VirtualView # pylint: disable=C0413
+
+linetable.BLOCK = 16
+textview.WINDOW = 50
+textview.MARGIN = 15
+
+rng = random.Random(1)
+
+class FakeText:
+    """ Just enough of a Text widget for a VirtualView, showing HEIGHT lines
+    at a time. """
+
+    HEIGHT = 10
+
+    def __init__(self):
+        self.text = ''
+        self.top = 1
+        self.state = "normal"
+        self.yscrollcommand = None
+        self.pending = None
+
+    def configure(self, **opts):
+        self.state = opts.get("state", self.state)
+        self.yscrollcommand = opts.get("yscrollcommand", self.yscrollcommand)
+
+    def cget(self, option):
+        return getattr(self, option)
+
+    def get(self, start, end): # pylint: disable=W0613
+        return self.text
+
+    def delete(self, start, end): # pylint: disable=W0613
+        assert self.state == "normal"
+        self.text = ''
+
+    def insert(self, index, text): # pylint: disable=W0613
+        assert self.state == "normal"
+        self.text = text
+
+    def edit_reset(self):
+        pass
+
+    def edit_modified(self, flag):
+        pass
+
+    def count(self):
+        return self.text.count('\n') + 1
+
+    def yview(self, *args):
+        if len(args) == 1:
+            self.top = int(args[0].split('.')[0])
+        else:
+            self.top = self.top + int(args[1])
+        self.top = max(1, min(self.top, self.count()))
+        self.yscrollcommand('0', '1')
+
+    def index(self, where):
+        if where == "@0,0":
+            return f"{self.top}.0"
+        if where == "end-1c":
+            return f"{self.count()}.0"
+        return f"{min(self.top + self.HEIGHT, self.count())}.0"
+
+    def winfo_height(self):
+        return 200
+
+    def after_idle(self, function):
+        self.pending = function
+
+class FakeScrollbar:
+    """ Keeps the position a VirtualView gives its scrollbar. """
+
+    def __init__(self):
+        self.position = None
+
+    def set(self, first, last):
+        self.position = [first, last]
+
+def write(filename, lines, ending='\n', last=True):
+    """ Writes lines to filename, with a line ending after the last one if
+    last is True (or if it is empty, since it would be lost otherwise). """
+    last = last or lines[-1:] == ['']
+    with open(filename, "w", encoding="utf-8", newline='') as f_handle:
+        f_handle.write(ending.join(lines) + (ending if last and lines else ''))
+
+def shown(view, textarea):
+    """ Checks that the widget holds the lines of the window of view, and
+    returns them. """
+    lines = textarea.text.split('\n') if textarea.text else []
+    assert lines == list(view.document.lines(view.first, view.first + textview.WINDOW))
+    assert len(lines) == min(textview.WINDOW, len(view))
+    return lines
+
+with tempfile.TemporaryDirectory() as work:
+    filename = os.path.join(work, "roster.txt")
+
+    # LineTable reads the same lines however they fall across blocks.
+    for _ in range(200):
+        lines = [rng.choice(["", "Rice", "Núñez,José", "x" * rng.randint(0, 40)])
+                 for _ in range(rng.randint(0, 30))]
+        ending = rng.choice(['\n', '\r\n'])
+        write(filename, lines, ending, rng.random() < 0.5)
+        with LineTable(filename) as table:
+            assert len(table) == len(lines)
+            assert list(table.texts()) == lines
+            start = rng.randint(0, len(lines))
+            stop = rng.randint(start, len(lines))
+            assert list(table.texts(start, stop)) == lines[start:stop]
+            assert [table.text(index) for index in range(start, stop)] == lines[start:stop]
+
+    # A Document is edited just like a list.
+    for _ in range(100):
+        lines = [f"line {index}" for index in range(rng.randint(0, 60))]
+        write(filename, lines)
+        document = Document(LineTable(filename))
+        assert document.unchanged()
+        for step in range(10):
+            start = rng.randint(0, len(lines))
+            stop = rng.randint(start, len(lines))
+            new = [f"edit {step}.{index}" for index in range(rng.randint(0, 4))]
+            document.splice(start, stop, new)
+            lines[start:stop] = new
+            assert len(document) == len(lines)
+            start = rng.randint(0, len(lines))
+            stop = rng.randint(start, len(lines))
+            assert list(document.lines(start, stop)) == lines[start:stop]
+            assert list(document.lines()) == lines
+        document.table.close()
+
+    # A VirtualView shows a window of the lines around the one asked for,
+    # even at either end of the file and on either side of a window.
+    lines = [f"{index},name{index % 7}" for index in range(500)]
+    write(filename, lines)
+    [textarea, scrollbar] = [FakeText(), FakeScrollbar()]
+    view = VirtualView(textarea, scrollbar, filename)
+    assert shown(view, textarea) == lines[:textview.WINDOW]
+    for line in [0, 1, 14, 15, 16, 49, 50, 51, 250, 449, 450, 451, 485, 499]:
+        view.show(line)
+        assert shown(view, textarea) == lines[view.first:view.first + textview.WINDOW]
+        assert view.first == max(0, min(line - textview.MARGIN, 500 - textview.WINDOW))
+        assert view.top() == min(line, view.first + textarea.count() - 1)
+        assert textarea.text.split('\n')[view.top() - view.first] == lines[view.top()]
+
+    # Dragging the scrollbar goes to that part of the file.
+    view.scroll("moveto", "0.5")
+    assert view.top() == 250
+    assert scrollbar.position[0] == 250 / 500
+
+    # Scrolling a line at a time moves the window once the top gets near
+    # either end of it, and every line is seen on the way.
+    view.show(0)
+    seen = []
+    while view.top() < 490:
+        seen.append(textarea.text.split('\n')[view.top() - view.first])
+        view.scroll("scroll", "1", "units")
+        if textarea.pending is not None:
+            [pending, textarea.pending] = [textarea.pending, None]
+            pending()
+        shown(view, textarea)
+    assert seen == lines[:490]
+    while view.top() > 0:
+        view.scroll("scroll", "-1", "units")
+        if textarea.pending is not None:
+            [pending, textarea.pending] = [textarea.pending, None]
+            pending()
+        shown(view, textarea)
+    assert view.first == 0
+
+    # Edits made in the widget are kept when the window moves, even ones
+    # which add or remove lines.
+    view.show(40)
+    textarea.text = textarea.text.replace("40,name5\n", "40,forty\n40,more\n")
+    textarea.text = textarea.text.replace("45,name3\n", "")
+    view.edited = True
+    lines[40:41] = ["40,forty", "40,more"]
+    lines.remove("45,name3")
+    for line in [450, 0, 30, 499]:
+        view.show(line)
+        assert shown(view, textarea) == lines[view.first:view.first + textview.WINDOW]
+    assert list(view.lines()) == lines
+
+    # Operations work on the whole Document, and can be undone.
+    view.apply(Pipeline().cut(f="2").sort(unique=True).lines)
+    assert list(view.lines()) == ["forty", "more"] + [f"name{index}" for index in range(7)]
+    shown(view, textarea)
+    assert view.undo() and list(view.lines()) == lines
+    assert view.redo() and len(view) == 9
+    assert view.undo() and not view.undo()
+
+    # Saving over the file being shown.
+    view.save(filename)
+    with open(filename, encoding="utf-8") as f_handle:
+        assert f_handle.read() == '\n'.join(lines) + '\n'
+    assert list(view.lines()) == lines
+    assert view.redo() and len(view) == 9
+    view.close()
+
+print("ok")
@@ -0,0 +1,53 @@
+#!/bin/python3
+
+# Checks the Job of the worker module: the result of a function run in a
+# worker process, an error it raises, cancelling it, and a worker which ends
+# without a result.
+
+import os
+import sys
+import time
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import fops # pylint: disable=C0413
+from worker import Job, WorkerError # pylint: disable=C0413
+
+def wait(job):
+    """ Polls job, as LinkTab.check_job does, until it is done. """
+
+    while True:
+        message = job.poll()
+        if message is not None:
+            return message
+        time.sleep(0.01)
+
+job = Job(fops.sort_lines, "b\nA\na", ignore_case=True, reverse=True)
+assert wait(job) == ["done", "b\nA\na"]
+assert job.seconds is not None and not job.process.is_alive()
+
+# The exception raised by the function comes back with its type and message.
+[status, error] = wait(Job(fops.cut, "a,b\nc", f="2"))
+assert status == "error" and isinstance(error, fops.DataError) and error.lineno == 2
+print(error)
+[status, error] = wait(Job(fops.parse_num_range, "3-1"))
+assert status == "error" and isinstance(error, fops.DataError)
+
+# Nothing comes back while it runs, and cancelling stops it at once.
+job = Job(time.sleep, 60)
+assert job.poll() is None
+time.sleep(0.2)
+assert job.poll() is None and job.elapsed() >= 0.2
+job.cancel()
+assert not job.process.is_alive() and job.seconds < 30
+
+# A worker which ends without putting a result gives a WorkerError.
+job = Job(os._exit, 3)
+[status, error] = wait(job)
+assert status == "error" and isinstance(error, WorkerError) and isinstance(error, fops.FopsError)
+assert "exit code 3" in f"{error}"
+print(error)
+
+# A large result still arrives whole.
+text = "\n".join(f"line {index}" for index in range(200000))
+assert wait(Job(fops.sort_lines, text)) == ["done", fops.sort_lines(text)]
+
+print("ok")
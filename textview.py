@@ -0,0 +1,375 @@
+""" textview.py
+Author: Braden Carlson
+Date: October 2026
+
+Lets a TextTab show a file with millions of lines. Putting the whole of such a
+file into a Tk Text widget takes a long time and a great deal of memory, since
+the widget keeps its own copy of every line (along with its tags, marks and
+undo stack). Instead, the file is opened as a LineTable (see the linetable
+module), which only holds the offset of each line, and the Text widget is only
+given the lines around the ones being looked at: the visible lines, plus
+MARGIN lines above and below them, WINDOW lines in all. As the view is
+scrolled near either end of the window, the window is moved and filled with
+the lines from the file.
+
+The lines shown can be edited as usual. Before the window is moved, the
+lines in it are read back out of the widget and replace the ones they were
+loaded from in the Document, which is a list of pieces: ranges of lines of the
+LineTable which have not been changed, and lists of the lines which have. So
+an edit only costs the lines in the window, and the file itself is never
+changed until it is saved.
+
+The operations of a TextTab (sort, cut, strip, ...) are run on the lines of
+the Document rather than on the contents of the widget, through a Pipeline
+(see transform), and the result is written to a file in a temporary directory
+and opened as a new Document. The operation only needs the names of those
+two files, so it can be run in a worker process (see the worker module). Each
+earlier Document is kept (up to HISTORY of them), so an operation can be
+undone.
+
+Nothing in this module uses tkinter directly, the Text widget and Scrollbar
+are only called through their methods. """
+
+import os
+import tempfile
+from itertools import accumulate, chain
+from linetable import LineTable
+from reader import read_lines
+import fops
+
+# Files larger than this many bytes are shown by a TextTab as a VirtualView.
+VIRTUAL_SIZE = 8 * 2**20
+
+# Number of lines loaded into the Text widget at a time, and the number of
+# those kept above and below the visible ones.
+WINDOW = 1000
+MARGIN = 300
+
+# Number of earlier Documents kept to undo operations.
+HISTORY = 20
+
+class Rows:
+    """ The lines start up to stop of a LineTable, as one piece of a
+    Document. Like a list, it can be sliced, and iterates over the lines as
+    strings. """
+
+    def __init__(self, table, start, stop):
+        self.table = table
+        self.start = start
+        self.stop = stop
+
+    def __len__(self):
+        return self.stop - self.start
+
+    def __getitem__(self, key):
+        """ Returns the Rows given by key, a slice without a step. """
+
+        [start, stop, _] = key.indices(len(self))
+        return Rows(self.table, self.start + start, self.start + max(start, stop))
+
+    def __iter__(self):
+        return self.table.texts(self.start, self.stop)
+
+class Document:
+    """ The lines of a file shown by a VirtualView, see the top of this
+    module. pieces is a list of Rows (lines of table which were not edited)
+    and lists of strings (lines which were). """
+
+    def __init__(self, table):
+        self.table = table
+        self.pieces = [Rows(table, 0, len(table))] if len(table) else []
+
+    def __len__(self):
+        return sum(map(len, self.pieces))
+
+    def unchanged(self):
+        """ Returns True if the Document holds exactly the lines of its
+        LineTable. """
+
+        return not self.pieces or \
+            (len(self.pieces) == 1 and isinstance(self.pieces[0], Rows) and
+             len(self.pieces[0]) == len(self.table))
+
+    def lines(self, start=0, stop=None):
+        """ Returns an iterator over the lines start up to stop (or to the end)
+        as strings. """
+
+        pieces = self.pieces if stop is None else split_pieces(self.pieces, stop)[0]
+        return chain.from_iterable(split_pieces(pieces, start)[1])
+
+    def splice(self, start, stop, lines):
+        """ Replaces the lines start up to stop with the list of strings
+        lines. """
+
+        [before, _] = split_pieces(self.pieces, start)
+        [_, after] = split_pieces(self.pieces, stop)
+        pieces = []
+        for piece in chain(before, [lines], after):
+            if not piece:
+                continue
+            if pieces and isinstance(pieces[-1], list) and isinstance(piece, list):
+                # Keep the edited lines in one piece, rather than one per edit.
+                pieces[-1] = pieces[-1] + piece
+            else:
+                pieces.append(piece)
+        self.pieces = pieces
+
+def split_pieces(pieces, index):
+    """ Returns the list [before, after] of the pieces holding the lines
+    before line index, and those holding the rest. A piece with lines on both
+    sides of index is split in two. """
+
+    [before, after] = [[], []]
+    for [start, piece] in zip(accumulate(map(len, pieces), initial=0), pieces):
+        if start + len(piece) <= index:
+            before.append(piece)
+        elif start >= index:
+            after.append(piece)
+        else:
+            before.append(piece[:index - start])
+            after.append(piece[index - start:])
+    return [before, after]
+
+def write_lines(lines, filename):
+    """ Writes the strings lines to filename in UTF-8, each followed by a
+    newline. If lines raises an exception, the file is removed. """
+
+    try:
+        with open(filename, "w", encoding="utf-8") as f_handle:
+            for line in lines:
+                f_handle.write(line)
+                f_handle.write('\n')
+    except BaseException:
+        os.remove(filename)
+        raise
+
+def transform(source, output, function, **opts):
+    """ Writes the lines returned by function(lines, **opts) to the file
+    output, where lines are the lines of the file source. function is a
+    function such as Pipeline.lines. """
+
+    write_lines(function(read_lines(source), **opts), output)
+
+def csv_cut_lines(lines, **opts):
+    """ fops.csv_cut_lines of lines without line endings, for transform. The
+    endings are put back, in case a quoted field spans more than one line. """
+
+    return fops.csv_cut_lines(map("{}\n".format, lines), **opts)
+
+def same_file(name1, name2):
+    """ Returns True if name1 and name2 are names of the same file. """
+
+    return os.path.normcase(os.path.abspath(name1)) == os.path.normcase(os.path.abspath(name2))
+
+def new_file(directory):
+    """ Creates a new empty file in directory, and returns its name. """
+
+    [fd, filename] = tempfile.mkstemp(suffix=".txt", dir=directory)
+    os.close(fd)
+    return filename
+
+class VirtualView: # pylint: disable=R0902
+    """ Shows the lines of a file in a Text widget, a window at a time, see the
+    top of this module. """
+
+    def __init__(self, textarea, scrollbar, filename):
+        """ textarea is the Text widget to show the lines in, and scrollbar
+        the Scrollbar beside it. Raises a MissingFileError if filename does
+        not exist. """
+
+        self.textarea = textarea
+        self.scrollbar = scrollbar
+        self.document = Document(LineTable(filename))
+        # pylint: disable=R1732
+        self.work = tempfile.TemporaryDirectory(prefix="blue-")
+        # Documents before (history) and after (future) the current one, for
+        # undo and redo.
+        [self.history, self.future] = [[], []]
+        # The number of the first line in the widget, and how many there are.
+        [self.first, self.count] = [0, 0]
+        # Whether the lines in the widget were edited since they were loaded,
+        # set by TextTab.on_modified.
+        self.edited = False
+        # Whether show has been asked to move the window, see on_yview.
+        self.moving = False
+        self.textarea.configure(yscrollcommand=self.on_yview)
+        self.show(0)
+
+    def __len__(self):
+        return len(self.document)
+
+    def close(self):
+        """ Gives the Text widget back its own scrolling, and removes the
+        results of the operations. """
+
+        self.textarea.configure(yscrollcommand=self.scrollbar.set)
+        self.work.cleanup()
+
+    def commit(self):
+        """ Puts the lines in the widget back into the Document, if they were
+        edited. """
+
+        if not self.edited:
+            return
+        content = self.textarea.get(1.0, "end-1c")
+        lines = content.split('\n') if content else []
+        self.document.splice(self.first, self.first + self.count, lines)
+        self.count = len(lines)
+        self.edited = False
+
+    def show(self, line):
+        """ Loads the window of lines around line into the widget, and
+        scrolls it so that line is at the top. """
+
+        self.commit()
+        self.first = max(0, min(line - MARGIN, len(self.document) - WINDOW))
+        lines = list(self.document.lines(self.first, self.first + WINDOW))
+        self.count = len(lines)
+        # The widget is disabled while an operation runs (see TextTab.lock),
+        # but can still be scrolled through.
+        state = self.textarea.cget("state")
+        self.textarea.configure(state="normal")
+        self.textarea.delete(1.0, "end")
+        self.textarea.insert(1.0, '\n'.join(lines))
+        self.textarea.configure(state=state)
+        # An undo must not reach back into another window.
+        self.textarea.edit_reset()
+        self.textarea.edit_modified(False)
+        self.textarea.yview(f"{max(line - self.first, 0) + 1}.0")
+        self.moving = False
+
+    def top(self):
+        """ Returns the number of the line at the top of the widget. """
+
+        return self.first + int(self.textarea.index("@0,0").split('.')[0]) - 1
+
+    def on_yview(self, *args): # pylint: disable=W0613
+        """ The yscrollcommand of the widget. Sets the scrollbar to where the
+        visible lines are in the whole Document, and moves the window once
+        they get within half of MARGIN of either end of it. """
+
+        total = len(self.document) - self.count + int(self.textarea.index("end-1c").split('.')[0])
+        top = self.top()
+        bottom = self.first + \
+            int(self.textarea.index(f"@0,{self.textarea.winfo_height()}").split('.')[0])
+        if total == 0:
+            self.scrollbar.set(0, 1)
+            return
+        self.scrollbar.set(top / total, min(bottom / total, 1))
+
+        near_top = self.first > 0 and top - self.first < MARGIN // 2
+        near_bottom = self.first + self.count < len(self.document) and \
+            self.first + self.count - bottom < MARGIN // 2
+        if (near_top or near_bottom) and not self.moving:
+            # Not while Tk is still scrolling the widget.
+            self.moving = True
+            self.textarea.after_idle(lambda: self.show(self.top()))
+
+    def scroll(self, *args):
+        """ The command of the scrollbar, see TextTab.scroll. Dragging the
+        scrollbar moves to that part of the whole Document, the arrows
+        scroll the widget. """
+
+        if args[0] == "moveto":
+            self.show(int(float(args[1]) * len(self.document)))
+        else:
+            self.textarea.yview(*args)
+
+    def lines(self):
+        """ Returns an iterator over every line of the Document, including the
+        edits made in the widget. """
+
+        self.commit()
+        return self.document.lines()
+
+    def text(self):
+        """ Returns the whole Document as a single string. This is as large as
+        the file, so the operations use lines instead. """
+
+        return '\n'.join(self.lines())
+
+    def source(self):
+        """ Returns the name of a file holding the lines of the Document, to
+        run an operation on. This is the file being shown, unless it has been
+        edited, in which case the lines are written to a new file, which the
+        Document is then read from. """
+
+        self.commit()
+        if not self.document.unchanged():
+            filename = new_file(self.work.name)
+            write_lines(self.document.lines(), filename)
+            top = self.top()
+            self.document = Document(LineTable(filename))
+            self.show(top)
+        return self.document.table.filename
+
+    def output(self):
+        """ Returns the name of a new file for the result of an operation, to
+        be given to adopt. """
+
+        return new_file(self.work.name)
+
+    def adopt(self, filename):
+        """ Shows the lines of filename, the result of an operation, as a new
+        Document. Returns the new Document. """
+
+        self.history = self.history[1 - HISTORY:] + [self.document]
+        self.future = []
+        self.document = Document(LineTable(filename))
+        self.show(0)
+        return self.document
+
+    def apply(self, function, **opts):
+        """ Runs function over the Document (see transform) and shows the
+        result. Returns the new Document. """
+
+        output = self.output()
+        transform(self.source(), output, function, **opts)
+        return self.adopt(output)
+
+    def undo(self):
+        """ Goes back to the Document before the last operation, if any.
+        Returns whether there was one. """
+
+        if not self.history:
+            return False
+        self.commit()
+        self.future.append(self.document)
+        self.document = self.history.pop()
+        self.show(self.top())
+        return True
+
+    def redo(self):
+        """ Goes forward to the Document undone by undo, if any. Returns
+        whether there was one. """
+
+        if not self.future:
+            return False
+        self.commit()
+        self.history.append(self.document)
+        self.document = self.future.pop()
+        self.show(self.top())
+        return True
+
+    def save(self, filename):
+        """ Writes the Document to filename. It is written to a new file first
+        and then moved into place, since the Document may still be reading
+        from filename. Afterwards the Document is the saved file.
+
+        A file can't be replaced while it is memory mapped on Windows, so
+        every Document reading from filename is closed before it is replaced,
+        and the ones kept for undo and redo are dropped. """
+
+        self.commit()
+        temp = new_file(os.path.dirname(os.path.abspath(filename)))
+        write_lines(self.document.lines(), temp)
+        top = self.top()
+        stale = [document for document in [self.document] + self.history + self.future
+                 if same_file(document.table.filename, filename)]
+        for document in stale:
+            document.table.close()
+        self.history = [document for document in self.history if document not in stale]
+        self.future = [document for document in self.future if document not in stale]
+        os.replace(temp, filename)
+        self.document = Document(LineTable(filename))
+        self.show(top)
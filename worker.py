@@ -0,0 +1,103 @@
+""" worker.py
+Author: Braden Carlson
+Date: October 2026
+
+Runs the operations started from the GUI (a sort, a cut, a difference, ...)
+in a worker process, so that the window keeps repainting while they run. A
+Job starts the function in a new process, which puts its result (or the
+exception it raised) on a multiprocessing Queue. The GUI never waits on the
+queue, it checks it every POLL milliseconds with after() (see
+LinkTab.run_job), and shows a progress bar and a Cancel button meanwhile.
+
+A process is used rather than a thread so that Cancel really stops the work:
+Python has no way to stop a thread from outside, but a process can be
+terminated. It also means the work does not hold the GIL the GUI needs. The
+function and its arguments are pickled to get to the worker, so they must be
+defined at the top level of a module (fops.sort_lines, Pipeline.run, ...),
+and, as for the parallel module, a script starting the GUI must do so under
+if __name__ == "__main__".
+
+Starting a process and sending it the text takes some time, so an input
+smaller than BACKGROUND characters (or bytes, for a file) is still run
+directly, where it takes less time than that. """
+
+import multiprocessing
+import queue
+import time
+from errors import FopsError
+
+# Size of the smallest input which is worth sending to a worker.
+BACKGROUND = 2**20
+
+# Milliseconds between checks on a running Job.
+POLL = 50
+
+class WorkerError(FopsError):
+    """ Raised when a worker process ends without a result, such as when it
+    runs out of memory. """
+
+def work(results, function, args, kwargs):
+    """ Run in the worker process. Puts the list ["done", result] of
+    function(*args, **kwargs) on the queue results, or ["error", e] if it
+    raised e. """
+
+    try:
+        results.put(["done", function(*args, **kwargs)])
+    except Exception as e: # pylint: disable=W0718
+        results.put(["error", e])
+
+class Job:
+    """ A function being run in a worker process, see the top of this
+    module. """
+
+    def __init__(self, function, *args, **kwargs):
+        """ Starts function(*args, **kwargs) in a worker process. """
+
+        self.results = multiprocessing.Queue()
+        self.process = multiprocessing.Process(target=work, daemon=True,
+                                               args=(self.results, function, args, kwargs))
+        self.started = time.perf_counter()
+        # The time the worker took, once it has finished.
+        self.seconds = None
+        # The instrument.Operation the Job is part of, set by the caller (see
+        # LinkTab.run_job).
+        self.operation = None
+        self.process.start()
+
+    def elapsed(self):
+        """ Returns the number of seconds since the Job was started. """
+
+        return time.perf_counter() - self.started
+
+    def poll(self):
+        """ Returns None while the worker is still running, and then the list
+        [status, value], which is ["done", result] if the function returned
+        result, or ["error", e] if it raised e (or the worker ended without a
+        result, in which case e is a WorkerError). """
+
+        try:
+            message = self.results.get_nowait()
+        except queue.Empty:
+            if self.process.is_alive():
+                return None
+            try:
+                # The result may have been put just before the worker ended.
+                message = self.results.get(timeout=0.1)
+            except queue.Empty:
+                message = ["error", WorkerError("The operation stopped without a result "
+                                                f"(exit code {self.process.exitcode}).")]
+        self.finish()
+        return message
+
+    def cancel(self):
+        """ Stops the worker. """
+
+        self.process.terminate()
+        self.finish()
+
+    def finish(self):
+        """ Waits for the worker process to end, and keeps its time. """
+
+        self.process.join()
+        self.seconds = self.elapsed()
+        self.results.close()